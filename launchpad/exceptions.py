@@ -39,6 +39,17 @@ class MissingImportError(LaunchpadException):
     def __init__(self, message: str | None = None) -> None:
         super().__init__(message)
 
+class WorkerStartError(LaunchpadException):
+    status = 500
+    def __init__(self, message: str | None = None) -> None:
+        super().__init__(message)
+
+class ModulesUpdateRejected(LaunchpadException):
+    message = """Modules update rejected. The live modules were kept:"""
+    status = 409
+    def __init__(self, reasons: list[str]) -> None:
+        super().__init__("\n".join([self.message] + reasons))
+
 # -- AUTHENTICATOR ERRORS
 class OutatedAuthorizationToken(LaunchpadException):
     message = """Authorization token is outdated."""
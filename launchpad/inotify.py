@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+import os
+import sys
+import ctypes
+import ctypes.util
+import struct
+import logging
+from pathlib import Path
+
+from typing import Sequence
+
+logger = logging.getLogger("watcher")
+
+Mask = int
+WatchDescriptor = int
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (
+    IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+    | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+)
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _libc() -> ctypes.CDLL | None:
+    if not sys.platform.startswith("linux"):
+        return None
+    libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    if not all(hasattr(libc, f) for f in ["inotify_init1", "inotify_add_watch", "inotify_rm_watch"]):
+        return None
+    return libc
+
+
+class Inotify(object):
+    """
+    Thin ctypes wrapper around linux inotify.
+    Directories are watched recursively. Watching a file watch its parent directory.
+    `read` is non blocking and return the paths touched since the last read.
+    Directories whose watch was dropped by the kernel are collected in `ignored`, until the reader clears them.
+    """
+    __fd: int
+    __watches: dict[WatchDescriptor, Path]
+    __paths: dict[Path, WatchDescriptor]
+    overflowed: bool
+    ignored: set[Path]
+
+    @property
+    def fd(self) -> int:
+        return self.__fd
+
+    @property
+    def watched(self) -> Sequence[Path]:
+        return list(self.__paths.keys())
+
+    def __init__(self) -> None:
+        self.__libc = _libc()
+        if self.__libc is None:
+            raise OSError("inotify is not available on this platform.")
+        fd = self.__libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), os.strerror(ctypes.get_errno()))
+        self.__fd = fd
+        self.__watches = {}
+        self.__paths = {}
+        self.overflowed = False
+        self.ignored = set()
+
+    @staticmethod
+    def available() -> bool:
+        try:
+            return _libc() is not None
+        except OSError:
+            return False
+
+    def add_watch(self, path: Path) -> bool:
+        """watch a directory, or the parent directory of a file. Return whether it is watched."""
+        path = path if path.is_dir() else path.parent
+        if path in self.__paths:
+            return True
+        if not path.is_dir():
+            return False
+        wd = self.__libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK) # type: ignore
+        if wd < 0:
+            logger.warning(f"cannot watch {str(path)}: {os.strerror(ctypes.get_errno())}")
+            return False
+        self.__watches[wd] = path
+        self.__paths[path] = wd
+        return True
+
+    def add_tree(self, path: Path) -> bool:
+        """watch a file, or a directory and its subdirectories. Return whether the root is watched."""
+        if path.is_file():
+            return self.add_watch(path)
+        if not self.add_watch(path):
+            return False
+        for root, dirs, _ in os.walk(path):
+            dirs[:] = [d for d in dirs if not d.startswith(".")]
+            for d in dirs:
+                self.add_watch(Path(root, d))
+        return True
+
+    def read(self) -> set[Path]:
+        """drain pending events. return touched paths."""
+        touched = set()
+        while True:
+            try:
+                buffer = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not buffer:
+                break
+            touched.update(self._parse(buffer))
+        return touched
+
+    def close(self) -> None:
+        if self.__fd >= 0:
+            os.close(self.__fd)
+        self.__fd = -1
+        self.__watches = {}
+        self.__paths = {}
+
+    def _parse(self, buffer: bytes) -> set[Path]:
+        touched, offset = set(), 0
+        while offset + EVENT_HEADER.size <= len(buffer):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(buffer, offset)
+            offset += EVENT_HEADER.size
+            name = buffer[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.overflowed = True
+                continue
+
+            directory = self.__watches.get(wd, None)
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                self.__watches.pop(wd, None)
+                self.__paths.pop(directory, None)
+                self.ignored.add(directory)
+                continue
+
+            path = directory.joinpath(os.fsdecode(name)) if name else directory
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                self.add_tree(path)
+            touched.add(path)
+        return touched
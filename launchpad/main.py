@@ -8,6 +8,7 @@ from sanic.log import LOGGING_CONFIG_DEFAULTS
 from typing import Any, Optional
 
 from launchpad.watcher import LaunchpadWatcher
+from launchpad.state import WatcherState
 from launchpad.authentication import Authenticator
 from launchpad.temporal.temporal_server import TemporalServersManager
 from launchpad.parsers import get_config
@@ -20,6 +21,7 @@ from launchpad.routes.login import loginbp
 
 from launchpad.listeners import (
     start_watcher,
+    close_watcher,
     on_start_deploy_workers,
     on_start_deploy_tasks
 )
@@ -102,17 +104,42 @@ class Launchpad(object):
     ) -> None:
         # -- WATCHER
         if watcher is None:
-            modules, polling = {}, {}
+            modules, polling, history, payloads_cache_size, codes_cache_size, state = {}, {}, {}, None, None, None
         else:
             modules = watcher.get("modules", {})
             polling = watcher.get("polling", {})
+            history = watcher.get("history", {})
+            payloads_cache_size = watcher.get("payloads_cache_size", None)
+            codes_cache_size = watcher.get("codes_cache_size", None)
+            state = watcher.get("state", None)
         polling_interval = polling.get("polling_interval", None)
         automatic_refresh = polling.get("automatic_refresh", None)
-        launchpad_watcher = LaunchpadWatcher.initialize(**modules)
+        rehash_interval = polling.get("rehash_interval", None)
+        backend = polling.get("backend", None)
+        launchpad_watcher = LaunchpadWatcher.initialize(
+            state=WatcherState(state) if state is not None else None,
+            **modules
+        )
+        if payloads_cache_size is not None:
+            launchpad_watcher.set_payloads_cache_size(payloads_cache_size)
+        if codes_cache_size is not None:
+            launchpad_watcher.set_codes_cache_size(codes_cache_size)
+        if history:
+            launchpad_watcher.set_history(history.get("size", None), history.get("spill", None))
         if polling_interval is not None:
             launchpad_watcher.set_polling_interval(polling_interval)
+        if polling.get("groups", None):
+            launchpad_watcher.set_groups_intervals(polling["groups"])
+        if polling.get("adaptive", False):
+            launchpad_watcher.set_adaptive(True, polling.get("max_interval", None))
+        if rehash_interval is not None:
+            launchpad_watcher.set_rehash_interval(rehash_interval)
+        if backend is not None:
+            launchpad_watcher.set_backend(backend, polling.get("debounce", None))
         if automatic_refresh is not None:
             launchpad_watcher.update_automatic_refresh(automatic_refresh)
+        if polling.get("restart_workers", None) is not None:
+            launchpad_watcher.update_workers_restart(polling["restart_workers"])
 
         launchpad_watcher._initialize_temporal_objects(__name__)
         self.app.ctx.watcher = launchpad_watcher
@@ -121,6 +148,7 @@ class Launchpad(object):
 
         if polling.get("on_server_start", False):
             self.app.register_listener(start_watcher, "after_server_start")
+        self.app.register_listener(close_watcher, "after_server_stop")
 
 
         # -- AUTHENTICATOR
@@ -142,6 +170,7 @@ class Launchpad(object):
             workers= launchpad_watcher.workers()
         )
         self.app.ctx.temporal = temporal_manager
+        launchpad_watcher.persist()
         self.app.register_listener(on_start_deploy_workers, "after_server_start", priority=100)
         self.app.register_listener(on_start_deploy_tasks, "after_server_start", priority=99)
 
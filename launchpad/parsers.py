@@ -1,4 +1,5 @@
 import os
+import re
 import json
 from pathlib import Path
 from attrs import define, field, validators
@@ -19,6 +20,41 @@ def parse_yaml(fp: str|Path) -> Payload:
     payload = map_env(payload)
     return payload
 
+def load_yaml(content: str | bytes) -> Payload:
+    payload = yaml.load(content, SafeLoader)
+    payload = map_env(payload)
+    return payload
+
+DOCUMENT_START = re.compile(rb"^---(?=[ \t\r\n]|$)", re.MULTILINE)
+
+def _blank_document(source: bytes) -> bool:
+    """True when every line is blank, a comment, a directive, or a bare `---` / `...` marker."""
+    for line in source.splitlines():
+        line = line.strip()
+        if line[:3] in (b"---", b"..."):
+            line = line[3:].lstrip()
+        if line and not line.startswith((b"#", b"%")):
+            return False
+    return True
+
+def split_yaml_documents(content: bytes) -> list[bytes]:
+    """
+    split a yaml stream on `---` markers, without parsing it.
+    Leading directives and comments are kept with the next document. Empty documents are dropped.
+    """
+    starts = [m.start() for m in DOCUMENT_START.finditer(content) if m.start() > 0]
+    documents, pending = [], b""
+    for start, end in zip([0] + starts, starts + [len(content)]):
+        source = pending + content[start:end]
+        if _blank_document(source):
+            pending = b"" if DOCUMENT_START.search(source) else source
+            continue
+        documents.append(source)
+        pending = b""
+    if pending and documents:
+        documents[-1] += pending
+    return documents
+
 def parse_config(config: Payload) -> Payload:
     env = os.environ.get("ENV", "development")
     main_config = config.get("app", None)
@@ -96,6 +132,16 @@ def convert_int(value: str | None) -> int | None:
     else:
         raise ValueError()
 
+def convert_labels(value: str | list[str] | None) -> list[str] | None:
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return [label.strip() for label in value.split(",") if label.strip()]
+    elif isinstance(value, list):
+        return [str(label) for label in value]
+    else:
+        raise ValueError()
+
 @define(slots=False, kw_only=True)
 class ParamsParser:
     # temporal gui ; schedules
@@ -105,11 +151,29 @@ class ParamsParser:
     # DYNAMIC arguments setting.
     overwrite: dict[str, Any] | None = field(default=None)
     template_args: dict[str, Any] | None = field(default=None)
+    variants: list[dict[str, Any]] | None = field(default=None)
 
     # watcher route
     polling_interval: int | None = field(default=None, converter=convert_int)
     changed: bool | None = field(default=False)
     unchanged: bool | None = field(default=False)
+    versions: int | None = field(default=None, converter=convert_int)
+
+    # watcher pins
+    group: str | None = field(default=None)
+    module: str | None = field(default=None)
+    version: str | None = field(default=None)
+
+    # settings listing filters & pagination
+    runner: str | None = field(default=None)
+    server: str | None = field(default=None)
+    namespace: str | None = field(default=None)
+    task_queue: str | None = field(default=None)
+    workflow: str | None = field(default=None)
+    labels: list[str] | None = field(default=None, converter=convert_labels)
+    offset: int | None = field(default=None, converter=convert_int)
+    limit: int | None = field(default=None, converter=convert_int)
+    status: str | None = field(default=None)
 
     def get_kwargs(self, f: Callable) -> dict[str, Any]:
         """match function params with parsed params. Return all non null params used by the function."""
@@ -66,10 +66,10 @@ async def start_worker(request: Request, task_queue: str):
 
 @workersbp.route("/restart/<task_queue: str>", methods=["GET", "POST"])
 @protected("user")
-async def restart_worker(request: Request, server_name: str, namespace_name: str, task_queue: str):
+async def restart_worker(request: Request, task_queue: str):
     """json:: server_name; namespace_name"""
     temporal: TemporalServersManager = request.app.ctx.temporal
-    await temporal.restart_worker(task_queue, request.app, **request.json)
+    await temporal.restart_worker(task_queue, request.app, **(request.json or {}))
     return json({"status":200, "reasons": "OK", "data": {"restarted": task_queue}}, status=200)
 
 
@@ -78,5 +78,5 @@ async def restart_worker(request: Request, server_name: str, namespace_name: str
 async def stop_worker(request: Request, task_queue: str):
     """json:: server_name; namespace_name"""
     temporal: TemporalServersManager = request.app.ctx.temporal
-    await temporal.stop_worker(task_queue, request.app, **request.json)
+    await temporal.stop_worker(task_queue, request.app, **(request.json or {}))
     return json({"status":200, "reasons": "OK", "data": {"stopped": task_queue}}, status=200)
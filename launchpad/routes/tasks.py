@@ -21,8 +21,23 @@ schedulesbp = Blueprint("schedulesbp", url_prefix="/schedules")
 @protected("user")
 async def ls_deployments(request: Request):
     temporal: TemporalServersManager = request.app.ctx.temporal
-    tasks_settings = temporal.settings.tasks
-    return json({"status":200, "reasons": "OK", "data": tasks_settings}, status=200)
+    params = request.ctx.params
+    store = temporal.settings.tasks
+    total, tasks_settings = store.query(
+        offset=params.offset or 0,
+        limit=params.limit,
+        labels=params.labels or [],
+        **{field: getattr(params, field, None) for field in store.indexes.keys()}
+    )
+    return json({"status":200, "reasons": "OK", "total": total, "data": tasks_settings}, status=200)
+
+@tasksbp.get("/deployments")
+@protected("user")
+async def deployments_report(request: Request):
+    temporal: TemporalServersManager = request.app.ctx.temporal
+    params = request.ctx.params
+    report = temporal.deployments.as_json(offset=params.offset or 0, limit=params.limit, status=params.status)
+    return json({"status":200, "reasons": "OK", "data": report}, status=200)
 
 @tasksbp.route("/deploy/<name:str>", methods=["GET", "POST"])
 @protected("user")
@@ -32,6 +47,14 @@ async def deploy(request: Request, name: str):
     await temporal.deploy_task(name, request.app, **params)
     return json({"status":200, "reasons": "OK", "data":{"deployed": name}},status=200)
 
+@tasksbp.post("/deploy_variants/<name:str>")
+@protected("user")
+async def deploy_variants(request: Request, name: str):
+    temporal: TemporalServersManager = request.app.ctx.temporal
+    params = request.ctx.params.get_kwargs(temporal.deploy_task_variants)
+    deployed = await temporal.deploy_task_variants(name, request.app, **params)
+    return json({"status":200, "reasons": "OK", "data":{"deployed": name, "variants": deployed}},status=200)
+
 @tasksbp.route('/signal/<server_name:str>/<namespace:str>/<workflow_name:str>/<workflow_id:str>/<signal_name:str>', methods=["GET", "POST"])
 @protected("user")
 async def signal(request: Request, server_name: str, namespace: str, workflow_name: str, workflow_id: str, signal_name: str):
@@ -1,5 +1,7 @@
 
 
+import asyncio
+from functools import partial
 from sanic import Blueprint
 from sanic import Request
 from sanic.response import json
@@ -8,25 +10,28 @@ from launchpad.tasks import watcher_watch
 from launchpad.watcher import LaunchpadWatcher
 
 from launchpad.authentication import protected
+from launchpad.exceptions import ModulesUpdateRejected
 
 watcherbp = Blueprint("watcherbp", url_prefix="/watcher")
 
 @watcherbp.get("/modules")
 @protected("user")
 async def modules(request: Request):
+    """:query: changed; unchanged; versions (int) number of latest versions returned per module"""
     args = {k:True for k,_ in request.get_query_args(keep_blank_values=True)}
     changed = args.get("changed", False)
     unchanged = args.get("unchanged", False)
     if changed and unchanged:
         changed, unchanged = False, False
 
+    versions = request.ctx.params.versions
     watcher: LaunchpadWatcher = request.app.ctx.watcher
     if not any([changed, unchanged]):
-        references = {k:[m.as_json() for m in v.modules.values()] for k,v in watcher.groups.items()}
+        references = {k:[m.as_json(versions) for m in v.modules.values()] for k,v in watcher.groups.items()}
     elif changed:
-        references = {k:[m.as_json() for m in v.modules.values() if m.changes] for k,v in watcher.groups.items()}
+        references = {k:[m.as_json(versions) for m in v] for k,v in watcher.changed_modules.items()}
     elif unchanged:
-        references = {k:[m.as_json() for m in v.modules.values() if m.changes is False] for k,v in watcher.groups.items()}
+        references = {k:[m.as_json(versions) for m in v] for k,v in watcher.unchanged_modules.items()}
     else:
         references = {}
     return json({"status":200, "reasons": "OK", "data": references}, status=200)
@@ -34,8 +39,10 @@ async def modules(request: Request):
 @watcherbp.get("/modules/<group:str>")
 @protected("user")
 async def group_modules(request: Request, group: str):
+    """:query: versions (int) number of latest versions returned per module"""
+    versions = request.ctx.params.versions
     watcher: LaunchpadWatcher = request.app.ctx.watcher
-    references = {group:[m.as_json() for m in watcher.get(group).modules.values()]}
+    references = {group:[m.as_json(versions) for m in watcher.get(group).modules.values()]}
     return json({"status":200, "reasons": "OK", "data": references}, status=200)
 
 @watcherbp.get("/polling")
@@ -45,7 +52,13 @@ async def get_pooler(request: Request):
     alive = False
     if request.app.get_task("watch", raise_exception=False) is not None:
         alive = True
-    data = {"alive": alive, "polling_interval": watcher.polling_interval, "automatic_refresh": watcher.automatic_refresh}
+    data = {
+        "alive": alive,
+        "polling_interval": watcher.polling_interval,
+        "automatic_refresh": watcher.automatic_refresh,
+        "adaptive": watcher.adaptive,
+        "groups": watcher.schedule
+    }
     return json({"status":200, "reasons": "OK", "data": data}, status=200)
 
 @watcherbp.get("/polling/stop")
@@ -98,24 +111,58 @@ async def toggle_refresh(request: Request):
 @protected("user")
 async def visit_all(request: Request):
     watcher: LaunchpadWatcher = request.app.ctx.watcher
-    changes = {k:{t:[p.name for p in m] for t,m in v.items()} for k,v in watcher.visit().items()}
+    visit = await watcher.async_visit()
+    changes = {k:{t:[p.name for p in m] for t,m in v.items()} for k,v in visit.items()}
     return json({"status":200, "reasons": "OK", "data": changes}, status=200)
 
 @watcherbp.get("/visit/<group:str>")
 @protected("user")
 async def visit_group(request: Request, group: str):
     watcher: LaunchpadWatcher = request.app.ctx.watcher
-    changes = {k:{t:[p.name for p in m] for t,m in v.items()} for k,v in watcher.visit(group).items()}
+    visit = await watcher.async_visit(group)
+    changes = {k:{t:[p.name for p in m] for t,m in v.items()} for k,v in visit.items()}
     return json({"status":200, "reasons": "OK", "data": changes}, status=200)
 
 @watcherbp.get("refresh")
 @protected("user")
 async def refresh_all(request: Request):
     watcher: LaunchpadWatcher = request.app.ctx.watcher
-    watcher.visit()
-    await watcher.update_app(request.app)
+    await watcher.async_visit()
+    errors = await watcher.update_app(request.app)
+    if errors:
+        raise ModulesUpdateRejected(errors)
     return json({"status":200, "reasons": "OK"}, status=200)
 
+@watcherbp.get("/generations")
+@protected("user")
+async def generations(request: Request):
+    """modules generations. Superseded generations still referenced are listed with their referrers."""
+    watcher: LaunchpadWatcher = request.app.ctx.watcher
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(None, partial(watcher.generations.collect, force=True))
+    data = await loop.run_in_executor(None, watcher.generations.report)
+    return json({"status":200, "reasons": "OK", "data": data}, status=200)
+
+@watcherbp.post("/pin")
+@protected("user")
+async def pin(request: Request):
+    """json:: module and version | group. A group is pinned to the previous versions of its modules."""
+    params = request.ctx.params
+    watcher: LaunchpadWatcher = request.app.ctx.watcher
+    pinned = await watcher.pin(request.app, group=params.group, module=params.module, version=params.version)
+    data = {str(p):{"pinned": v, "loaded": watcher.get_module(p).loaded} for p, v in pinned.items()}
+    return json({"status":200, "reasons": "OK", "data": data}, status=200)
+
+@watcherbp.post("/unpin")
+@protected("user")
+async def unpin(request: Request):
+    """json:: module | group"""
+    params = request.ctx.params
+    watcher: LaunchpadWatcher = request.app.ctx.watcher
+    modules = await watcher.unpin(request.app, group=params.group, module=params.module)
+    data = {str(m.module):{"pinned": m.pinned, "loaded": m.loaded} for m in modules}
+    return json({"status":200, "reasons": "OK", "data": data}, status=200)
+
 
 @watcherbp.post("/add/<group:str>")
 @protected("super user")
@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+import json
+import pickle
+import threading
+from pathlib import Path
+from sqlite3 import Cursor, Row, connect
+
+from typing import Any, Sequence, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from launchpad.watcher import Module
+
+Payload = dict[str, Any]
+Signature = tuple[Any, ...]
+
+
+class WatcherState(object):
+    """
+    sqlite store of the watcher modules states.
+    Per path: stat, content hash, historics. Parsed yaml payloads are stored per content hash,
+    of the file or of each document of multi-documents files.
+    Modules whose stat still match on restart are restored without being hashed nor parsed.
+    Payloads are pickled, so yaml keys and values keep their types (int keys, dates...).
+    """
+    __saved: dict[str, Signature]
+
+    def __init__(self, db: str | Path = ":memory:") -> None:
+        self.con = connect(db, check_same_thread=False)
+        self.con.row_factory = self._row_factory
+        self.__lock = threading.Lock()
+        self.__saved = {}
+        self._tables()
+        self._load_signatures()
+
+    def get(self, path: Path) -> Payload | None:
+        with self.__lock:
+            row = self.con.execute(
+                "SELECT mtime_ns, size, ino, version, historics FROM modules WHERE path=?;", [str(path)]
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "stat": (row["mtime_ns"], row["size"], row["ino"]),
+            "version": row["version"],
+            "historics": json.loads(row["historics"])
+        }
+
+    def get_payload(self, version: str) -> Any | None:
+        with self.__lock:
+            row = self.con.execute("SELECT payload FROM payloads WHERE version=?;", [version]).fetchone()
+        if row is None:
+            return None
+        return self._loads(row["payload"])
+
+    def get_documents(self, path: Path) -> list[tuple[str, Any]]:
+        """(version, payload) of the stored documents of a multi-documents file."""
+        with self.__lock:
+            rows = self.con.execute(
+                "SELECT p.version, p.payload FROM documents d JOIN payloads p ON d.version = p.version WHERE d.path=?;",
+                [str(path)]
+            ).fetchall()
+        documents = [(row["version"], self._loads(row["payload"])) for row in rows]
+        return [(version, payload) for version, payload in documents if payload is not None]
+
+    def save(self, modules: Sequence[Module]) -> None:
+        """upsert modules whose state moved since the last save. Remove the others."""
+        rows, payloads, documents, seen = [], [], [], set()
+        for module in modules:
+            path = str(module.module)
+            seen.add(path)
+            cached_payloads = getattr(module, "cached_payloads", None)
+            cached = cached_payloads() if cached_payloads is not None else []
+            signature = (module.last_stat, module.latest, frozenset([version for version, _ in cached]))
+            if self.__saved.get(path, None) == signature:
+                continue
+            self.__saved[path] = signature
+            rows.append([path, *module.last_stat, module.latest, json.dumps(module.historics)])
+            for version, payload in cached:
+                try:
+                    payloads.append([version, pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL)])
+                except (pickle.PicklingError, TypeError, AttributeError):
+                    # not picklable. parsed again on restart.
+                    continue
+                if version != module.latest:
+                    documents.append([path, version])
+
+        removed = [[p] for p in set(self.__saved.keys()) - seen]
+        [self.__saved.pop(p) for p, in removed]
+        if not rows and not removed:
+            return
+
+        with self.__lock:
+            self.con.executemany(
+                "INSERT OR REPLACE INTO modules(path, mtime_ns, size, ino, version, historics) VALUES (?, ?, ?, ?, ?, ?);",
+                rows
+            )
+            self.con.executemany("INSERT OR REPLACE INTO payloads(version, payload) VALUES (?, ?);", payloads)
+            self.con.executemany("DELETE FROM documents WHERE path=?;", [[row[0]] for row in rows] + removed)
+            self.con.executemany("INSERT OR REPLACE INTO documents(path, version) VALUES (?, ?);", documents)
+            self.con.executemany("DELETE FROM modules WHERE path=?;", removed)
+            self.con.execute(
+                """
+                DELETE FROM payloads
+                WHERE version NOT IN (SELECT version FROM modules) AND version NOT IN (SELECT version FROM documents);
+                """
+            )
+            self.con.commit()
+
+    def close(self) -> None:
+        self.con.close()
+
+    def _load_signatures(self) -> None:
+        rows = self.con.execute(
+            """
+            SELECT m.path, m.mtime_ns, m.size, m.ino, m.version, p.version IS NOT NULL AS payload
+            FROM modules m LEFT JOIN payloads p ON m.version = p.version;
+            """
+        ).fetchall()
+        documents = {}
+        for row in self.con.execute("SELECT d.path, d.version FROM documents d JOIN payloads p ON d.version = p.version;"):
+            documents.setdefault(row["path"], set()).add(row["version"])
+        for row in rows:
+            stat = (row["mtime_ns"], row["size"], row["ino"])
+            versions = set([row["version"]]) if row["payload"] else documents.get(row["path"], set())
+            self.__saved[row["path"]] = (stat, row["version"], frozenset(versions))
+
+    def _tables(self) -> None:
+        self.con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS modules
+            (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER,
+                size INTEGER,
+                ino INTEGER,
+                version TEXT,
+                historics TEXT
+            );
+            """
+        )
+        self.con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS documents
+            (
+                path TEXT,
+                version TEXT,
+                PRIMARY KEY (path, version)
+            );
+            """
+        )
+        self.con.execute(
+            """
+            CREATE TABLE IF NOT EXISTS payloads
+            (
+                version TEXT PRIMARY KEY,
+                payload BLOB
+            );
+            """
+        )
+        self.con.commit()
+
+    @staticmethod
+    def _loads(payload: Any) -> Any | None:
+        """unpickle a stored payload. Payloads of previous formats are dropped and parsed again."""
+        if not isinstance(payload, bytes):
+            return None
+        try:
+            return pickle.loads(payload)
+        except (pickle.UnpicklingError, EOFError, ValueError, TypeError):
+            return None
+
+    @staticmethod
+    def _row_factory(cursor: Cursor, row: Row) -> Payload:
+        fields = [column[0] for column in cursor.description]
+        return {key: value for key, value in zip(fields, row)}
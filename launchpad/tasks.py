@@ -8,4 +8,4 @@ from launchpad.watcher import LaunchpadWatcher
 
 async def watcher_watch(app: Sanic):
     watcher: LaunchpadWatcher = app.ctx.watcher
-    await watcher.poll(app)
+    await watcher.watch(app)
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+from datetime import timedelta
+
+from temporalio.client import Client
+from temporalio.service import ConnectConfig, ServiceClient
+
+from typing import Any, Callable
+
+logger = logging.getLogger("temporal")
+
+
+class TemporalConnection(object):
+    """
+    one long lived channel to a temporal server, shared by namespace scoped clients.
+    Connected lazily on first use. Once the last health check is older than `health_interval`,
+    the channel is checked again before being handed out, and replaced when unhealthy.
+    """
+    health_interval: float = 30
+    health_timeout: float = 5
+    __service: ServiceClient | None
+    __clients: dict[str, Client]
+    __checked: float
+    connects: int
+
+    def __init__(self, config: Callable[[], ConnectConfig]) -> None:
+        self.__config = config
+        self.__service = None
+        self.__clients = {}
+        self.__checked = 0.0
+        self.__lock = asyncio.Lock()
+        self.connects = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.__service is not None
+
+    async def service(self) -> ServiceClient:
+        service = self.__service
+        if service is not None and time.monotonic() - self.__checked < self.health_interval:
+            return service
+        async with self.__lock:
+            if self.__service is not None and time.monotonic() - self.__checked >= self.health_interval:
+                if not await self._healthy(self.__service):
+                    logger.warning(f"[{self.__config().target_host}] connection unhealthy. reconnecting.")
+                    self.close()
+            if self.__service is None:
+                self.__service = await ServiceClient.connect(self.__config())
+                self.connects += 1
+            self.__checked = time.monotonic()
+            return self.__service
+
+    async def client(self, namespace: str = "default") -> Client:
+        service = await self.service()
+        client = self.__clients.get(namespace, None)
+        if client is None or client.service_client is not service:
+            client = Client(service, namespace=namespace)
+            self.__clients[namespace] = client
+        return client
+
+    def close(self) -> None:
+        """drop the channel and its clients. The next call reconnects."""
+        self.__service = None
+        self.__clients = {}
+        self.__checked = 0.0
+
+    def info(self) -> dict[str, Any]:
+        return {
+            "connected": self.connected,
+            "connects": self.connects,
+            "namespaces": list(self.__clients.keys())
+        }
+
+    async def _healthy(self, service: ServiceClient) -> bool:
+        try:
+            return await service.check_health(timeout=timedelta(seconds=self.health_timeout))
+        except Exception:
+            return False
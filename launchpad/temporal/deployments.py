@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import time
+import asyncio
+import logging
+from attrs import define, field
+from types import MappingProxyType
+from collections.abc import Mapping
+
+from typing import Any, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from temporalio.client import Client
+
+logger = logging.getLogger("temporal")
+
+Kind = str
+
+
+class RateLimiter(object):
+    """token bucket: `rate` acquisitions per second, allowing bursts of `burst`."""
+    __tokens: float
+    __refilled: float
+
+    def __init__(self, rate: float, burst: int | None = None) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive.")
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.__tokens = float(self.burst)
+        self.__refilled = time.monotonic()
+
+    async def acquire(self) -> None:
+        while True:
+            now = time.monotonic()
+            self.__tokens = min(self.burst, self.__tokens + (now - self.__refilled) * self.rate)
+            self.__refilled = now
+            if self.__tokens >= 1:
+                self.__tokens -= 1
+                return
+            await asyncio.sleep((1 - self.__tokens) / self.rate)
+
+
+@define(slots=False)
+class Deployment:
+    kind: Kind
+    name: str
+    server: str | None = field(default=None)
+    status: str = field(default="pending")
+    started: float | None = field(default=None)
+    duration: float | None = field(default=None)
+    error: str | None = field(default=None)
+
+    def as_json(self) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "name": self.name,
+            "server": self.server,
+            "status": self.status,
+            "duration": None if self.duration is None else round(self.duration, 5),
+            "error": self.error
+        }
+
+
+@define(frozen=True)
+class DeploymentPlan:
+    """
+    a task deployment resolved once: runner instance, workflow class and prepared runner arguments.
+    Valid while its settings entry and the temporal objects it resolved stay the same.
+    """
+    name: str
+    source: Mapping[str, Any] = field(eq=False, repr=False)
+    runner: Any = field(eq=False)
+    kwargs: Mapping[str, Any] = field(eq=False, repr=False, converter=MappingProxyType)
+    objects: tuple[Any, ...] = field(eq=False, repr=False)
+    server: str | None = field(default=None)
+    namespace: str | None = field(default=None)
+
+    def valid(self, source: Mapping[str, Any] | None, objects: tuple[Any, ...]) -> bool:
+        return source is self.source and all(a is b for a, b in zip(objects, self.objects))
+
+    async def deploy(self, client: Client) -> None:
+        await self.runner(**self.kwargs, client=client)
+
+
+class DeploymentReport(object):
+    """
+    progress of the deployments run at server start, per task and worker.
+    Ready once every started kind of deployments is over.
+    """
+    statuses = ("pending", "running", "deployed", "skipped", "failed")
+    __deployments: dict[tuple[Kind, str], Deployment]
+    __running: set[Kind]
+    started: float | None
+    finished: float | None
+
+    def __init__(self) -> None:
+        self.__deployments = {}
+        self.__running = set()
+        self.started = None
+        self.finished = None
+
+    @property
+    def ready(self) -> bool:
+        return self.started is not None and not self.__running
+
+    @property
+    def deployments(self) -> list[Deployment]:
+        return list(self.__deployments.values())
+
+    def begin(self, kind: Kind, deployments: list[tuple[str, str | None]]) -> list[Deployment]:
+        if self.started is None:
+            self.started = time.monotonic()
+        self.__running.add(kind)
+        self.finished = None
+        entries = [Deployment(kind, name, server) for name, server in deployments]
+        self.__deployments.update({(kind, d.name): d for d in entries})
+        return entries
+
+    def end(self, kind: Kind) -> None:
+        self.__running.discard(kind)
+        if not self.__running:
+            self.finished = time.monotonic()
+        logger.info(f"[Deployments] {kind}: {self._counts(kind)} in {self._elapsed(kind)}s")
+
+    def run(self, deployment: Deployment) -> None:
+        deployment.status = "running"
+        deployment.started = time.monotonic()
+
+    def done(self, deployment: Deployment, status: str = "deployed", error: str | None = None) -> None:
+        deployment.status = status
+        deployment.error = error
+        deployment.duration = time.monotonic() - (deployment.started or time.monotonic())
+
+    def summary(self) -> dict[str, Any]:
+        kinds = sorted(set([kind for kind, _ in self.__deployments.keys()]))
+        elapsed = None
+        if self.started is not None:
+            elapsed = round((self.finished or time.monotonic()) - self.started, 5)
+        return {
+            "ready": self.ready,
+            "elapsed": elapsed,
+            **{kind: self._counts(kind) for kind in kinds}
+        }
+
+    def as_json(self, offset: int = 0, limit: int | None = None, status: str | None = None) -> dict[str, Any]:
+        deployments = [d for d in self.__deployments.values() if status is None or d.status == status]
+        stop = None if limit is None else offset + limit
+        return {
+            **self.summary(),
+            "total": len(deployments),
+            "deployments": [d.as_json() for d in deployments[offset:stop]]
+        }
+
+    def _counts(self, kind: Kind) -> dict[str, int]:
+        counts = {status: 0 for status in self.statuses}
+        for (k, _), deployment in self.__deployments.items():
+            if k == kind:
+                counts[deployment.status] += 1
+        return counts
+
+    def _elapsed(self, kind: Kind) -> float:
+        deployments = [d for (k, _), d in self.__deployments.items() if k == kind and d.started is not None]
+        if not deployments:
+            return 0.0
+        start = min([d.started for d in deployments]) # type: ignore
+        end = max([d.started + (d.duration or 0) for d in deployments]) # type: ignore
+        return round(end - start, 5)
@@ -3,7 +3,7 @@ import sys
 from abc import ABC, abstractmethod
 from datetime import timedelta, datetime
 
-from temporalio.common import TypedSearchAttributes
+from temporalio.common import TypedSearchAttributes, RetryPolicy, WorkflowIDReusePolicy
 from temporalio.worker import Worker
 from temporalio.client import (
     Client,
@@ -21,6 +21,7 @@ from temporalio.client import (
 from typing import Any, Callable, TypedDict, TypeVar, Generic, Optional, Type, Mapping
 
 from launchpad.temporal.utils import (
+    parse_timedelta,
     parse_retry_policy,
     define_id_reuse_policy
 )
@@ -76,16 +77,37 @@ class Runner(ABC):
     async def __call__(self, *args: Any, **kwargs: Any) -> Any:
         return await self.run(*args, **kwargs)
 
-    def parse_timedeltas(self, /, **kwargs: Optional[TimedeltaArgs] | None) -> dict[str, timedelta]:
+    def parse_timedeltas(self, /, **kwargs: Optional[TimedeltaArgs] | timedelta | None) -> dict[str, timedelta]:
         timedeltas = {}
         for k,v in kwargs.items():
             if v is None:
                 continue
-            timedeltas.update({k: timedelta(**v)})
+            timedeltas.update({k: parse_timedelta(v)})
         return timedeltas
 
+    def prepare(self, **kwargs: Any) -> dict[str, Any]:
+        """
+        parse the `run` arguments ahead of the deploys, once per deployment plan.
+        `run` must accept both the raw and the prepared arguments. Custom runners may override it.
+        """
+        return dict(kwargs)
+
+    def _prepare_options(self, kwargs: dict[str, Any]) -> dict[str, Any]:
+        prepared = dict(kwargs)
+        for k, v in kwargs.items():
+            if v is not None and (k.endswith("_timeout") or k == "start_delay"):
+                prepared[k] = parse_timedelta(v)
+        if "retry_policy" in prepared:
+            prepared["retry_policy"] = parse_retry_policy(prepared)
+        if "id_reuse_policy" in prepared:
+            prepared["id_reuse_policy"] = define_id_reuse_policy(prepared)
+        return prepared
+
 
 class WorkflowRunner(Runner):
+    def prepare(self, **kwargs: Any) -> dict[str, Any]:
+        return self._prepare_options(kwargs)
+
     async def run(
         self,
         client: Client,
@@ -93,18 +115,18 @@ class WorkflowRunner(Runner):
         workflow_kwargs: list[Any],
         workflow_id: str,
         task_queue: str,
-        execution_timeout: Optional[TimedeltaArgs] | None = None,
-        run_timeout: Optional[TimedeltaArgs] | None = None,
-        task_timeout: Optional[TimedeltaArgs] | None = None,
-        id_reuse_policy: Optional[str] | None = None,
-        retry_policy: Optional[dict[str, Any]] | None = None,
+        execution_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        run_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        task_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        id_reuse_policy: Optional[str] | WorkflowIDReusePolicy | None = None,
+        retry_policy: Optional[dict[str, Any]] | RetryPolicy | None = None,
         cron_schedule: str = "",
         memo: Optional[dict[str, Any]] | None = None,
-        start_delay: Optional[TimedeltaArgs] | None = None,
+        start_delay: Optional[TimedeltaArgs] | timedelta | None = None,
         start_signal: str | None = None,
         start_signal_args: list[Any] = [],
         rpc_metadata: dict[str, str] = {},
-        rpc_timeout: Optional[TimedeltaArgs] | None = None,
+        rpc_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
         search_attributes: None = None,
         request_eager_start: bool = False
         ) -> None:
@@ -138,6 +160,9 @@ class WorkflowRunner(Runner):
         return await self.run(*args, **kwargs)
 
 class WorkflowRunnerWithTempWorker(Runner):
+    def prepare(self, **kwargs: Any) -> dict[str, Any]:
+        return self._prepare_options(kwargs)
+
     async def run(
         self,
         client: Client,
@@ -145,18 +170,18 @@ class WorkflowRunnerWithTempWorker(Runner):
         workflow_kwargs: dict[str, Any],
         workflow_id: str,
         task_queue: str,
-        execution_timeout: Optional[TimedeltaArgs] | None = None,
-        run_timeout: Optional[TimedeltaArgs] | None = None,
-        task_timeout: Optional[TimedeltaArgs] | None = None,
-        id_reuse_policy: Optional[str] | None = None,
-        retry_policy: Optional[dict[str, Any]] | None = None,
+        execution_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        run_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        task_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        id_reuse_policy: Optional[str] | WorkflowIDReusePolicy | None = None,
+        retry_policy: Optional[dict[str, Any]] | RetryPolicy | None = None,
         cron_schedule: str = "",
         memo: Optional[dict[str, Any]] | None = None,
-        start_delay: Optional[TimedeltaArgs] | None = None,
+        start_delay: Optional[TimedeltaArgs] | timedelta | None = None,
         start_signal: str | None = None,
         start_signal_args: list[Any] = [],
         rpc_metadata: dict[str, str] = {},
-        rpc_timeout: Optional[TimedeltaArgs] | None = None,
+        rpc_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
         search_attributes: None = None,
         request_eager_start: bool = False
         ) -> None:
@@ -195,6 +220,20 @@ class WorkflowRunnerWithTempWorker(Runner):
         return await self.run(*args, **kwargs)
 
 class ScheduledWorkflowRunner(Runner):
+    specs_args = ("intervals", "calendars", "crons", "skip", "start_at", "end_at", "jitter")
+    policy_args = ("catchup_window", "overlap", "pause_on_failure")
+    state_args = ("limited_actions", "note", "paused", "remaining_actions")
+
+    def prepare(self, **kwargs: Any) -> dict[str, Any]:
+        """parse the action options and prebuild the schedule spec, policy and state."""
+        prepared = self._prepare_options(kwargs)
+        specs = {k: prepared.pop(k) for k in self.specs_args if k in prepared}
+        policy = {k: prepared.pop(k) for k in self.policy_args if k in prepared}
+        state = {k: prepared.pop(k) for k in self.state_args if k in prepared}
+        prepared["spec"] = ScheduleSpec(**self._build_specs(**specs), time_zone_name=prepared.pop("tz", "Europe/Paris"))
+        prepared["policy"] = self._build_policy(**policy)
+        prepared["state"] = self._build_state(**state)
+        return prepared
 
     def _define_overlap(self, overlap: str | None = None) -> ScheduleOverlapPolicy:
         if overlap is None:
@@ -229,7 +268,7 @@ class ScheduledWorkflowRunner(Runner):
         if catchup_window is None:
             catchup_window_delta = timedelta(minutes=1)
         else:
-            catchup_window_delta = timedelta(**catchup_window)
+            catchup_window_delta = parse_timedelta(catchup_window)
 
         return SchedulePolicy(
             overlap=self._define_overlap(overlap),
@@ -251,7 +290,7 @@ class ScheduledWorkflowRunner(Runner):
         if intervals is not None:
             schedules = []
             for sched in intervals:
-                schedule = {k:timedelta(**v) for k,v in sched.items() if v is not None}
+                schedule = {k:parse_timedelta(v) for k,v in sched.items() if v is not None}
                 schedules.append(ScheduleIntervalSpec(**schedule))
             specs["intervals"] = schedules
 
@@ -292,7 +331,7 @@ class ScheduledWorkflowRunner(Runner):
         if end_at is not None:
             specs["start_at"] = datetime(**end_at)
         if jitter is not None:
-            specs["jitter"] = timedelta(**jitter)
+            specs["jitter"] = parse_timedelta(jitter)
         return specs
 
     async def run(
@@ -305,10 +344,10 @@ class ScheduledWorkflowRunner(Runner):
         workflow_id: str,
         task_queue: str,
         trigger_immediately: bool = False,
-        execution_timeout: Optional[TimedeltaArgs] | None = None,
-        run_timeout: Optional[TimedeltaArgs] | None = None,
-        task_timeout: Optional[TimedeltaArgs] | None = None,
-        retry_policy: Optional[dict[str, Any]] | None = None,
+        execution_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        run_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        task_timeout: Optional[TimedeltaArgs] | timedelta | None = None,
+        retry_policy: Optional[dict[str, Any]] | RetryPolicy | None = None,
         memo: Optional[dict[str, Any]] | None = None,
         #specs
         intervals: Optional[list[Intervals]] | None = None,
@@ -327,9 +366,31 @@ class ScheduledWorkflowRunner(Runner):
         limited_actions: bool = False,
         note: Optional[str] = None,
         paused: bool = False,
-        remaining_actions: int = 0
+        remaining_actions: int = 0,
+        #prepared
+        spec: ScheduleSpec | None = None,
+        policy: SchedulePolicy | None = None,
+        state: ScheduleState | None = None
         ) -> None:
 
+        if spec is None:
+            spec = ScheduleSpec(
+                **self._build_specs(intervals, calendars, crons, skip, start_at, end_at, jitter),
+                time_zone_name=tz
+            )
+        if policy is None:
+            policy = self._build_policy(
+                catchup_window=catchup_window,
+                overlap=overlap,
+                pause_on_failure=pause_on_failure
+            )
+        if state is None:
+            state = self._build_state(
+                limited_actions=limited_actions,
+                note=note,
+                paused=paused,
+                remaining_actions=remaining_actions
+            )
         timedeltas = self.parse_timedeltas(
             execution_timeout=execution_timeout,
             run_timeout=run_timeout,
@@ -350,28 +411,9 @@ class ScheduledWorkflowRunner(Runner):
                     typed_search_attributes= TypedSearchAttributes.empty,
                     **timedeltas
                 ),
-                spec=ScheduleSpec(**self._build_specs(
-                    intervals,
-                    calendars,
-                    crons,
-                    skip,
-                    start_at,
-                    end_at,
-                    jitter
-                    ),
-                    time_zone_name=tz
-                ),
-                policy=self._build_policy(
-                    catchup_window=catchup_window,
-                    overlap=overlap,
-                    pause_on_failure=pause_on_failure
-                ),
-                state= self._build_state(
-                    limited_actions=limited_actions,
-                    note=note,
-                    paused=paused,
-                    remaining_actions=remaining_actions
-                )
+                spec=spec,
+                policy=policy,
+                state=state
             ),
         )
 
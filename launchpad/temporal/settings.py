@@ -0,0 +1,231 @@
+from __future__ import annotations
+
+import json
+import threading
+from collections.abc import Mapping, Iterator, Iterable
+from itertools import islice
+from pathlib import Path
+from sqlite3 import connect
+
+from typing import Any, Callable
+
+from launchpad.exceptions import LaunchpadKeyError
+from launchpad.utils import freeze
+
+Payload = dict[str, Any]
+Name = str
+Posting = dict[Name, None]
+
+
+def _task_queue(settings: Payload) -> Any:
+    for section in ["workflow", "worker"]:
+        payload = settings.get(section, None)
+        if isinstance(payload, Mapping) and payload.get("task_queue", None) is not None:
+            return payload["task_queue"]
+    return None
+
+def _workflow(settings: Payload) -> Any:
+    payload = settings.get("workflow", None)
+    return payload.get("workflow", None) if isinstance(payload, Mapping) else None
+
+def _labels(settings: Payload) -> list[str]:
+    """`labels` as a list of tags, or a mapping indexed both as `key` and `key=value`."""
+    labels = settings.get("labels", None)
+    if isinstance(labels, Mapping):
+        return [str(k) for k in labels.keys()] + [f"{k}={v}" for k, v in labels.items()]
+    elif isinstance(labels, (list, tuple, set)):
+        return [str(label) for label in labels]
+    elif labels is not None:
+        return [str(labels)]
+    return []
+
+
+INDEXES: dict[str, Callable[[Payload], Any]] = {
+    "runner": lambda settings: settings.get("runner", None),
+    "server": lambda settings: settings.get("server", None),
+    "namespace": lambda settings: settings.get("namespace", None),
+    "task_queue": _task_queue,
+    "workflow": _workflow,
+}
+
+
+class SettingsStore(Mapping[Name, Payload]):
+    """
+    tasks or workers settings by name, with secondary indexes on runner, server, namespace,
+    task queue, workflow and labels. Entries are frozen. A refresh only reindex the entries whose content changed.
+    When a db is given, the entries and their indexed fields are mirrored into a sqlite table.
+    """
+    indexes: dict[str, Callable[[Payload], Any]] = INDEXES
+    __entries: dict[Name, Payload]
+    __keys: dict[Name, list[tuple[str, str]]]
+    __postings: dict[tuple[str, str], Posting]
+
+    def __init__(
+        self,
+        settings: Mapping[Name, Payload] | None = None,
+        db: str | Path | None = None,
+        kind: str = "tasks"
+    ) -> None:
+        self.__entries = {}
+        self.__keys = {}
+        self.__postings = {}
+        self.kind = kind
+        self.con = None
+        if db is not None:
+            self.con = connect(db, check_same_thread=False)
+            self.__lock = threading.Lock()
+            self._tables()
+        if settings is not None:
+            self.refresh(settings)
+
+    def __getitem__(self, name: Name) -> Payload:
+        return self.__entries[name]
+
+    def __iter__(self) -> Iterator[Name]:
+        return iter(self.__entries)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    def __repr__(self) -> str:
+        return f"<SettingsStore({self.kind}, {len(self)} entries)>"
+
+    def diff(self, settings: Mapping[Name, Payload], removed: Iterable[Name] | None = None) -> tuple[list[Name], list[Name]]:
+        """
+        names (changed, removed) a refresh with `settings` would return, or an update when `removed` is given.
+        The store is left untouched.
+        """
+        if removed is None:
+            removed = [name for name in self.__entries.keys() if name not in settings]
+        else:
+            removed = [name for name in removed if name in self.__entries and name not in settings]
+        changed = [
+            name for name, payload in settings.items()
+            if (entry := self.__entries.get(name, None)) is not payload and entry != payload
+        ]
+        return changed, removed
+
+    def update(self, settings: Mapping[Name, Payload], removed: Iterable[Name] = ()) -> tuple[list[Name], list[Name]]:
+        """partial refresh: add or replace the `settings` entries, drop the `removed` names. return the names (changed, removed)."""
+        changed, removed = self.diff(settings, removed)
+        self._apply(settings, changed, removed)
+        return changed, removed
+
+    def refresh(self, settings: Mapping[Name, Payload]) -> tuple[list[Name], list[Name]]:
+        """replace the store content. return the names (changed, removed)."""
+        changed, removed = self.diff(settings)
+        self._apply(settings, changed, removed)
+        return changed, removed
+
+    def _apply(self, settings: Mapping[Name, Payload], changed: list[Name], removed: list[Name]) -> None:
+        for name in removed:
+            self._unindex(name)
+            self.__entries.pop(name)
+        for name in changed:
+            self.__entries[name] = freeze(settings[name])
+            self._index(name)
+        if self.con is not None and (changed or removed):
+            self._mirror(changed, removed)
+
+    def select(self, labels: Iterable[str] = (), **filters: Any) -> Iterator[Name]:
+        """names matching every filter and label, in store order."""
+        postings = [self._posting(field, value) for field, value in filters.items() if value is not None]
+        postings += [self._posting("labels", label) for label in labels]
+        if not postings:
+            return iter(self.__entries)
+        postings.sort(key=len)
+        first, others = postings[0], postings[1:]
+        return (name for name in list(first) if all(name in posting for posting in others))
+
+    def query(
+        self,
+        offset: int = 0,
+        limit: int | None = None,
+        labels: Iterable[str] = (),
+        **filters: Any
+    ) -> tuple[int, dict[Name, Payload]]:
+        """(total matches, page of settings). Only the smallest matching index is walked."""
+        labels = list(labels)
+        if not labels and all(value is None for value in filters.values()):
+            stop = None if limit is None else offset + limit
+            return len(self), {name: self.__entries[name] for name in islice(self.__entries, offset, stop)}
+
+        total, page = 0, {}
+        for name in self.select(labels, **filters):
+            if total >= offset and (limit is None or len(page) < limit):
+                page[name] = self.__entries[name]
+            total += 1
+        return total, page
+
+    def values_of(self, field: str) -> dict[str, int]:
+        """indexed values of a field with their number of entries."""
+        if field not in self.indexes and field != "labels":
+            raise LaunchpadKeyError(f"settings are not indexed on {field}.")
+        return {value: len(posting) for (f, value), posting in self.__postings.items() if f == field and posting}
+
+    def close(self) -> None:
+        if self.con is not None:
+            self.con.close()
+        self.con = None
+
+    def _posting(self, field: str, value: Any) -> Posting:
+        if field not in self.indexes and field != "labels":
+            raise LaunchpadKeyError(f"settings are not indexed on {field}.")
+        return self.__postings.get((field, str(value)), {})
+
+    def _index(self, name: Name) -> None:
+        settings = self.__entries[name]
+        keys = [(field, str(value)) for field, f in self.indexes.items() if (value := f(settings)) is not None]
+        keys += [("labels", label) for label in _labels(settings)]
+        previous = self.__keys.get(name, [])
+        if keys == previous:
+            return
+        self._unindex(name)
+        for key in keys:
+            self.__postings.setdefault(key, {})[name] = None
+        self.__keys[name] = keys
+
+    def _unindex(self, name: Name) -> None:
+        for key in self.__keys.pop(name, []):
+            posting = self.__postings.get(key, {})
+            posting.pop(name, None)
+            if not posting:
+                self.__postings.pop(key, None)
+
+    def _mirror(self, changed: list[Name], removed: list[Name]) -> None:
+        rows = []
+        for name in changed:
+            settings = self.__entries[name]
+            fields = [None if (value := f(settings)) is None else str(value) for f in self.indexes.values()]
+            rows.append([self.kind, name, *fields, json.dumps(_labels(settings)), json.dumps(settings, default=str)])
+        with self.__lock:
+            self.con.executemany( # type: ignore
+                f"""
+                INSERT OR REPLACE INTO settings(kind, name, {', '.join(self.indexes.keys())}, labels, payload)
+                VALUES (?, ?, {', '.join(['?'] * len(self.indexes))}, ?, ?);
+                """,
+                rows
+            )
+            self.con.executemany("DELETE FROM settings WHERE kind=? AND name=?;", [[self.kind, n] for n in removed]) # type: ignore
+            self.con.commit() # type: ignore
+
+    def _tables(self) -> None:
+        columns = "".join([f"{field} TEXT, " for field in self.indexes.keys()])
+        self.con.execute( # type: ignore
+            f"""
+            CREATE TABLE IF NOT EXISTS settings
+            (
+                kind TEXT,
+                name TEXT,
+                {columns}
+                labels TEXT,
+                payload TEXT,
+                PRIMARY KEY (kind, name)
+            );
+            """
+        )
+        for field in self.indexes.keys():
+            self.con.execute(f"CREATE INDEX IF NOT EXISTS settings_{field} ON settings(kind, {field});") # type: ignore
+        # entries of a previous run are stale until the first refresh.
+        self.con.execute("DELETE FROM settings WHERE kind=?;", [self.kind]) # type: ignore
+        self.con.commit() # type: ignore
@@ -4,8 +4,8 @@ import os
 import logging
 import subprocess
 import signal
-import copy
-from collections.abc import Sequence, Mapping
+import asyncio
+from collections.abc import Sequence, Mapping, Iterable
 from types import SimpleNamespace
 from attr import validators
 from sanic import Sanic
@@ -23,12 +23,15 @@ from temporalio.api.workflowservice.v1 import RegisterNamespaceRequest, ListName
 from temporalio.api.operatorservice.v1 import DeleteNamespaceRequest
 from temporalio.api.errordetails.v1 import NamespaceAlreadyExistsFailure
 
-from typing import Any, Type, Coroutine
+from typing import Any, Type, Coroutine, Callable
 
 from launchpad.temporal.runners import Runner
+from launchpad.temporal.connections import TemporalConnection
+from launchpad.temporal.deployments import Deployment, DeploymentPlan, DeploymentReport, RateLimiter
+from launchpad.temporal.settings import SettingsStore
 from launchpad.temporal.workers import LaunchpadWorker
 from launchpad.utils import dyn_update, dyn_templating
-from launchpad.exceptions import (LaunchpadKeyError, LaunchpadValueError, SettingsError, MissingImportError)
+from launchpad.exceptions import (LaunchpadKeyError, LaunchpadValueError, SettingsError, MissingImportError, WorkerStartError)
 
 ServerAddress = str
 QueueName = str
@@ -62,7 +65,9 @@ class NameSpace:
     """
     name: str
     retention: int
+    startup_timeout: float = 30
     __workers: dict[QueueName, tuple[Type[LaunchpadWorker], AioTaskName]]
+    __restarts: int
 
     @property
     def workers(self):
@@ -72,6 +77,7 @@ class NameSpace:
         self.name = name
         self.retention = retention
         self.__workers = {}
+        self.__restarts = 0
 
     def __repr__(self) -> str:
         return f"<Namespace {self.name}: workers({str([name for name in self.workers.keys()])})>"
@@ -82,20 +88,51 @@ class NameSpace:
         self.__workers.update({worker.task_queue: tuple((worker, f"worker__{worker.task_queue}"))}) # type: ignore
 
     async def stop_workers(self, worker_name, app: Sanic) -> None:
-        await app.cancel_task(f"worker__{worker_name}", raise_exception=False)
-        self.__workers.pop(f"worker__{worker_name}", None)
+        _, task_name = self.__workers.pop(worker_name, (None, f"worker__{worker_name}"))
+        await app.cancel_task(task_name, raise_exception=False)
         app.purge_tasks()
 
     async def restart_workers(self, settings: dict[str, Any], app: Sanic) -> None:
+        """
+        rolling restart. The new worker is built and polls its task queue before the running one is cancelled,
+        so the task queue keeps being polled. A worker failing to build or to start leaves the running one untouched.
+        """
         worker = self._build_worker(settings)
-        await app.cancel_task(f"worker__{worker.task_queue}", raise_exception=False)
+        _, previous = self.__workers.get(worker.task_queue, (None, None))
+        self.__restarts += 1
+        task_name = f"worker__{worker.task_queue}__{self.__restarts}"
+        task = app.add_task(worker.run, name=task_name) # type: ignore
+        try:
+            await self._wait_started(worker, task)
+        except (WorkerStartError, asyncio.CancelledError):
+            await app.cancel_task(task_name, raise_exception=False)
+            app.purge_tasks()
+            raise
+        self.__workers.update({worker.task_queue: tuple((worker, task_name))}) # type: ignore
+        if previous is not None:
+            await app.cancel_task(previous, raise_exception=False)
         app.purge_tasks()
-        app.add_task(worker.run, name=f"worker__{worker.task_queue}") # type: ignore
-        self.__workers.update({worker.task_queue: tuple((worker, f"worker__{worker.task_queue}"))}) # type: ignore
+
+    async def _wait_started(self, worker: LaunchpadWorker, task: asyncio.Task | None) -> None:
+        """wait for the worker to poll. Workers without a `started` signal are trusted once scheduled."""
+        started = getattr(worker, "started", None)
+        if started is None or task is None:
+            return
+        waiter = asyncio.ensure_future(started.wait())
+        try:
+            await asyncio.wait([waiter, task], timeout=self.startup_timeout, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            waiter.cancel()
+        if started.is_set():
+            return
+        if task.done():
+            error = None if task.cancelled() else task.exception()
+            raise WorkerStartError(f"worker {worker.task_queue} stopped before polling: {error!r}")
+        raise WorkerStartError(f"worker {worker.task_queue} did not start polling within {self.startup_timeout}s.")
 
     async def close(self, app: Sanic):
-        for task_queue in self.workers.keys():
-            await app.cancel_task(f"worker__{task_queue}", raise_exception=False)
+        for _, task_name in self.workers.values():
+            await app.cancel_task(task_name, raise_exception=False)
         app.purge_tasks()
         self.__workers = {}
 
@@ -146,6 +183,9 @@ class TemporalServer:
     proxy: HttpConnectProxyConfig | None = field(default=None)
     api_key: str | None = field(default=None)
     runtime: Runtime =  RUNTIME
+    connection: TemporalConnection = field(init=False)
+    _registered: set[str] | None = field(init=False, default=None)
+    degraded: str | None = field(init=False, default=None)
 
     @property
     def address(self):
@@ -163,7 +203,7 @@ class TemporalServer:
     def workers(self) -> list[tuple[NameSpace, Type[LaunchpadWorker]]]:
         workers = []
         for namespace in self.namespaces.values():
-            for worker in namespace.workers.values():
+            for worker, _ in namespace.workers.values():
                 workers.append(tuple((namespace, worker)))
         return workers
 
@@ -171,6 +211,7 @@ class TemporalServer:
     def __attrs_post_init__(self) -> None:
         self.namespaces.update({"default": NameSpace("default", 604800)})
         self.default_namespace = self.namespaces.get("default") # type: ignore
+        self.connection = TemporalConnection(self._connect_config)
 
     def __repr__(self) -> str:
         return f"<Temporal {self.address} : Namespaces({self.namespaces_names_list})>"
@@ -185,57 +226,112 @@ class TemporalServer:
         namespaces: list[dict[str, Any]] | None = None,
         default_namespace: str | None = None,
         proxy: dict[str, Any] | None = None,
-        api_key: str | None = None
+        api_key: str | None = None,
+        timeout: float | None = None,
+        concurrency: int | None = None
     ) -> TemporalServer:
+        """
+        register the namespaces concurrently, at most `concurrency` at once.
+        A server whose namespaces listing or registrations do not answer within `timeout` seconds is marked as degraded instead of raising.
+        """
         server = cls(name, ip, port, gui_port)
-        if namespaces is not None:
+        if proxy is not None:
+            server.proxy = HttpConnectProxyConfig(**proxy)
+        if api_key is not None:
+            server.api_key = api_key
+        namespaces = namespaces or []
+        try:
+            await server._bootstrap(namespaces, timeout, concurrency)
+        except (asyncio.TimeoutError, RPCError, RuntimeError, SystemError, OSError) as e:
+            server.degraded = str(e) or type(e).__name__
+            logger.error(f"[Server: {name}] bootstrap failed, server marked as degraded: {server.degraded}")
             for settings in namespaces:
-                await server.add_namespace(**settings)
+                if settings["name"] not in server.namespaces:
+                    server.namespaces[settings["name"]] = NameSpace(settings["name"], settings.get("retention", 604800))
         if default_namespace is not None:
             default = server.namespaces.get(default_namespace, None)
             if default is None:
                 raise LaunchpadKeyError(f"{default_namespace} namespace not found in server {name}")
             server.default_namespace = default
-        if proxy is not None:
-            server.proxy = HttpConnectProxyConfig(**proxy)
-        if api_key is not None:
-            server.api_key = api_key
         return server
 
 
+    async def _bootstrap(
+        self,
+        namespaces: list[dict[str, Any]],
+        timeout: float | None = None,
+        concurrency: int | None = None
+    ) -> None:
+        if not namespaces:
+            return
+        try:
+            await asyncio.wait_for(self.registered_namespaces(), timeout)
+        except RPCError as e:
+            logger.warning(f"[Server: {self.name}] cannot list namespaces: {e.message}")
+
+        semaphore = asyncio.Semaphore(concurrency or len(namespaces))
+        async def register(settings: dict[str, Any]) -> None:
+            async with semaphore:
+                # timed once a slot is held: waiting on the other registrations is not a timeout.
+                await asyncio.wait_for(self.add_namespace(**settings), timeout)
+
+        results = await asyncio.gather(*[register(settings) for settings in namespaces], return_exceptions=True)
+        # keep the configured order.
+        names = ["default"] + [settings["name"] for settings in namespaces]
+        self.namespaces = {
+            **{n: self.namespaces[n] for n in names if n in self.namespaces},
+            **{n: ns for n, ns in self.namespaces.items() if n not in names}
+        }
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            raise errors[0]
+
     async def get_client(self, namespace: str = "default") -> Client:
-        # TODO: inject more args into Client.connect.
-        client = await Client.connect(
-            self.address,
-            namespace=namespace,
-            http_connect_proxy_config=self.proxy,
-            api_key=self.api_key,
-            runtime=self.runtime
-        )
-        return client
+        """namespace scoped client over the server pooled connection."""
+        return await self.connection.client(namespace)
 
     async def get_service(self) -> ServiceClient:
-        client = await ServiceClient.connect(
-            ConnectConfig(
-                target_host=self.address,
-                http_connect_proxy_config=self.proxy,
-                api_key=self.api_key,
-                runtime=self.runtime
-            )
-        )
-        return client
+        """the server pooled connection."""
+        return await self.connection.service()
+
+    async def registered_namespaces(self, refresh: bool = False) -> set[str]:
+        """names of the namespaces registered on the server. Listed once, then kept up to date by this server."""
+        if self._registered is None or refresh:
+            client = await self.get_service()
+            registered, token = set(), b""
+            while True:
+                response = await client.workflow_service.list_namespaces(
+                    ListNamespacesRequest(page_size=1000, next_page_token=token)
+                )
+                registered.update([namespace.namespace_info.name for namespace in response.namespaces])
+                token = response.next_page_token
+                if not token:
+                    break
+            self._registered = registered
+        return self._registered
 
     async def add_namespace(self, name: str, retention: int = 604800, **kwargs: Any) -> None:
+        if self.namespaces.get(name, None) is not None:
+            raise LaunchpadKeyError(f"{name} namespace already exist in server {self.name}")
+
         try:
-            await self._create_namespace(name, retention, **kwargs)
+            registered = await self.registered_namespaces()
         except RPCError as e:
-            if e.status == RPCStatusCode.ALREADY_EXISTS:
-                logger.warning(f"[Namespace: {name}] already exist.")
-            else:
-                raise SystemError("Namespace cannot be created")
+            logger.warning(f"[Server: {self.name}] cannot list namespaces: {e.message}")
+            registered = set()
 
-        if self.namespaces.get(name, None) is not None:
-            raise LaunchpadKeyError(f"{name} namespace already exist in server {self.name}")
+        if name in registered:
+            logger.warning(f"[Namespace: {name}] already exist.")
+        else:
+            try:
+                await self._create_namespace(name, retention, **kwargs)
+            except RPCError as e:
+                if e.status == RPCStatusCode.ALREADY_EXISTS and self._registered is not None:
+                    self._registered.add(name)
+                if e.status == RPCStatusCode.ALREADY_EXISTS:
+                    logger.warning(f"[Namespace: {name}] already exist.")
+                else:
+                    raise SystemError("Namespace cannot be created")
 
         namespace = NameSpace(name, retention)
         self.namespaces.update({name: namespace})
@@ -257,15 +353,26 @@ class TemporalServer:
         for namespace in self.namespaces.values():
             await namespace.close(app)
         self.namespaces = {}
+        self.connection.close()
 
     def info(self) -> dict[str, Any]:
         return {
             "name": self.name,
             "address": self.gui_address,
             "namespaces": [namespace.info() for namespace in self.namespaces.values()],
-            "default_namespace": self.default_namespace.info()
+            "default_namespace": self.default_namespace.info(),
+            "degraded": self.degraded,
+            "connection": self.connection.info()
         }
 
+    def _connect_config(self) -> ConnectConfig:
+        return ConnectConfig(
+            target_host=self.address,
+            http_connect_proxy_config=self.proxy,
+            api_key=self.api_key,
+            runtime=self.runtime
+        )
+
     async def _create_namespace(self, name: str, retention: int = 604800, **kwargs) -> None:
         client = await self.get_service()
         await client.workflow_service.register_namespace(
@@ -275,10 +382,14 @@ class TemporalServer:
                 **kwargs
             )
         )
+        if self._registered is not None:
+            self._registered.add(name)
 
     async def _delete_namespace(self, name: str) -> None:
         client = await self.get_service()
         await client.operator_service.delete_namespace(DeleteNamespaceRequest(namespace=name))
+        if self._registered is not None:
+            self._registered.discard(name)
 
 
 class TemporalServersManager:
@@ -294,6 +405,12 @@ class TemporalServersManager:
     default_server: TemporalServer
     settings: SimpleNamespace
     temporal_objects: SimpleNamespace
+    deployments: DeploymentReport
+    plans: dict[TaskName, DeploymentPlan]
+    plans_errors: dict[TaskName, str]
+    deploy_concurrency: int = 32
+    rate_limit: float | None = None
+    rate_limits: dict[ServerName, float]
 
     @property
     def servers(self) -> dict[ServerAddress, TemporalServer]:
@@ -307,9 +424,17 @@ class TemporalServersManager:
                 workers.append(tuple((server, namespace, worker)))
         return workers
 
-    def __init__(self) -> None:
+    def __init__(self, settings_db: str | None = None) -> None:
         self.__servers = {}
-        self.settings = SimpleNamespace(tasks = {}, workers = {})
+        self.settings = SimpleNamespace(
+            tasks=SettingsStore(db=settings_db, kind="tasks"),
+            workers=SettingsStore(db=settings_db, kind="workers")
+        )
+        self.deployments = DeploymentReport()
+        self.plans = {}
+        self.plans_errors = {}
+        self.rate_limits = {}
+        self.__limiters: dict[ServerName, RateLimiter | None] = {}
         self.temporal_objects = SimpleNamespace(
             activities={},
             workflows={},
@@ -328,11 +453,22 @@ class TemporalServersManager:
         workflows: Mapping[str, Type] | None = None,
         runners: Mapping[str, Type] | None = None,
         workers: Mapping[str, Type] | None = None,
+        settings_db: str | None = None,
+        bootstrap: dict[str, Any] | None = None,
+        deploy_on_start: dict[str, Any] | None = None,
     ) -> TemporalServersManager:
 
-        manager = cls()
-        for settings in servers:
-            await manager.add_server(settings)
+        manager = cls(settings_db)
+        manager.set_deploy_limits(**(deploy_on_start or {}))
+        bootstrap = bootstrap or {}
+        names = [settings.get("name", None) for settings in servers]
+        duplicates = set([name for name in names if names.count(name) > 1])
+        if duplicates:
+            raise LaunchpadKeyError(f"cannot set servers: {', '.join(map(str, duplicates))}. server names must be unique")
+        concurrency = bootstrap.get("concurrency", 8)
+        timeout = bootstrap.get("timeout", 30)
+        await asyncio.gather(*[manager.add_server(settings, timeout, concurrency) for settings in servers])
+        manager.__servers = {name: manager.servers[name] for name in names}
         if default_server is not None:
             default = manager.servers.get(default_server, None)
             if default is None:
@@ -345,23 +481,45 @@ class TemporalServersManager:
         else:
             raise SettingsError(f"You must set a default server.")
 
-        manager.refresh_settings(
-            tasks_settings=tasks_settings,
-            workers_settings=workers_settings
-        )
         manager.refresh_temporal_objects(
             activities=activities,
             workflows=workflows,
             runners=runners,
             workers=workers
         )
+        manager.refresh_settings(
+            tasks_settings=tasks_settings,
+            workers_settings=workers_settings
+        )
         return manager
 
     def info(self) -> dict[str, Any]:
         return {name:server.info() for name, server in self.servers.items()}
 
-    async def add_server(self, settings: dict[str, Any]) -> None:
-        server = await TemporalServer.initialize(**settings)
+    def set_deploy_limits(
+        self,
+        concurrency: int | None = None,
+        rate_limit: float | None = None,
+        rate_limits: Mapping[ServerName, float] | None = None
+    ) -> None:
+        """concurrent server start deployments, and deploys per second on each server (all, or by name)."""
+        if concurrency is not None:
+            self.deploy_concurrency = concurrency
+        if rate_limit is not None:
+            self.rate_limit = rate_limit
+        if rate_limits is not None:
+            self.rate_limits = dict(rate_limits)
+        self.__limiters = {}
+
+    async def add_server(
+        self,
+        settings: dict[str, Any],
+        timeout: float | None = None,
+        concurrency: int | None = None
+    ) -> None:
+        if self.servers.get(settings.get("name", None), None) is not None:
+            raise LaunchpadKeyError(f" cannot set server :{settings.get('name', None)}. server name already exist")
+        server = await TemporalServer.initialize(**settings, timeout=timeout, concurrency=concurrency)
         if self.servers.get(server.name, None) is not None:
             raise LaunchpadKeyError(f" cannot set server :{server.name}. server name already exist")
 
@@ -391,13 +549,138 @@ class TemporalServersManager:
             if name not in ["activities", "workflows", "runners", "workers"] or objects is None:
                 continue
             setattr(self.temporal_objects, name, objects)
+        self.compile_tasks()
+
+    def update_temporal_objects(self, recompile: bool = True, **delta: Mapping[str, Type] | Sequence[str] | None) -> None:
+        """
+        apply a partial update of the temporal objects.
+        `<kind>` entries are objects to add or update. `removed_<kind>` entries are names to remove.
+        `recompile` false leaves the stale plans to a later `compile_tasks`.
+        """
+        changed = False
+        for name in ["activities", "workflows", "runners", "workers"]:
+            updated = delta.get(name, None) or {}
+            removed = delta.get(f"removed_{name}", None) or []
+            if not updated and not removed:
+                continue
+            objects = dict(getattr(self.temporal_objects, name))
+            objects.update(updated) # type: ignore
+            [objects.pop(k, None) for k in removed]
+            setattr(self.temporal_objects, name, objects)
+            changed = True
+        if changed and recompile:
+            self.compile_tasks()
 
-    def refresh_settings(self, **settings: Mapping[str, Mapping[str, Any]] | None) -> None:
+    def refresh_settings(
+        self,
+        plans: Mapping[TaskName, DeploymentPlan] | None = None,
+        **settings: Mapping[str, Mapping[str, Any]] | None
+    ) -> None:
+        """:plans: plans compiled ahead against the same frozen settings. Adopted instead of compiled again."""
         for name, setting in settings.items():
             if name not in ["tasks_settings", "workers_settings"] or setting is None:
                 continue
             name = name.split("_")[0]
-            setattr(self.settings, name, setting)
+            changed, removed = getattr(self.settings, name).refresh(setting)
+            if name == "tasks":
+                self._refresh_plans(changed, removed, plans)
+
+    def update_settings(
+        self,
+        plans: Mapping[TaskName, DeploymentPlan] | None = None,
+        **delta: Mapping[str, Mapping[str, Any]] | Sequence[str] | None
+    ) -> None:
+        """
+        apply a partial update of the settings.
+        `<kind>_settings` entries are settings to add or update. `removed_<kind>` entries are names to remove.
+        :plans: plans compiled ahead against the same frozen settings. Adopted instead of compiled again.
+        """
+        for name in ["tasks", "workers"]:
+            changed, removed = getattr(self.settings, name).update(
+                delta.get(f"{name}_settings", None) or {},
+                delta.get(f"removed_{name}", None) or []
+            )
+            if name == "tasks":
+                self._refresh_plans(changed, removed, plans)
+
+    def _refresh_plans(
+        self,
+        changed: list[TaskName],
+        removed: list[TaskName],
+        plans: Mapping[TaskName, DeploymentPlan] | None = None
+    ) -> None:
+        for task_name in removed:
+            self.plans.pop(task_name, None)
+            self.plans_errors.pop(task_name, None)
+        for task_name, plan in (plans or {}).items():
+            if plan.source is self.settings.tasks.get(task_name, None):
+                self.plans[task_name] = plan
+                self.plans_errors.pop(task_name, None)
+        self.compile_tasks(changed)
+
+    def checkpoint(self) -> tuple[Any, ...]:
+        """temporal objects, settings and plans, as restored by `rollback`."""
+        return (
+            dict(vars(self.temporal_objects)),
+            {kind: dict(store) for kind, store in vars(self.settings).items()},
+            dict(self.plans),
+            dict(self.plans_errors)
+        )
+
+    def rollback(self, checkpoint: tuple[Any, ...]) -> None:
+        objects, settings, plans, errors = checkpoint
+        [setattr(self.temporal_objects, kind, value) for kind, value in objects.items()]
+        [getattr(self.settings, kind).refresh(entries) for kind, entries in settings.items()]
+        self.plans, self.plans_errors = plans, errors
+
+    def compile_tasks(self, task_names: Iterable[TaskName] | None = None) -> None:
+        """
+        (re)compile the deployment plans of tasks, all by default. Up to date plans are kept.
+        Templates are compiled on their first deploy. Errors are logged and kept in `plans_errors`.
+        """
+        for task_name in self.settings.tasks.keys() if task_names is None else task_names:
+            if self.settings.tasks[task_name].get("template", False):
+                continue
+            try:
+                self.get_task_plan(task_name)
+            except (SettingsError, LaunchpadKeyError, MissingImportError) as e:
+                logger.error(f"[Task: {task_name}] cannot be compiled: {str(e)}")
+
+    def precompile(
+        self,
+        tasks_settings: Mapping[TaskName, Mapping[str, Any]]
+    ) -> tuple[dict[TaskName, DeploymentPlan], dict[TaskName, str]]:
+        """
+        compile (plans, errors) of frozen tasks settings against the manager temporal objects, without adopting them.
+        Templates are skipped.
+        """
+        plans, errors = {}, {}
+        for task_name, settings in tasks_settings.items():
+            if settings.get("template", False):
+                continue
+            try:
+                plans[task_name] = self._compile_task(task_name, settings)
+            except (SettingsError, LaunchpadKeyError, MissingImportError) as e:
+                errors[task_name] = str(e)
+        return plans, errors
+
+    def get_task_plan(self, task_name: TaskName) -> DeploymentPlan:
+        """deployment plan of a task, compiled again when its settings or temporal objects changed."""
+        settings = self.settings.tasks.get(task_name, None)
+        if settings is None:
+            raise SettingsError(f"Cannot load tasks settings: {task_name}. Tasks settings not found under name {task_name}.")
+        plan = self.plans.get(task_name, None)
+        if plan is not None and plan.valid(settings, self._plan_objects(settings)):
+            return plan
+        try:
+            plan = self._compile_task(task_name, settings)
+        except (SettingsError, LaunchpadKeyError, MissingImportError) as e:
+            self.plans.pop(task_name, None)
+            self.plans_errors[task_name] = str(e)
+            raise
+        self.plans[task_name] = plan
+        self.plans_errors.pop(task_name, None)
+        return plan
 
     def get_task_settings(
         self,
@@ -405,7 +688,8 @@ class TemporalServersManager:
         overwrite: dict[str, Any] | None = None,
         template_args: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        settings = copy.deepcopy(self.settings.tasks.get(task_name, None))
+        """frozen task settings. overwrite and template_args are applied copy on write."""
+        settings = self.settings.tasks.get(task_name, None)
         if settings is None:
             raise SettingsError(f"Cannot load tasks settings: {task_name}. Tasks settings not found under name {task_name}.")
         settings = self._dyn_update_settings(settings, overwrite, template_args)
@@ -417,7 +701,8 @@ class TemporalServersManager:
         overwrite: dict[str, Any] | None = None,
         template_args: dict[str, Any] | None = None
     ) -> dict[str, Any]:
-        settings = copy.deepcopy(self.settings.workers.get(worker_name, None))
+        """frozen worker settings. overwrite and template_args are applied copy on write."""
+        settings = self.settings.workers.get(worker_name, None)
         if settings is None:
             raise SettingsError(f"Cannot load worker settings: {worker_name}. worker settings not found under name {worker_name}.")
         settings = self._dyn_update_settings(settings, overwrite, template_args)
@@ -465,7 +750,7 @@ class TemporalServersManager:
             is_server, is_namespace, is_task_queue = True, True, True
             if server_name is not None and server.name != server_name:
                 is_server = False
-            if namespace is not None and namespace.name != namespace_name:
+            if namespace_name is not None and namespace.name != namespace_name:
                 is_namespace = False
             if worker.task_queue != task_queue:
                 is_task_queue = False
@@ -490,10 +775,30 @@ class TemporalServersManager:
         template_args: dict[str, Any] | None = None
     ) -> None:
         deployment = self.get_task_settings(task_name, overwrite, template_args)
-        server, namespace, client = await self._get_temporal_frame(deployment)
-        runner = self.get_task_runner(deployment)
-        settings = self._get_runner_frame(deployment, client)
-        await runner()(**settings)
+        if deployment is self.settings.tasks.get(task_name, None):
+            plan = self.get_task_plan(task_name)
+            _, _, client = await self.get_temporal_frame(plan.namespace, plan.server)
+            await plan.deploy(client)
+        else:
+            await self._deploy_task(deployment)
+
+    async def deploy_task_variants(
+        self,
+        task_name: str,
+        app: Sanic,
+        variants: Sequence[Mapping[str, Any]] | None = None
+    ) -> int:
+        """
+        deploy variants of a task, each with its own `overwrite` and `template_args`.
+        Every variant is resolved before the first deploy. Variants sharing an overwrite key set share its compiled plan.
+        """
+        deployments = [
+            self.get_task_settings(task_name, variant.get("overwrite", None), variant.get("template_args", None))
+            for variant in variants or []
+        ]
+        for deployment in deployments:
+            await self._deploy_task(deployment)
+        return len(deployments)
 
     async def deploy_worker(
         self,
@@ -506,7 +811,9 @@ class TemporalServersManager:
         server, namespace, client = await self._get_temporal_frame(deployment)
         # get worker frame
         settings = deployment.get("worker", None)
-        settings.update({"client": client})
+        if settings is None:
+            raise SettingsError(f"Worker settings missing `worker` field.")
+        settings = dict(settings, client=client)
         await namespace.start_workers(settings, app)
 
     async def restart_worker(
@@ -521,17 +828,29 @@ class TemporalServersManager:
         template_args: dict[str, Any] | None = None
     ) -> None:
         workers = self.get_workers(task_queue, server_name, namespace_name)
-        if len(workers) == 1:
-            server, namespace, worker = workers[0]
-        else:
+        if len(workers) == 0:
+            raise LaunchpadKeyError(f"Cannot select a worker to restart. No running worker on task queue {task_queue}.")
+        elif len(workers) > 1:
             raise LaunchpadKeyError(f"Cannot select a worker to restart. Multiple workers found. Define a server name and a namespace name to refine your search.")
+        server, namespace, worker = workers[0]
+        await self._restart_worker(server, namespace, worker.task_queue, app, overwrite, template_args)
 
-        deployment = self.settings.workers.get(worker.task_queue)
-        deployment = self._dyn_update_settings(deployment, overwrite, template_args)
-
-        client = await server.get_client(namespace.name)
-        deployment.update({"namespace": namespace.name, "client": client})
-        await namespace.restart_workers(deployment, app)
+    async def rolling_restart(self, task_queues: Sequence[str], app: Sanic) -> list[str]:
+        """
+        restart the running workers of the given task queues with their current settings, one at a time.
+        A failing restart is logged and the next worker is restarted. Return the restarted task queues.
+        """
+        restarted = []
+        for task_queue in task_queues:
+            for server, namespace, _ in self.get_workers(task_queue):
+                try:
+                    await self._restart_worker(server, namespace, task_queue, app)
+                except Exception as e:
+                    logger.warning(f"[Worker: {task_queue}] restart failed on {server.name}/{namespace.name}: {e!r}")
+                    continue
+                logger.info(f"[Worker: {task_queue}] restarted on {server.name}/{namespace.name}.")
+                restarted.append(task_queue)
+        return restarted
 
     async def stop_worker(
         self,
@@ -547,23 +866,87 @@ class TemporalServersManager:
             raise LaunchpadKeyError(f"Cannot select a worker to stop. Multiple workers found. Define a server name and a namespace name to refine your search.")
         await namespace.stop_workers(task_queue, app)
 
+    async def _restart_worker(
+        self,
+        server: TemporalServer,
+        namespace: NameSpace,
+        task_queue: str,
+        app: Sanic,
+        overwrite: dict[str, Any] | None = None,
+        template_args: dict[str, Any] | None = None
+    ) -> None:
+        deployment = self.get_worker_settings(task_queue, overwrite, template_args)
+        settings = deployment.get("worker", None)
+        if settings is None:
+            raise SettingsError(f"Worker settings missing `worker` field.")
+        client = await server.get_client(namespace.name)
+        settings = dict(settings, client=client)
+        await namespace.restart_workers(settings, app)
+
     async def on_server_start_deploy_tasks(self, app: Sanic) -> None:
+        deployments = []
         for task_name, settings in self.settings.tasks.items():
             deployable = settings.get("deploy_on_server_start", False)
             dynamic_settings = settings.get("template", False)
             if deployable and dynamic_settings is False:
-                try:
-                    await self.deploy_task(task_name, app)
-                except WorkflowAlreadyStartedError:
-                    logger.warning(f"[Task: {task_name}] is already running.")
+                deployments.append((task_name, self._server_name(settings)))
             elif deployable and dynamic_settings:
                 logger.warning(f"[Task: {task_name}] Dynamic tasks templates cannot be deployed at server start...")
+        await self._deploy_on_start("tasks", deployments, lambda name: self.deploy_task(name, app))
 
     async def on_server_start_deploy_workers(self, app: Sanic) -> None:
+        deployments = []
         for worker_name, settings in self.settings.workers.items():
             dynamic_settings = settings.get("template", False)
             if dynamic_settings is False:
-                await self.deploy_worker(worker_name, app)
+                deployments.append((worker_name, self._server_name(settings)))
+        await self._deploy_on_start("workers", deployments, lambda name: self.deploy_worker(name, app))
+
+    async def _deploy_on_start(
+        self,
+        kind: str,
+        deployments: list[tuple[str, ServerName | None]],
+        deploy: Callable[[str], Coroutine[Any, Any, None]]
+    ) -> None:
+        """run deployments concurrently, bounded by `deploy_concurrency` and the servers rate limits."""
+        semaphore = asyncio.Semaphore(self.deploy_concurrency)
+
+        async def run(deployment: Deployment) -> None:
+            async with semaphore:
+                server = self.servers.get(deployment.server, None) # type: ignore
+                if server is not None and server.degraded is not None:
+                    self.deployments.done(deployment, "failed", f"server {server.name} is degraded")
+                    return
+                limiter = self._rate_limiter(deployment.server)
+                if limiter is not None:
+                    await limiter.acquire()
+                self.deployments.run(deployment)
+                try:
+                    await deploy(deployment.name)
+                except WorkflowAlreadyStartedError:
+                    logger.warning(f"[Task: {deployment.name}] is already running.")
+                    self.deployments.done(deployment, "skipped", "already running")
+                except Exception as e:
+                    logger.error(f"[Deployment: {kind}/{deployment.name}] cannot be deployed: {str(e)}")
+                    self.deployments.done(deployment, "failed", str(e) or type(e).__name__)
+                else:
+                    self.deployments.done(deployment)
+
+        entries = self.deployments.begin(kind, deployments)
+        await asyncio.gather(*[run(deployment) for deployment in entries])
+        self.deployments.end(kind)
+
+    def _rate_limiter(self, server_name: ServerName | None) -> RateLimiter | None:
+        if server_name not in self.__limiters:
+            rate = self.rate_limits.get(server_name, self.rate_limit) # type: ignore
+            self.__limiters[server_name] = None if rate is None else RateLimiter(rate) # type: ignore
+        return self.__limiters[server_name] # type: ignore
+
+    def _server_name(self, settings: Mapping[str, Any]) -> ServerName | None:
+        server_name = settings.get("server", None)
+        if server_name is None and getattr(self, "default_server", None) is not None:
+            server_name = self.default_server.name
+        return server_name
 
     def _dyn_update_settings(
         self,
@@ -581,12 +964,45 @@ class TemporalServersManager:
             settings = dyn_update(settings, overwrite)
         return settings
 
+    async def _deploy_task(self, deployment: dict[str, Any]) -> None:
+        server, namespace, client = await self._get_temporal_frame(deployment)
+        runner = self.get_task_runner(deployment)
+        settings = self._get_runner_frame(deployment)
+        await runner()(**settings, client=client)
+
+    def _compile_task(self, task_name: TaskName, settings: Mapping[str, Any]) -> DeploymentPlan:
+        runner_class = self.get_task_runner(settings) # type: ignore
+        frame = self._get_runner_frame(settings) # type: ignore
+        runner = runner_class()
+        prepare = getattr(runner, "prepare", None)
+        try:
+            kwargs = dict(frame) if prepare is None else prepare(**frame)
+        except (TypeError, ValueError, KeyError, AttributeError) as e:
+            raise SettingsError(f"Cannot compile task: {task_name}. {type(e).__name__}: {str(e)}")
+        return DeploymentPlan(
+            name=task_name,
+            source=settings,
+            runner=runner,
+            kwargs=kwargs,
+            objects=(runner_class, frame["workflow"]),
+            server=settings.get("server", None),
+            namespace=settings.get("namespace", None)
+        )
+
+    def _plan_objects(self, settings: Mapping[str, Any]) -> tuple[Any, ...]:
+        payload = settings.get("workflow", None)
+        workflow_name = payload.get("workflow", None) if isinstance(payload, Mapping) else None
+        return (
+            self.temporal_objects.runners.get(settings.get("runner", None), None),
+            self.temporal_objects.workflows.get(workflow_name, None)
+        )
+
     async def _get_temporal_frame(self, settings: dict[str, Any]) -> tuple[TemporalServer, NameSpace, Client]:
         server_name = settings.get("server", None)
         namespace_name = settings.get("namespace", None)
         return await self.get_temporal_frame(namespace_name, server_name)
 
-    def _get_runner_frame(self, settings: dict[str, Any] , client: Client) -> dict[str, Any]:
+    def _get_runner_frame(self, settings: dict[str, Any]) -> dict[str, Any]:
         payload = settings.get("workflow", None)
         if payload is None:
             raise SettingsError("Task settings missing `workflow` field.")
@@ -600,5 +1016,4 @@ class TemporalServersManager:
         if workflow_class is None:
             raise MissingImportError(f"cannot get temporal workflow. `{workflow_name}` is not imported")
 
-        payload.update({"client": client, "workflow": workflow_class})
-        return payload
+        return dict(payload, workflow=workflow_class)
@@ -1,5 +1,4 @@
 
-import copy
 from datetime import timedelta
 from typing import Callable, Type, Any
 
@@ -31,18 +30,24 @@ def is_temporal_worker(callable: Type) -> bool:
     return False
 
 
+def parse_timedelta(value: dict[str, Any] | timedelta) -> timedelta:
+    if isinstance(value, timedelta):
+        return value
+    return timedelta(**value)
+
 def parse_retry_policy(kwargs: dict[str, Any]) -> RetryPolicy | None:
-    retry_policy = copy.deepcopy(kwargs.get("retry_policy", None))
-    if retry_policy is None:
-        return None
+    retry_policy = kwargs.get("retry_policy", None)
+    if retry_policy is None or isinstance(retry_policy, RetryPolicy):
+        return retry_policy
+    retry_policy = dict(retry_policy)
 
     initial_interval = retry_policy.get("initial_interval", None)
     maximum_interval = retry_policy.get("maximum_interval", None)
 
     if initial_interval is not None:
-        retry_policy["initial_interval"] = timedelta(**initial_interval)
+        retry_policy["initial_interval"] = parse_timedelta(initial_interval)
     if maximum_interval is not None:
-        retry_policy["maximum_interval"] = timedelta(**maximum_interval)
+        retry_policy["maximum_interval"] = parse_timedelta(maximum_interval)
     return RetryPolicy(**retry_policy)
 
 def define_versioning_intent(kwargs: dict[str, Any]) -> VersioningIntent | None:
@@ -76,6 +81,8 @@ def define_id_reuse_policy(kwargs: dict[str, Any]) -> WorkflowIDReusePolicy:
     id_reuse_policy = kwargs.get("id_reuse_policy", None)
     if id_reuse_policy is None:
         return WorkflowIDReusePolicy.ALLOW_DUPLICATE
+    if isinstance(id_reuse_policy, WorkflowIDReusePolicy):
+        return id_reuse_policy
     id_reuse_policy = getattr(WorkflowIDReusePolicy, id_reuse_policy, None)
     if id_reuse_policy is None:
         return WorkflowIDReusePolicy.ALLOW_DUPLICATE
@@ -31,11 +31,13 @@ def log(f: Callable) -> Callable:
 
 
 class LaunchpadWorker(ABC):
+    """`started` is set once the worker polls its task queue."""
     client: Client
     task_queue: str
     max_workers: int
     workflows: list[Type]
     activities: list[Type]
+    started: asyncio.Event
 
     async def run(self) -> None:
         ...
@@ -48,6 +50,7 @@ class AsyncWorker(LaunchpadWorker):
     workflows: list[Type] = field(default=Factory(list))
     activities: list[Type] = field(default=Factory(list))
     max_workers: int = field(default=100)
+    started: asyncio.Event = field(factory=asyncio.Event, init=False, eq=False, repr=False)
 
     async def _async_threadpool_workers(self):
         with concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers) as activity_executor:
@@ -58,7 +61,19 @@ class AsyncWorker(LaunchpadWorker):
             activities=self.activities,
             activity_executor=activity_executor,
             )
-            await worker.run()
+            run = asyncio.ensure_future(worker.run())
+            signal = asyncio.create_task(self._signal_started(worker, run))
+            try:
+                await run
+            finally:
+                signal.cancel()
+
+    async def _signal_started(self, worker: Worker, run: asyncio.Future) -> None:
+        """set `started` once the worker validated its namespace and polls."""
+        while not worker.is_running and not run.done():
+            await asyncio.sleep(0.05)
+        if worker.is_running:
+            self.started.set()
 
     async def run(self) -> None:
         await self._async_threadpool_workers()
@@ -1,38 +1,252 @@
-import json
+from __future__ import annotations
+
+import copy
+import threading
+from hashlib import sha256
 from pathlib import Path
-from datetime import timedelta
-from collections import deque
-from jinja2 import Template, StrictUndefined
+from decimal import Decimal
+from datetime import date, time, timedelta
+from collections import OrderedDict
+from collections.abc import Mapping, Iterable, Hashable
+from jinja2 import Environment, Template, StrictUndefined
 from typing import Sequence, Type, Callable, Any
 
-from launchpad.exceptions import LaunchpadKeyError
+from launchpad.exceptions import LaunchpadKeyError, LaunchpadValueError, LaunchpadTypeError
+
+
+def _frozen(self, *args: Any, **kwargs: Any) -> None:
+    raise LaunchpadTypeError(f"{type(self).__name__} cannot be modified. settings are frozen, copy them first.")
+
+class FrozenDict(dict):
+    """read only dict. Copies are plain, mutable, dicts."""
+    __setitem__ = __delitem__ = __ior__ = _frozen
+    pop = popitem = clear = update = setdefault = _frozen
+
+    @property
+    def digest(self) -> str | None:
+        """content hash, computed once. None when the settings hold values that cannot be hashed by content."""
+        if "digest" not in self.__dict__:
+            self.__dict__["digest"] = settings_digest(self)
+        return self.__dict__["digest"]
+
+    def __copy__(self) -> dict[str, Any]:
+        return dict(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> dict[str, Any]:
+        return {k: copy.deepcopy(v, memo) for k, v in self.items()}
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenDict, (dict(self),))
+
+class FrozenList(list):
+    """read only list. Copies are plain, mutable, lists."""
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _frozen
+    append = extend = insert = pop = remove = clear = sort = reverse = _frozen
+
+    def __copy__(self) -> list[Any]:
+        return list(self)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> list[Any]:
+        return [copy.deepcopy(v, memo) for v in self]
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (FrozenList, (list(self),))
+
+def freeze(payload: Any) -> Any:
+    """recursively freeze dicts and lists of a settings payload."""
+    if isinstance(payload, FrozenDict) or isinstance(payload, FrozenList):
+        return payload
+    elif isinstance(payload, dict):
+        return FrozenDict({k: freeze(v) for k, v in payload.items()})
+    elif isinstance(payload, list):
+        return FrozenList([freeze(v) for v in payload])
+    return payload
+
+CANONICAL_SCALARS = (str, int, float, bool, type(None), bytes, date, time, timedelta, Decimal)
+
+class _Uncanonical(Exception):
+    pass
+
+def _canonical(value: Any) -> tuple[Any, ...]:
+    """
+    type tagged form of a settings payload. Keys keep their types, so `1` and `"1"` never collide,
+    and mappings are sorted by (key type, key repr), so mixed key types never have to be compared.
+    """
+    if isinstance(value, Mapping):
+        return ("map", tuple(sorted((_canonical(k), _canonical(v)) for k, v in value.items())))
+    elif isinstance(value, (list, tuple)):
+        return ("tuple" if isinstance(value, tuple) else "list", tuple(_canonical(v) for v in value))
+    elif isinstance(value, CANONICAL_SCALARS):
+        return (type(value).__name__, repr(value))
+    raise _Uncanonical(type(value).__name__)
+
+def settings_digest(settings: Mapping[str, Any]) -> str | None:
+    """content hash of the settings. None when they hold values without a stable repr, which are then never cached."""
+    try:
+        return sha256(repr(_canonical(settings)).encode()).hexdigest()
+    except _Uncanonical:
+        return None
+
+
+JINJA = Environment(undefined=StrictUndefined)
+JINJA_SYNTAX = ("{{", "{%", "{#")
+
+def _is_template(value: Any) -> bool:
+    return isinstance(value, str) and any(s in value for s in JINJA_SYNTAX)
+
+class TemplatePlan(object):
+    """
+    the jinja2 templates of a settings payload: its string leaves and keys holding jinja syntax, compiled once.
+    Rendering copies the branches leading to a template only, the rest is shared with the settings.
+    """
+    __slots__ = ("children", "keys")
+    children: dict[Any, TemplatePlan | Template]
+    keys: dict[str, Template]
+
+    def __init__(self) -> None:
+        self.children = {}
+        self.keys = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.children) or bool(self.keys)
+
+    @classmethod
+    def compile(cls, payload: Any) -> TemplatePlan:
+        plan = cls()
+        items = payload.items() if isinstance(payload, dict) else enumerate(payload)
+        for key, value in items:
+            if _is_template(key):
+                plan.keys[key] = JINJA.from_string(key)
+            if _is_template(value):
+                plan.children[key] = JINJA.from_string(value)
+            elif isinstance(value, (dict, list)) and (child := cls.compile(value)):
+                plan.children[key] = child
+        return plan
+
+    def render(self, payload: Any, template_values: dict[str, Any]) -> Any:
+        rendered = dict(payload) if isinstance(payload, dict) else list(payload)
+        for key, child in self.children.items():
+            if isinstance(child, TemplatePlan):
+                rendered[key] = child.render(payload[key], template_values)
+            else:
+                rendered[key] = child.render(**template_values)
+        if self.keys:
+            keys = {key: template.render(**template_values) for key, template in self.keys.items()}
+            rendered = {keys.get(k, k): v for k, v in rendered.items()}
+        return rendered
 
 
+class PlanCache(object):
+    """thread safe LRU of compiled settings plans."""
+    __plans: OrderedDict[Hashable, Any]
+    maxsize: int
+
+    def __init__(self, maxsize: int = 1024) -> None:
+        self.__plans = OrderedDict()
+        self.__lock = threading.Lock()
+        self.maxsize = maxsize
+
+    def __len__(self) -> int:
+        return len(self.__plans)
+
+    def get(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        with self.__lock:
+            plan = self.__plans.get(key, None)
+            if plan is not None:
+                self.__plans.move_to_end(key)
+                return plan
+        plan = build()
+        with self.__lock:
+            self.__plans[key] = plan
+            while len(self.__plans) > self.maxsize:
+                self.__plans.popitem(last=False)
+        return plan
+
+
+TEMPLATE_PLANS = PlanCache()
+
+def template_plan(settings: dict[str, Any]) -> TemplatePlan:
+    """compiled templates of a settings payload, cached by content hash."""
+    digest = settings.digest if isinstance(settings, FrozenDict) else settings_digest(settings)
+    if digest is None:
+        return TemplatePlan.compile(settings)
+    return TEMPLATE_PLANS.get(digest, lambda: TemplatePlan.compile(settings))
+
+def dyn_templating(settings: dict[str, Any], template_values: dict[str, Any]) -> dict[str, Any]:
+    """render the jinja2 string leaves and keys of the settings. Rendered values are strings."""
+    plan = template_plan(settings)
+    if not plan:
+        return settings
+    return plan.render(settings, template_values)
+
+
+class OverwritePlan(object):
+    """
+    a set of overwrite keys compiled into a tree of layers, applied as one copy on write merge.
+    Validated once per settings version.
+    """
+    __slots__ = ("keys", "tree", "validated")
+    keys: frozenset[str]
+    tree: dict[str, Any]
+    validated: set[str]
+
+    def __init__(self, keys: Iterable[str]) -> None:
+        self.keys = frozenset(keys)
+        self.tree = {}
+        self.validated = set()
+        for key in sorted(self.keys):
+            node, layers = self.tree, key.split(".")
+            for layer in layers[:-1]:
+                node = node.setdefault(layer, {})
+                if not isinstance(node, dict):
+                    raise LaunchpadValueError(f"overwrite key {key} conflicts with overwrite key {node}")
+            if isinstance(node.get(layers[-1], None), dict):
+                raise LaunchpadValueError(f"overwrite key {key} conflicts with nested overwrite keys")
+            node[layers[-1]] = key
+
+    def validate(self, settings: Mapping[str, Any]) -> None:
+        digest = settings.digest if isinstance(settings, FrozenDict) else None
+        if digest is not None and digest in self.validated:
+            return
+
+        def walk(settings: Any, tree: dict[str, Any]) -> None:
+            for layer, child in tree.items():
+                if not isinstance(settings, Mapping) or settings.get(layer, None) is None:
+                    raise LaunchpadKeyError(f"overwrite key {layer} not found")
+                if isinstance(child, dict):
+                    walk(settings[layer], child)
+
+        walk(settings, self.tree)
+        if digest is not None:
+            self.validated.add(digest)
+
+    def apply(self, settings: dict[str, Any], overwrite: Mapping[str, Any]) -> dict[str, Any]:
+        self.validate(settings)
+
+        def merge(settings: dict[str, Any], tree: dict[str, Any]) -> dict[str, Any]:
+            merged = dict(settings)
+            for layer, child in tree.items():
+                merged[layer] = merge(settings[layer], child) if isinstance(child, dict) else overwrite[child]
+            return merged
+
+        return merge(settings, self.tree)
+
+
+OVERWRITE_PLANS = PlanCache()
+
+def overwrite_plan(keys: Iterable[str]) -> OverwritePlan:
+    """compiled overwrite plan of a key set, cached."""
+    keys = frozenset(keys)
+    return OVERWRITE_PLANS.get(keys, lambda: OverwritePlan(keys))
+
 def dyn_update(settings: dict[str, Any], overwrite: dict[str, Any]) -> dict[str, Any]:
     """
     dyn into nested dicts and overwrite values.
+    Copy on write: only the dicts along the overwritten paths are copied, the rest is shared with `settings`.
     :overwrite:
         key format: "layer0.layer1.arg"
     """
-    def update(settings: dict[str, Any], layers: deque[str], value: Any) -> dict[str, Any]:
-        layer = layers.popleft()
-        if settings.get(layer, None) is None:
-            raise LaunchpadKeyError(f"overwrite key {layer} not found")
-        if len(layers) > 0:
-            settings[layer] = update(settings[layer], layers, value)
-        else:
-            settings[layer] = value
-        return settings
-
-    for key, value in overwrite.items():
-        layers = deque(key.split("."))
-        settings = update(settings, layers, value)
-    return settings
-
-def dyn_templating(settings: dict[str, Any], template_values: dict[str, Any]) -> dict[str, Any]:
-    base = json.dumps(settings)
-    template = Template(base, undefined=StrictUndefined).render(**template_values)
-    return json.loads(template)
+    return overwrite_plan(overwrite.keys()).apply(settings, overwrite)
 
 def to_path(paths: Sequence[str | Path]) -> list[Path]:
     return [Path(p) if isinstance(p, str) else p for p in paths]
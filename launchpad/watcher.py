@@ -1,16 +1,21 @@
 from __future__ import annotations
 
-from collections.abc import Sequence, Mapping
+from collections.abc import Sequence, Mapping, Iterable
+import gc
 import os
 import sys
-import glob
+import json
+import time
+import threading
 import asyncio
 import logging
+import weakref
+import concurrent.futures
 from datetime import datetime
 from hashlib import sha256
 from pathlib import Path
-from collections import ChainMap, deque
-from functools import wraps
+from collections import ChainMap, OrderedDict, deque
+from functools import wraps, partial
 from itertools import chain
 from multiprocessing import Process
 from sanic import Sanic
@@ -20,7 +25,7 @@ import importlib.util
 from importlib.abc import Traversable
 from importlib.resources import files
 
-from types import ModuleType
+from types import CodeType, ModuleType
 from typing import Callable, Optional, Any, Type
 
 from launchpad.temporal.temporal_server import TemporalServersManager
@@ -30,17 +35,30 @@ from launchpad.temporal.utils import (
     is_runner,
     is_temporal_worker
 )
-from launchpad.parsers import parse_yaml
-from launchpad.utils import aggregate, to_path
-from launchpad.exceptions import (LaunchpadKeyError, LaunchpadValueError, LaunchpadTypeError)
+from launchpad.inotify import Inotify
+from launchpad.parsers import load_yaml, split_yaml_documents
+from launchpad.state import WatcherState
+from launchpad.utils import aggregate, to_path, freeze
+from launchpad.exceptions import (
+    LaunchpadKeyError, LaunchpadValueError, LaunchpadTypeError, SettingsError, MissingImportError, ModulesUpdateRejected
+)
 
 
 Datetime = str
 Payload = dict[str, Any]
 StrOrPath = str | Path
+Stat = tuple[int, int, int]
+Epoch = int
+Listing = tuple[int, list[Path], list[Path]]
+
+SUFFIXES = (".py", ".yaml", ".yml")
+CHUNK_SIZE = 1024 * 1024
+RACY_LISTING_NS = 2_000_000_000
 
 logger = logging.getLogger("watcher")
 
+MISSING = object()
+
 def log_group_visit(f):
     @wraps(f)
     def wrapper(*args, **kwargs):
@@ -71,11 +89,22 @@ def log_watcher_visit(f):
         return changes
     return wrapper
 
+HISTORY_SPILL_LOCK = threading.Lock()
+
+
 class Module:
+    """
+    :history_size: max number of versions kept in memory.
+    :history_spill: file where versions evicted from memory are appended, as json lines.
+    """
     __module: Path
     __latest: str
-    __historics: list[tuple[Datetime, str]]
+    __stat: Stat
+    __stat_ns: int
+    __historics: deque[tuple[Epoch, bytes]]
     changes: bool = False
+    history_size: int = 100
+    history_spill: Path | None = None
 
     @property
     def latest(self) -> str:
@@ -83,12 +112,16 @@ class Module:
 
     @property
     def historics(self) -> list[tuple[Datetime, str]]:
-        return self.__historics
+        return self.last_historics()
 
     @property
     def module(self) -> Path:
         return self.__module
 
+    @property
+    def last_stat(self) -> Stat:
+        return self.__stat
+
     @property
     def ftype(self) -> str:
         return self.module.suffix.strip(".")
@@ -97,10 +130,28 @@ class Module:
     def from_package(self) -> bool:
         return "site-packages" in [p.name for p in self.module.parents]
 
-    def __init__(self, module_fp: str | Path, new: bool= False) -> None:
+    def __init__(self, module_fp: str | Path, new: bool= False, snapshot: Payload | None = None) -> None:
+        """:snapshot: persisted state of the module. trusted if the file stat did not move."""
         self.__module = self._parse_path(module_fp)
-        self.__latest = self.version()
-        self.__historics = [((datetime.now().isoformat(), self.latest))]
+        self.__stat_ns = time.time_ns()
+        self.__stat = self.stat()
+        self.__historics = deque(maxlen=self.history_size)
+        if snapshot is not None:
+            # newest first. versions over the history size are spilled, oldest first.
+            self.__historics = deque([
+                (int(datetime.fromisoformat(date).timestamp() * 1_000_000), bytes.fromhex(version))
+                for date, version in snapshot["historics"]
+            ])
+            self.resize_history(self.history_size)
+        if snapshot is not None and tuple(snapshot["stat"]) == self.__stat:
+            self.__latest = snapshot["version"]
+        else:
+            # the file moved since the snapshot: the restored history is kept, the fresh version goes first.
+            version = self.version()
+            if snapshot is not None and snapshot["version"] == version and self.__historics:
+                self.__latest = version
+            else:
+                self._update_latest(version)
         if new:
             self.changes = True
 
@@ -108,10 +159,31 @@ class Module:
         return f"<{self.module}:latest {self.latest} | changes: {self.changes}>"
 
     def version(self) -> str:
-        return sha256(self.module.read_text().encode()).hexdigest()
-
-    def watch(self) -> bool:
+        digest = sha256()
+        with open(self.module, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def stat(self) -> Stat:
+        stat = self.module.stat()
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def watch(self, rehash: bool = False) -> bool:
+        """
+        look for file changes.
+        the file is only hashed when its stat (mtime, size, inode) moved,
+        unless `rehash` force a full content check.
+        A stat recorded within RACY_LISTING_NS of its mtime is not trusted: a write in the same
+        mtime tick would leave it unchanged. The file is hashed until its mtime is old enough.
+        """
         changes = False
+        now = time.time_ns()
+        stat = self.stat()
+        racy = self.__stat_ns - self.__stat[0] <= RACY_LISTING_NS
+        if stat == self.__stat and rehash is False and racy is False:
+            return changes
+        self.__stat, self.__stat_ns = stat, now
         version = self.version()
         if version != self.latest:
             changes = True
@@ -122,20 +194,44 @@ class Module:
     def changes_resolved(self):
         self.changes = False
 
-    def as_json(self) -> Mapping[str, Any]:
+    def last_historics(self, last: int | None = None) -> list[tuple[Datetime, str]]:
+        """latest versions first, as (isoformat date, hex digest)."""
+        historics = []
+        for epoch, version in self.__historics:
+            if last is not None and len(historics) >= last:
+                break
+            historics.append((datetime.fromtimestamp(epoch / 1_000_000).isoformat(), version.hex()))
+        return historics
+
+    def as_json(self, last: int | None = None) -> Mapping[str, Any]:
         return {
             "path": str(self.module),
             "latest": self.latest,
             "changes": self.changes,
-            "historics": self.historics
+            "historics": self.last_historics(last)
         }
 
+    def resize_history(self, size: int) -> None:
+        while len(self.__historics) > size:
+            self._spill(self.__historics.pop())
+        self.__historics = deque(self.__historics, maxlen=size)
+
     def same(self, other: Path) -> bool:
         return self.module.samefile(other)
 
     def _update_latest(self, version: str) -> None:
         self.__latest = version
-        self.__historics.insert(0, ((datetime.now().isoformat(), self.latest)))
+        if self.__historics.maxlen is not None and len(self.__historics) == self.__historics.maxlen:
+            self._spill(self.__historics[-1])
+        self.__historics.appendleft((time.time_ns() // 1000, bytes.fromhex(version)))
+
+    def _spill(self, record: tuple[Epoch, bytes]) -> None:
+        if self.history_spill is None:
+            return
+        epoch, version = record
+        line = json.dumps({"path": str(self.module), "epoch": epoch, "version": version.hex()})
+        with HISTORY_SPILL_LOCK, open(self.history_spill, "a") as f:
+            f.write(line + "\n")
 
     def _parse_path(self, path: StrOrPath) -> Path:
         path = Path(path)
@@ -149,20 +245,209 @@ class Module:
 
 
 
+class PayloadCache(object):
+    """
+    LRU cache of parsed yaml payloads, or compiled python code, keyed by content hash.
+    Bounded by the total size of the cached sources, in bytes.
+    """
+    __payloads: OrderedDict[str, tuple[int, Payload]]
+    maxsize: int
+    size: int
+
+    def __init__(self, maxsize: int = 64 * 1024 * 1024) -> None:
+        self.__payloads = OrderedDict()
+        self.__lock = threading.Lock()
+        self.maxsize = maxsize
+        self.size = 0
+
+    def __len__(self) -> int:
+        return len(self.__payloads)
+
+    def __contains__(self, version: str) -> bool:
+        return version in self.__payloads
+
+    def get(self, version: str) -> Payload | None:
+        with self.__lock:
+            cached = self.__payloads.get(version, None)
+            if cached is None:
+                return None
+            self.__payloads.move_to_end(version)
+            return cached[1]
+
+    def put(self, version: str, payload: Payload, cost: int) -> None:
+        with self.__lock:
+            previous = self.__payloads.pop(version, None)
+            if previous is not None:
+                self.size -= previous[0]
+            self.__payloads[version] = (cost, payload)
+            self.size += cost
+            self._evict()
+
+    def resize(self, maxsize: int) -> None:
+        with self.__lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self) -> None:
+        with self.__lock:
+            self.__payloads.clear()
+            self.size = 0
+
+    def _evict(self) -> None:
+        while self.size > self.maxsize and len(self.__payloads) > 1:
+            _, (cost, _) = self.__payloads.popitem(last=False)
+            self.size -= cost
+
+
+PAYLOADS = PayloadCache()
+CODES = PayloadCache(16 * 1024 * 1024)
+
+
+class YamlDocument(object):
+    """one document of a multi-documents yaml file. Hashed on its own source, parsed lazily."""
+    cache: PayloadCache = PAYLOADS
+
+    def __init__(self, module: Path, index: int, source: bytes) -> None:
+        self.module = module
+        self.index = index
+        self.source = source
+        self.version = sha256(source).hexdigest()
+
+    def __repr__(self) -> str:
+        return f"<{self.key}:{self.version}>"
+
+    @property
+    def key(self) -> str:
+        return f"{str(self.module)}#{self.index}"
+
+    def payload(self) -> Payload:
+        """frozen parsed payload, shared with the cache."""
+        payload = self.cache.get(self.version)
+        if payload is None:
+            payload = freeze(load_yaml(self.source))
+            self.cache.put(self.version, payload, len(self.source))
+        return payload
+
+
 class YamlModule(Module):
-    def __init__(self, module_fp: Path, new: bool= False) -> None:
-        super().__init__(module_fp, new)
+    cache: PayloadCache = PAYLOADS
+    __documents: tuple[str, list[YamlDocument]] | None
+
+    def __init__(self, module_fp: Path, new: bool= False, snapshot: Payload | None = None) -> None:
+        super().__init__(module_fp, new, snapshot)
+        self.__documents = None
+
+    @property
+    def multi(self) -> bool:
+        """True for files holding several `---` separated documents."""
+        if self.latest in self.cache:
+            # single document payloads are cached under the file version.
+            return False
+        return len(self.documents()) > 1
+
+    def documents(self) -> list[YamlDocument]:
+        """documents of the latest version. Split once per file version, parsed on access."""
+        if self.__documents is not None and self.__documents[0] == self.latest:
+            return self.__documents[1]
+        content = self.module.read_bytes()
+        documents = [YamlDocument(self.module, i, source) for i, source in enumerate(split_yaml_documents(content))]
+        self.__documents = (sha256(content).hexdigest(), documents)
+        return documents
 
     def payload(self) -> Payload:
-        return parse_yaml(self.module.absolute())
+        """
+        parsed payload of the latest version. Only parsed once per content hash.
+        Payloads are frozen and shared with the cache: copy them to modify them.
+        """
+        payload = self.cache.get(self.latest)
+        if payload is None:
+            content = self.module.read_bytes()
+            payload = freeze(load_yaml(content))
+            self.cache.put(sha256(content).hexdigest(), payload, len(content))
+        return payload
+
+    def payloads(self) -> dict[Path | str, Payload]:
+        """payloads addressed by path, or by `path#index` for each document of a multi-documents file."""
+        if self.multi is False:
+            return {self.module: self.payload()}
+        return {document.key:document.payload() for document in self.documents()}
+
+    def cached_payloads(self) -> list[tuple[str, Payload]]:
+        """(version, payload) of the parsed payloads of the latest version, per file or per document."""
+        payload = self.cache.get(self.latest)
+        if payload is not None:
+            return [(self.latest, payload)]
+        if self.__documents is None or self.__documents[0] != self.latest:
+            return []
+        cached = [(document.version, self.cache.get(document.version)) for document in self.__documents[1]]
+        return [(version, payload) for version, payload in cached if payload is not None]
 
     def load(self) -> Payload:
         self.changes_resolved()
         return self.payload()
 
 class PyModule(Module):
-    def __init__(self, module_fp: Path, new: bool= False) -> None:
-        super().__init__(module_fp, new)
+    codes: PayloadCache = CODES
+    pinned: str | None
+    __objects: Mapping[str, Type] | None
+    __loaded: str | None
+
+    def __init__(self, module_fp: Path, new: bool= False, snapshot: Payload | None = None) -> None:
+        super().__init__(module_fp, new, snapshot)
+        self.__objects = None
+        self.__loaded = None
+        self.pinned = None
+
+    @property
+    def loaded(self) -> str | None:
+        """version of the module live in sys.modules."""
+        return self.__loaded
+
+    @property
+    def stale(self) -> bool:
+        """the live module differs from the pinned version, or from the file when not pinned."""
+        if self.pinned is not None:
+            return self.__loaded != self.pinned
+        return self.changes or (self.__loaded is not None and self.__loaded != self.latest)
+
+    @property
+    def held(self) -> bool:
+        """file changes are held back by a pin the live module already matches."""
+        return self.pinned is not None and not self.stale
+
+    @property
+    def previous(self) -> str | None:
+        """version preceding the live one in the module historics."""
+        versions = [version for _, version in self.historics]
+        current = self.__loaded or self.latest
+        if current not in versions:
+            return None
+        index = versions.index(current) + 1
+        return versions[index] if index < len(versions) else None
+
+    def as_json(self, last: int | None = None) -> Mapping[str, Any]:
+        return {**super().as_json(last), "loaded": self.__loaded, "pinned": self.pinned}
+
+    def pin(self, version: str) -> str:
+        """pin the module to a compiled version. A unique prefix of a known version is accepted."""
+        versions = set([v for _, v in self.historics if v.startswith(version)])
+        if len(versions) != 1:
+            raise LaunchpadKeyError(f"cannot pin {self.module_name}: {len(versions)} known versions match {version}.")
+        version = versions.pop()
+        if version not in self.codes:
+            raise LaunchpadKeyError(f"cannot pin {self.module_name}: version {version} is not in the compiled code cache.")
+        self.pinned = version
+        return version
+
+    def unpin(self) -> None:
+        self.pinned = None
+
+    @property
+    def objects(self) -> Mapping[str, Type]:
+        """temporal objects contributed by the module, recorded when it was last (re)loaded."""
+        if self.__objects is None:
+            self.__objects = self.temporal_objects() if self.module_name in sys.modules else {}
+        return self.__objects
 
     @property
     def module_name(self) -> str:
@@ -174,6 +459,14 @@ class PyModule(Module):
         return ".".join(path + [rel_path.stem])
 
     def reload(self) -> ModuleType:
+        return self.commit(*self.stage(self.pinned))
+
+    def stage(self, version: str | None = None) -> tuple[ModuleType, str]:
+        """
+        import a new generation of the module without publishing it. Return the module and its version.
+        Code is compiled once per version. A given version is only served from the code cache, never from disk.
+        The body runs in a detached module: importers only ever see the live one, until `commit`.
+        """
         spec = importlib.util.spec_from_file_location(
             self.module_name,
             self.module.absolute()
@@ -181,15 +474,53 @@ class PyModule(Module):
         if spec is None:
             raise FileExistsError(f"cannot reaload: {self.module_name}. Specs not found")
 
+        version, code = self.compile(version)
         module = importlib.util.module_from_spec(spec)
+        exec(code, module.__dict__)
+        return module, version
+
+    def compile(self, version: str | None = None) -> tuple[str, CodeType]:
+        if version is not None:
+            code = self.codes.get(version)
+            if code is None:
+                raise LaunchpadKeyError(f"cannot load {self.module_name} at {version}. Version is not in the compiled code cache.")
+            return version, code
+
+        source = self.module.read_bytes()
+        version = sha256(source).hexdigest()
+        code = self.codes.get(version)
+        if code is None:
+            code = compile(source, str(self.module.absolute()), "exec", dont_inherit=True)
+            self.codes.put(version, code, len(source))
+        return version, code
+
+    def commit(self, module: ModuleType, version: str) -> ModuleType:
+        """publish a staged generation of the module."""
         sys.modules[self.module_name] = module
-        spec.loader.exec_module(module) # type: ignore
-        self.changes_resolved()
+        self.__objects = self.scan(module)
+        self.__loaded = version
+        if self.pinned is None or self.pinned == self.latest:
+            self.changes_resolved()
         return module
 
+    def checkpoint(self) -> tuple[Any, ...]:
+        """live module and load state, as restored by `rollback`."""
+        return (sys.modules.get(self.module_name, None), self.__objects, self.__loaded, self.changes)
+
+    def rollback(self, checkpoint: tuple[Any, ...]) -> None:
+        live, self.__objects, self.__loaded, self.changes = checkpoint
+        if live is None:
+            sys.modules.pop(self.module_name, None)
+        else:
+            sys.modules[self.module_name] = live
+
     def temporal_objects(self) -> Mapping[str, Type]:
+        return self.scan(sys.modules[self.module_name])
+
+    @staticmethod
+    def scan(module: ModuleType) -> Mapping[str, Type]:
         objects = {}
-        for k,v in sys.modules[self.module_name].__dict__.items():
+        for k,v in module.__dict__.items():
             if k.startswith("__"):
                     continue
             if(is_activity(v) or is_workflow(v) or is_runner(v) or is_temporal_worker(v)):
@@ -200,10 +531,20 @@ class PyModule(Module):
         sys.modules[self.module_name].__dict__.update(objects)
 
 class Group(object):
+    """
+    Visits may run on executor threads while the event loop reads `modules`.
+    Visits apply their changes to a copy of the modules, published with a single assignment.
+    """
     __name: str
     __basepaths: list[Path]
     __modules: dict[Path, PyModule | YamlModule]
+    __listings: dict[Path, Listing]
+    __visits: int
+    __executor: tuple[int, concurrent.futures.ThreadPoolExecutor] | None
     skips: list[Path]
+    rehash_interval: int
+    concurrency: int
+    state: WatcherState | None
 
     @property
     def name(self) -> str:
@@ -219,21 +560,44 @@ class Group(object):
 
     @property
     def paths(self) -> Sequence[Path]:
-        paths = []
+        paths, explored = [], set()
+        skips = set(self.skips)
         for p in self.basepaths:
-            if p in self.skips:
+            if p in skips:
                 continue
             if p.is_dir():
-                paths.extend(self._explore(p))
+                paths.extend(self._explore(p, skips, explored))
             elif p.is_file():
                 paths.append(p)
+        for directory in set(self.__listings.keys()) - explored:
+            self.__listings.pop(directory)
         return paths
 
-    def __init__(self, name: str, paths: Sequence[StrOrPath], skips: Sequence[StrOrPath] = []) -> None:
+    def __init__(
+        self,
+        name: str,
+        paths: Sequence[StrOrPath],
+        skips: Sequence[StrOrPath] = [],
+        rehash_interval: int = 0,
+        concurrency: int = 1,
+        state: WatcherState | None = None
+    ) -> None:
+        """
+        :rehash_interval: every N visits, modules are hashed even if their stat did not change.
+            0 deactivate the periodic rehash.
+        :concurrency: number of threads watching the group modules.
+        :state: persisted modules states, used to restore modules without hashing them.
+        """
         self.__name = name
         self.__basepaths = to_path(paths)
         self.__modules = {}
+        self.__listings = {}
+        self.__visits = 0
         self.skips = to_path(skips)
+        self.rehash_interval = rehash_interval
+        self.concurrency = concurrency
+        self.state = state
+        self.__executor = None
         self.visit()
 
     def add_paths(self, *paths: StrOrPath) -> None:
@@ -252,19 +616,50 @@ class Group(object):
 
     @log_group_visit
     def visit(self) -> Mapping[str, Sequence[Path]]:
+        modules = dict(self.__modules)
         new = True
-        if len(self.modules.keys()) == 0:
+        if len(modules.keys()) == 0:
             new = False
-        removed = self._remove_stale_module()
-        modified = self._watch_modules()
-        added = self._register_module(new)
+        paths = set(self.paths)
+        removed = self._remove_stale_module(modules, paths)
+        modified = self._watch_modules(modules)
+        added = self._register_module(modules, new, paths)
+        self.__modules = modules
+        return {"added": added, "modified": modified, "removed": removed}
+
+    @log_group_visit
+    def visit_paths(self, paths: Iterable[Path]) -> Mapping[str, Sequence[Path]]:
+        """visit only the given paths. Directories cover every module they contain."""
+        added, modified, removed = [], [], []
+        modules = dict(self.__modules)
+        new = len(modules.keys()) > 0
+        candidates = set()
+        for path in paths:
+            candidates.add(path)
+            candidates.update([p for p in modules.keys() if path in p.parents])
+            if path.is_dir() and self._covers(path, directory=True):
+                candidates.update(self._explore(path, set(self.skips)))
+
+        for path in candidates:
+            module = modules.get(path, None)
+            if module is not None and path.exists() is False:
+                modules.pop(path)
+                removed.append(path)
+            elif module is not None and module.watch():
+                modified.append(path)
+            elif module is None and path.is_file() and self._covers(path):
+                self._add_module(modules, path, new)
+                added.append(path)
+        self.__modules = modules
         return {"added": added, "modified": modified, "removed": removed}
 
     def load(self) -> None:
         [module.reload() for _, module in self.pymodules().items()]
 
-    def reload(self) -> None:
-        [module.reload() for _, module in self.pymodules().items() if module.changes]
+    def reload(self) -> Sequence[PyModule]:
+        reloaded = [module for _, module in self.pymodules().items() if module.changes]
+        [module.reload() for module in reloaded]
+        return reloaded
 
     def inject(self, objects: Mapping[str, Type]) -> None:
         [module.inject(objects) for _, module in self.pymodules().items()]
@@ -275,10 +670,12 @@ class Group(object):
             objects.update(module.temporal_objects())
         return objects
 
-    def payloads(self) -> Mapping[str, Mapping]:
+    def payloads(self, resolve: bool = True) -> Mapping[Path | str, Mapping]:
         payloads = {}
-        for name, yaml in self.yamlmodules().items():
-            payloads.update({name: yaml.load()})
+        for yaml in self.yamlmodules().values():
+            payloads.update(yaml.payloads())
+            if resolve:
+                yaml.changes_resolved()
         return payloads
 
     def pymodules(self) -> dict[str, PyModule]:
@@ -287,41 +684,488 @@ class Group(object):
     def yamlmodules(self) -> dict[str, YamlModule]:
         return {k:v for k,v in self.modules.items() if isinstance(v, YamlModule)} # type: ignore
 
-    def _watch_modules(self) -> Sequence[Path]:
-        modified = []
-        for path, module in self.modules.items():
-            changes = module.watch()
-            if changes:
-                modified.append(path)
-        return modified
-
-    def _register_module(self, new: bool= False) -> Sequence[Path]:
+    def set_rehash_interval(self, interval: int = 0) -> None:
+        self.rehash_interval = interval
+
+    def set_concurrency(self, concurrency: int = 1) -> None:
+        self.concurrency = concurrency
+
+    def close(self) -> None:
+        """shutdown the group watching threads. A later visit starts them again."""
+        if self.__executor is not None:
+            self.__executor[1].shutdown(wait=False)
+        self.__executor = None
+
+    def _executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        """threads watching the group modules, kept across visits. Resized when the concurrency changes."""
+        if self.__executor is None or self.__executor[0] != self.concurrency:
+            self.close()
+            executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix=f"watcher-{self.name}")
+            self.__executor = (self.concurrency, executor)
+        return self.__executor[1]
+
+    def _watch_modules(self, modules: Mapping[Path, PyModule | YamlModule]) -> Sequence[Path]:
+        self.__visits += 1
+        rehash = self.rehash_interval > 0 and self.__visits % self.rehash_interval == 0
+        modules = list(modules.items())
+        if self.concurrency > 1 and len(modules) > 1:
+            changes = list(self._executor().map(lambda module: module.watch(rehash), [m for _, m in modules]))
+        else:
+            changes = [module.watch(rehash) for _, module in modules]
+        return [path for (path, _), changed in zip(modules, changes) if changed]
+
+    def _register_module(
+        self,
+        modules: dict[Path, PyModule | YamlModule],
+        new: bool= False,
+        paths: set[Path] | None = None
+    ) -> Sequence[Path]:
         registered = []
-        new_paths = list(set(self.paths) - set(self.modules.keys()))
+        if paths is None:
+            paths = set(self.paths)
+        new_paths = list(paths - set(modules.keys()))
         for path in new_paths:
             registered.append(path)
-            if path.suffix in [".yml", ".yaml"]:
-                self.__modules[path] = YamlModule(path, new)
-            elif path.suffix == ".py":
-                self.__modules[path] = PyModule(path, new)
+            self._add_module(modules, path, new)
         return registered
 
-    def _remove_stale_module(self) -> Sequence[Path]:
-        removed_paths = list(set(self.modules.keys()) - set(self.paths))
-        [self.__modules.pop(p) for p in removed_paths]
+    def _add_module(self, modules: dict[Path, PyModule | YamlModule], path: Path, new: bool= False) -> None:
+        snapshot = self.state.get(path) if self.state is not None else None
+        if path.suffix in [".yml", ".yaml"]:
+            module = YamlModule(path, new, snapshot)
+            self._restore_payload(module)
+            modules[path] = module
+        elif path.suffix == ".py":
+            modules[path] = PyModule(path, new, snapshot)
+
+    def _restore_payload(self, module: YamlModule) -> None:
+        if self.state is None or module.latest in module.cache:
+            return
+        payload = self.state.get_payload(module.latest)
+        if payload is not None:
+            module.cache.put(module.latest, freeze(payload), module.last_stat[1])
+            return
+        documents = self.state.get_documents(module.module)
+        for version, payload in documents:
+            module.cache.put(version, freeze(payload), module.last_stat[1] // len(documents))
+
+    def _covers(self, path: Path, directory: bool = False) -> bool:
+        """True if the path falls within the group basepaths and is not skipped."""
+        if path in self.skips or any([p in self.skips for p in path.parents]):
+            return False
+        if directory is False and (path.suffix not in [".py", ".yaml", ".yml"] or path.name.startswith(("_", "."))):
+            return False
+        for basepath in self.basepaths:
+            if path == basepath:
+                return True
+            if basepath in path.parents:
+                hidden = [p for p in path.relative_to(basepath).parts[:-1] if p.startswith(".")]
+                return len(hidden) == 0
+        return False
+
+    def _remove_stale_module(self, modules: dict[Path, PyModule | YamlModule], paths: set[Path] | None = None) -> Sequence[Path]:
+        if paths is None:
+            paths = set(self.paths)
+        removed_paths = list(set(modules.keys()) - paths)
+        [modules.pop(p) for p in removed_paths]
         return removed_paths
 
-    def _explore(self, path: Path) -> Sequence[Path]:
-        py = glob.glob(str(path.joinpath("**", "[!_]*.py")), recursive=True)
-        yaml = glob.glob(str(path.joinpath("**", "[!_]*.yaml")), recursive=True)
-        yml = glob.glob(str(path.joinpath("**", "[!_]*.yml")), recursive=True)
-        return [Path(p) for p in py + yaml + yml if Path(p) not in self.skips]
+    def _explore(self, path: Path, skips: set[Path], explored: set[Path] | None = None) -> Sequence[Path]:
+        """single walk collecting all watched suffixes. Skipped directories are not explored."""
+        if explored is None:
+            explored = set()
+        paths, directories = [], [path]
+        while directories:
+            directory = directories.pop()
+            explored.add(directory)
+            files, subdirectories = self._listdir(directory)
+            paths.extend([p for p in files if p not in skips])
+            directories.extend([d for d in subdirectories if d not in skips])
+        return paths
+
+    def _listdir(self, directory: Path) -> tuple[list[Path], list[Path]]:
+        """
+        list watched files and subdirectories of a directory.
+        Listings are cached until the directory mtime moves. Listings of directories
+        modified in the last seconds are not trusted, as mtime granularity may hide a change.
+        """
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except FileNotFoundError:
+            self.__listings.pop(directory, None)
+            return [], []
+
+        listing = self.__listings.get(directory, None)
+        if listing is not None and listing[0] == mtime:
+            return listing[1], listing[2]
+
+        files, subdirectories = [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                elif entry.is_dir():
+                    subdirectories.append(Path(entry.path))
+                elif entry.name.startswith("_") is False and entry.name.endswith(SUFFIXES):
+                    files.append(Path(entry.path))
+
+        if time.time_ns() - mtime > RACY_LISTING_NS:
+            self.__listings[directory] = (mtime, files, subdirectories)
+        else:
+            self.__listings.pop(directory, None)
+        return files, subdirectories
+
+
+
+
+class TemporalRegistry(object):
+    """
+    Temporal objects contributed by each PyModule, maintained incrementally.
+    Objects are registered per group. `kinds` maps groups to the temporal objects they provide.
+    """
+    kinds: dict[str, Callable[[Any], bool]] = {
+        "activities": is_activity,
+        "workflows": is_workflow,
+        "runners": is_runner,
+        "workers": is_temporal_worker
+    }
+    __contributions: dict[str, dict[Path, Mapping[str, Type]]]
+    __groups: dict[str, dict[str, Type]]
+    __owners: dict[tuple[str, str], Path]
+
+    def __init__(self) -> None:
+        self.__contributions = {}
+        self.__groups = {}
+        self.__owners = {}
+
+    def copy(self) -> TemporalRegistry:
+        """shadow registry. Changes to the copy leave this one untouched."""
+        registry = TemporalRegistry()
+        registry.__contributions = {g:dict(c) for g, c in self.__contributions.items()}
+        registry.__groups = {g:dict(o) for g, o in self.__groups.items()}
+        registry.__owners = dict(self.__owners)
+        return registry
+
+    def contribution(self, group: str, path: Path) -> Mapping[str, Type]:
+        return self.__contributions.get(group, {}).get(path, {})
+
+    def paths(self, group: str) -> set[Path]:
+        return set(self.__contributions.get(group, {}).keys())
+
+    def objects(self, *groups: str) -> dict[str, Type]:
+        objects = {}
+        names = groups or list(self.__groups.keys())
+        [objects.update(self.__groups.get(name, {})) for name in names]
+        return objects
 
+    def kind(self, kind: str) -> dict[str, Type]:
+        predicate = self.kinds[kind]
+        return {k:v for k,v in self.__groups.get(kind, {}).items() if predicate(v)}
+
+    def register(
+        self,
+        group: str,
+        module: PyModule,
+        current: Mapping[str, Type] | None = None
+    ) -> tuple[dict[str, Type], list[str]]:
+        """
+        register the module current objects, or the given ones for a staged module.
+        Return the updated and removed objects names.
+        """
+        objects = self.__groups.setdefault(group, {})
+        contributions = self.__contributions.setdefault(group, {})
+        previous = contributions.get(module.module, {})
+        current = module.objects if current is None else current
+
+        removed = []
+        for name in set(previous.keys()) - set(current.keys()):
+            if self.__owners.get((group, name), None) == module.module:
+                objects.pop(name, None)
+                self.__owners.pop((group, name))
+                removed.append(name)
+
+        updated = {}
+        for name, obj in current.items():
+            if objects.get(name, None) is not obj:
+                updated[name] = obj
+            objects[name] = obj
+            self.__owners[(group, name)] = module.module
+        contributions[module.module] = current
+        return updated, removed
+
+    def unregister(self, group: str, path: Path) -> list[str]:
+        objects = self.__groups.get(group, {})
+        removed = []
+        for name in self.__contributions.get(group, {}).pop(path, {}).keys():
+            if self.__owners.get((group, name), None) == path:
+                objects.pop(name, None)
+                self.__owners.pop((group, name))
+                removed.append(name)
+        return removed
+
+    def update(
+        self,
+        reloaded: Mapping[str, Sequence[PyModule]],
+        stales: Mapping[str, Sequence[Path]] | None = None,
+        staged: Mapping[Path, Mapping[str, Type]] | None = None
+    ) -> Mapping[str, Any]:
+        """
+        register reloaded modules and unregister stale ones.
+        `staged` holds the objects of modules not committed yet, per path. Return the delta:
+            :objects: all updated objects.
+            :removed: all removed objects names.
+            :<kind>: updated objects of a kind.
+            :removed_<kind>: removed objects names of a kind.
+        """
+        delta: dict[str, Any] = {"objects": {}, "removed": []}
+        staged = staged or {}
+        changes = [
+            (group, self.register(group, module, staged.get(module.module, None)))
+            for group, modules in reloaded.items() for module in modules
+        ]
+        changes.extend([(group, ({}, self.unregister(group, path))) for group, paths in (stales or {}).items() for path in paths])
+        for group, (updated, removed) in changes:
+            delta["objects"].update(updated)
+            delta["removed"].extend(removed)
+            predicate = self.kinds.get(group, None)
+            if predicate is None:
+                continue
+            delta.setdefault(group, {}).update({k:v for k,v in updated.items() if predicate(v)})
+            delta.setdefault(f"removed_{group}", []).extend(removed)
+        return delta
+
+
+class SettingsRegistry(object):
+    """
+    tasks and workers settings contributed by each YamlModule, maintained incrementally per module version.
+    Payloads are the frozen cached ones: shared, never copied. On duplicated names, the latest registered module wins.
+    """
+    keys: dict[str, Callable[[Mapping[str, Any]], str]] = {
+        "tasks": lambda payload: payload["name"],
+        "workers": lambda payload: payload["worker"]["task_queue"]
+    }
+    __versions: dict[str, dict[Path, str]]
+    __contributions: dict[str, dict[Path, dict[str, Mapping[str, Any]]]]
+    __contributors: dict[str, dict[str, dict[Path, None]]]
+    __settings: dict[str, dict[str, Mapping[str, Any]]]
+
+    def __init__(self) -> None:
+        self.__versions = {}
+        self.__contributions = {}
+        self.__contributors = {}
+        self.__settings = {}
+
+    def copy(self) -> SettingsRegistry:
+        """shadow registry. Changes to the copy leave this one untouched."""
+        registry = SettingsRegistry()
+        registry.__versions = {k:dict(v) for k, v in self.__versions.items()}
+        registry.__contributions = {k:dict(c) for k, c in self.__contributions.items()}
+        # the contributors of a name are replaced, never mutated: they are shared with the copy.
+        registry.__contributors = {k:dict(c) for k, c in self.__contributors.items()}
+        registry.__settings = {k:dict(s) for k, s in self.__settings.items()}
+        return registry
+
+    def settings(self, kind: str) -> Mapping[str, Mapping[str, Any]]:
+        return self.__settings.get(kind, {})
+
+    def update(self, kind: str, modules: Mapping[Path, YamlModule]) -> tuple[dict[str, Mapping[str, Any]], list[str]]:
+        """
+        register the payloads of the modules whose version moved, and unregister the removed modules.
+        Return the (updated settings, removed names).
+        """
+        versions = self.__versions.setdefault(kind, {})
+        contributions = self.__contributions.setdefault(kind, {})
+        contributors = self.__contributors.setdefault(kind, {})
+        settings = self.__settings.setdefault(kind, {})
+        changed = [(path, module) for path, module in modules.items() if versions.get(path, None) != module.latest]
+        removed = [path for path in versions.keys() if path not in modules]
+        if not changed and not removed:
+            return {}, []
+
+        touched: dict[str, None] = {}
+        for path in removed + [path for path, _ in changed]:
+            versions.pop(path, None)
+            for name in contributions.pop(path, {}).keys():
+                contributors[name] = {p:None for p in contributors.get(name, {}) if p != path}
+                touched[name] = None
+        for path, module in changed:
+            payloads = {self.keys[kind](payload):payload for payload in module.payloads().values()}
+            versions[path], contributions[path] = module.latest, payloads
+            for name in payloads.keys():
+                contributors[name] = {**contributors.get(name, {}), path:None}
+                touched[name] = None
+
+        updated, names = {}, []
+        for name in touched.keys():
+            holders = contributors.get(name, {})
+            if not holders:
+                contributors.pop(name, None)
+                if settings.pop(name, None) is not None:
+                    names.append(name)
+                continue
+            payload = contributions[next(reversed(holders))][name]
+            if settings.get(name, None) is not payload:
+                settings[name] = updated[name] = payload
+        return updated, names
+
+
+class ModuleGenerations(object):
+    """
+    weak references to the successive generations of reloaded modules and to the objects they define.
+    A superseded generation stays alive while its module, or one of its objects, is still referenced.
+    Dead generations are forgotten.
+    """
+    threshold: int = 8
+    __generations: dict[str, list[tuple[int, list[weakref.ref]]]]
+    __counts: dict[str, int]
+
+    def __init__(self) -> None:
+        self.__generations = {}
+        self.__counts = {}
+
+    def __len__(self) -> int:
+        return sum([len(generations) for generations in self.__generations.values()])
+
+    def track(self, module: ModuleType, objects: Mapping[str, Type]) -> int:
+        name = module.__name__
+        refs = []
+        for obj in [module, *[o for o in objects.values() if getattr(o, "__module__", None) == name]]:
+            try:
+                refs.append(weakref.ref(obj))
+            except TypeError:
+                continue
+        number = self.__counts.get(name, 0) + 1
+        self.__counts[name] = number
+        generations = [g for g in self.__generations.get(name, []) if any(r() is not None for r in g[1])]
+        self.__generations[name] = generations + [(number, refs)]
+        return number
+
+    def superseded(self) -> dict[str, list[tuple[int, list[Any]]]]:
+        """alive generations that are no longer in sys.modules, with their alive module and objects."""
+        superseded = {}
+        for name, generations in self.__generations.items():
+            live = sys.modules.get(name, None)
+            for number, refs in generations:
+                alive = [obj for obj in [r() for r in refs] if obj is not None]
+                if len(alive) == 0 or refs[0]() is live:
+                    continue
+                superseded.setdefault(name, []).append((number, alive))
+        return superseded
+
+    def collect(self, force: bool = False) -> int:
+        """
+        reclaim superseded generations held by reference cycles. Return how many are still alive.
+        A full collection only runs once `threshold` superseded generations are pending, unless forced.
+        """
+        pending = sum([len(generations) for generations in self.superseded().values()])
+        if pending > 0 and (force or pending >= self.threshold):
+            gc.collect()
+        self.__generations = {
+            name:[g for g in generations if any(r() is not None for r in g[1])]
+            for name, generations in self.__generations.items()
+        }
+        return sum([len(generations) for generations in self.superseded().values()])
+
+    def report(self) -> Mapping[str, Any]:
+        """per module: generations count, live generation and superseded generations still referenced, by whom."""
+        report = {}
+        superseded = self.superseded()
+        for name, generations in self.__generations.items():
+            live = [number for number, refs in generations if refs[0]() is not None and refs[0]() is sys.modules.get(name, None)]
+            report[name] = {
+                "generations": self.__counts.get(name, 0),
+                "live": live[0] if live else None,
+                "superseded": [
+                    {
+                        "generation": number,
+                        "objects": [getattr(obj, "__name__", repr(obj)) for obj in alive],
+                        "referrers": sorted(set(chain.from_iterable([self.referrers(obj, [alive]) for obj in alive])))
+                    }
+                    for number, alive in superseded.get(name, [])
+                ]
+            }
+        return report
+
+    @staticmethod
+    def referrers(obj: Any, ignore: Sequence[Any] = ()) -> list[str]:
+        """best effort description of what holds an object: modules namespaces, workers, or the holder type."""
+        def workers(container: Any, depth: int = 2) -> list[str]:
+            found = []
+            for ref in gc.get_referrers(container):
+                if hasattr(ref, "task_queue"):
+                    found.append(f"worker {ref.task_queue}")
+                elif depth > 1 and isinstance(ref, dict):
+                    found.extend(workers(ref, depth - 1))
+            return found
+
+        holders = []
+        attributes = list(getattr(obj, "__dict__", {}).values())
+        internals = [getattr(obj, "__globals__", None), getattr(obj, "__mro__", None), getattr(obj, "__dict__", None)]
+        for ref in gc.get_referrers(obj):
+            if any(ref is internal for internal in [*internals, *attributes, *ignore]):
+                continue
+            if type(ref).__name__ in ["cell", "getset_descriptor", "member_descriptor", "frame"]:
+                continue
+            if isinstance(ref, dict) and isinstance(ref.get("__name__", None), str):
+                module = sys.modules.get(ref["__name__"], None)
+                holders.append(f"module {ref['__name__']}" if module is not None and module.__dict__ is ref else "superseded module")
+                continue
+            found = workers(ref) if isinstance(ref, (list, dict, tuple)) else []
+            holders.extend(found or [type(ref).__name__])
+        return holders
+
+
+class Generation(object):
+    """
+    changed modules staged aside with the registry and settings they produce. Published at once.
+    `tasks_settings` and `workers_settings` only hold the updated entries, `removed_tasks` and `removed_workers` the removed names.
+    """
+    def __init__(
+        self,
+        modules: Mapping[str, Sequence[PyModule]],
+        staged: Mapping[Path, ModuleType],
+        versions: Mapping[Path, str],
+        registry: TemporalRegistry,
+        delta: Mapping[str, Any],
+        settings: SettingsRegistry,
+        tasks_settings: Mapping[str, Mapping[str, Any]],
+        removed_tasks: Sequence[str],
+        workers_settings: Mapping[str, Mapping[str, Any]],
+        removed_workers: Sequence[str]
+    ) -> None:
+        self.modules = modules
+        self.staged = staged
+        self.versions = versions
+        self.registry = registry
+        self.delta = delta
+        self.settings = settings
+        self.tasks_settings = tasks_settings
+        self.removed_tasks = removed_tasks
+        self.workers_settings = workers_settings
+        self.removed_workers = removed_workers
+        self.errors: list[str] = []
+        self.dependents: dict[Path, list[str]] = {}
+        self.plans: Mapping[str, Any] = {}
+        self.compiled: list[str] = []
 
+    @property
+    def task_queues(self) -> list[str]:
+        """task queues of the workers depending on a changed module."""
+        return sorted(set(chain.from_iterable(self.dependents.values())))
 
 
 class Watcher(object):
+    """
+    Watcher keeps a path index of all groups modules and a dirty set of changed modules per group.
+    Both are maintained by visits, so lookups and changes queries do not scan every group.
+    Visits run on executor threads: the index and dirty sets are replaced, never mutated in place.
+    """
     __groups: dict[str, Group]
+    __index: dict[Path, tuple[str, PyModule | YamlModule]]
+    __dirty: dict[str, set[Path]]
+    __basepaths: list[Path] | None
+    __skips: list[Path] | None
+    state: WatcherState | None = None
 
     @property
     def groups(self) -> dict[str, Group]:
@@ -329,15 +1173,20 @@ class Watcher(object):
 
     @property
     def basepaths(self) -> Sequence[Path]:
-        return list(chain.from_iterable([g.basepaths for g in self.groups.values()]))
+        if self.__basepaths is None:
+            self.__basepaths = list(chain.from_iterable([g.basepaths for g in self.groups.values()]))
+        return self.__basepaths
 
     @property
     def paths(self) -> Sequence[Path]:
-        return list(chain.from_iterable([g.paths for g in self.groups.values()]))
+        """paths of all registered modules, as of the last visit."""
+        return list(self.__index.keys())
 
     @property
     def skips(self) -> Sequence[Path]:
-        return list(chain.from_iterable([g.skips for g in self.groups.values()]))
+        if self.__skips is None:
+            self.__skips = list(chain.from_iterable([g.skips for g in self.groups.values()]))
+        return self.__skips
 
     @property
     def modules(self) -> dict[str, Sequence[ PyModule | YamlModule]]:
@@ -345,14 +1194,29 @@ class Watcher(object):
 
     @property
     def changed_modules(self) -> dict[str, Sequence[ PyModule | YamlModule]]:
-        return {k:[m for m in v.modules.values() if m.changes] for k,v in self.groups.items()}
+        changed = {}
+        index = self.__index
+        for name in self.groups.keys():
+            modules = [index.get(p, (None, None))[1] for p in self.__dirty.get(name, ())]
+            changed[name] = [m for m in modules if m is not None and m.changes and not self._held(m)]
+        return changed
 
     @property
     def unchanged_modules(self) -> dict[str, Sequence[ PyModule | YamlModule]]:
-        return {k:[m for m in v.modules.values() if m.changes is False] for k,v in self.groups.items()}
+        return {k:[m for m in v.modules.values() if m.changes is False or self._held(m)] for k,v in self.groups.items()}
+
+    @staticmethod
+    def _held(module: PyModule | YamlModule) -> bool:
+        """pinned modules keep their file changes until unpinned, without asking for a refresh."""
+        return isinstance(module, PyModule) and module.held
 
     def __init__(self, *paths: StrOrPath, **groups: Group) -> None:
         self.__groups = {k:v for k,v in groups.items()}
+        self.__index = {}
+        self.__dirty = {}
+        self.__basepaths = None
+        self.__skips = None
+        [self._index_group(g) for g in self.groups.values()]
         if paths:
             self.add_group("others", paths, [])
 
@@ -364,22 +1228,42 @@ class Watcher(object):
             raise LaunchpadKeyError(f"Cannot add group {name}. Group already exist.")
 
         basepaths = to_path(basepaths)
-        self.__groups[name] = Group(name, basepaths, skips)
+        self.__groups[name] = Group(name, basepaths, skips, state=self.state)
+        self._index_group(self.__groups[name])
 
     def remove_group(self, name: str):
         group = self.__groups.pop(name)
+        self._unindex_group(group)
+        group.close()
+
+    def close(self) -> None:
+        [group.close() for group in self.groups.values()]
 
     def add_paths(self, group_name: str, paths: list[StrOrPath]) -> None:
         group = self.groups.get(group_name, None)
         if group is None:
             raise LaunchpadKeyError(f"Cannot add paths to group {group_name}. Group does not exist.")
         group.add_paths(*paths)
+        self._unindex_group(group)
+        self._index_group(group)
 
     def remove_paths(self, group_name: str, paths: list[StrOrPath]) -> None:
         group = self.groups.get(group_name, None)
         if group is None:
             raise LaunchpadKeyError(f"Cannot remove paths from group {group_name}. Group does not exist.")
         group.remove_paths(*paths)
+        self._unindex_group(group)
+        self._index_group(group)
+
+    def set_rehash_interval(self, interval: int = 0) -> None:
+        [g.set_rehash_interval(interval) for g in self.groups.values()]
+
+    def set_history(self, size: int | None = None, spill: StrOrPath | None = None) -> None:
+        if spill is not None:
+            Module.history_spill = Path(spill)
+        if size is not None:
+            Module.history_size = size
+            [m.resize_history(size) for g in self.groups.values() for m in g.modules.values()]
 
     def get(self, group: str) -> Group:
         grp = self.groups.get(group, None)
@@ -388,10 +1272,19 @@ class Watcher(object):
         return grp
 
     def get_module(self, path: StrOrPath, default: Any= None) -> PyModule | YamlModule:
+        path = Path(path)
+        name, module = self.__index.get(path, (None, None))
+        group = self.groups.get(name, None) if name is not None else None
+        if group is not None and group.modules.get(path, None) is module:
+            return module # type: ignore
+
+        # index miss: group visited outside of the watcher.
         module, groups = None, deque(self.groups.values())
         while (module is None and len(groups) > 0):
             group: Group = groups.popleft()
-            module = group.modules.get(Path(path), None)
+            module = group.modules.get(path, None)
+            if module is not None:
+                self.__index[path] = (group.name, module)
         return module or default
 
     @log_watcher_visit
@@ -400,12 +1293,31 @@ class Watcher(object):
         grps = self._select_groups(groups)
         for group in grps:
             changes = group.visit()
+            self._update_index(group, changes)
+            res[group.name] = changes
+        self.persist()
+        return res
+
+    @log_watcher_visit
+    def visit_paths(self, paths: Iterable[Path], *groups: str) -> Mapping[str, Any]:
+        res = {}
+        paths = list(paths)
+        grps = self._select_groups(groups)
+        for group in grps:
+            changes = group.visit_paths(paths)
+            self._update_index(group, changes)
             res[group.name] = changes
+        self.persist()
         return res
 
-    def reload(self, *groups: str) -> None:
+    def persist(self) -> None:
+        if self.state is None:
+            return
+        self.state.save([m for g in self.groups.values() for m in g.modules.values()])
+
+    def reload(self, *groups: str) -> Mapping[str, Sequence[PyModule]]:
         grps = self._select_groups(groups)
-        [g.reload() for g in grps]
+        return {g.name:g.reload() for g in grps}
 
     def load(self, *groups: str) -> None:
         grps = self._select_groups(groups)
@@ -431,6 +1343,34 @@ class Watcher(object):
             raise LaunchpadTypeError("YamlModules don't have temporal objects")
         module.reload()
 
+    def pin_module(self, module_path: StrOrPath, version: str) -> str:
+        module = self.get_module(module_path)
+        if module is None:
+            raise LaunchpadKeyError(f"Cannot pin {module_path}. Module is not watched.")
+        if isinstance(module, YamlModule):
+            raise LaunchpadTypeError("YamlModules cannot be pinned")
+        return module.pin(version)
+
+    def unpin_module(self, module_path: StrOrPath) -> None:
+        module = self.get_module(module_path)
+        if module is None:
+            raise LaunchpadKeyError(f"Cannot unpin {module_path}. Module is not watched.")
+        if isinstance(module, YamlModule):
+            raise LaunchpadTypeError("YamlModules cannot be pinned")
+        module.unpin()
+
+    def pin_group(self, group: str) -> Mapping[Path, str]:
+        """pin every python module of the group to the version preceding its live one. All or nothing."""
+        modules = self.get(group).pymodules()
+        previous = {path:module.previous for path, module in modules.items()}
+        missing = [str(path) for path, version in previous.items() if version is None or version not in PyModule.codes]
+        if missing:
+            raise LaunchpadKeyError(f"Cannot pin group {group}. No compiled previous version for: {missing}")
+        return {path:modules[path].pin(version) for path, version in previous.items()} # type: ignore
+
+    def unpin_group(self, group: str) -> None:
+        [module.unpin() for module in self.get(group).pymodules().values()]
+
     def temporal_objects_from_module(self, module_path: StrOrPath) -> Mapping[str, Type]:
         module = self.get_module(module_path)
         if isinstance(module, YamlModule):
@@ -449,6 +1389,38 @@ class Watcher(object):
             raise LaunchpadTypeError("YamlModules cannot receives temporal objects")
         module.inject(objects)
 
+    def _index_group(self, group: Group) -> None:
+        index, dirty = dict(self.__index), set(self.__dirty.get(group.name, ()))
+        for path, module in group.modules.items():
+            index[path] = (group.name, module)
+            if module.changes:
+                dirty.add(path)
+        self.__index = index
+        self.__dirty = dict(self.__dirty, **{group.name: dirty})
+        self.__basepaths, self.__skips = None, None
+
+    def _unindex_group(self, group: Group) -> None:
+        self.__index = {p:entry for p, entry in self.__index.items() if entry[0] != group.name}
+        self.__dirty = {name:dirty for name, dirty in self.__dirty.items() if name != group.name}
+        self.__basepaths, self.__skips = None, None
+
+    def _update_index(self, group: Group, changes: Mapping[str, Sequence[Path]]) -> None:
+        index = dict(self.__index)
+        # resolved modules are pruned here rather than by the readers.
+        dirty = set([p for p in self.__dirty.get(group.name, ()) if p in group.modules and group.modules[p].changes])
+        for path in changes.get("removed", []):
+            index.pop(path, None)
+            dirty.discard(path)
+        for path in list(changes.get("added", [])) + list(changes.get("modified", [])):
+            module = group.modules.get(path, None)
+            if module is None:
+                continue
+            index[path] = (group.name, module)
+            if module.changes:
+                dirty.add(path)
+        self.__index = index
+        self.__dirty = dict(self.__dirty, **{group.name: dirty})
+
     def _select_groups(self, group_names: Sequence[str]) -> Sequence[Group]:
         groups = self.groups.values()
         if len(group_names) > 0:
@@ -460,6 +1432,11 @@ class LaunchpadWatcher(Watcher):
     watcher: Process | None = None
     polling_interval: int = 600
     automatic_refresh: bool = True
+    backend: str = "polling"
+    debounce: float = 0.2
+    adaptive: bool = False
+    max_polling_interval: int | None = None
+    restart_workers: bool = True
     base_modules: dict[str, list[StrOrPath | Traversable]] = {
         "workflows": [files("launchpad").joinpath("temporal", "workflows.py")], # type: ignore
         "workers": [files("launchpad").joinpath("temporal", "workers.py")], # type: ignore
@@ -470,91 +1447,551 @@ class LaunchpadWatcher(Watcher):
 
     def __init__(self, *paths: StrOrPath,  **groups: Group) -> None:
         super().__init__(*paths, **groups)
+        self.__lock = asyncio.Lock()
+        self.__importer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="watcher-importer")
+        self.registry = TemporalRegistry()
+        self.settings_registry = SettingsRegistry()
+        self.generations = ModuleGenerations()
+        self.__targets: list[str] = []
+        self.groups_intervals: dict[str, int] = {}
+        self.__backoffs: dict[str, int] = {}
+        self.__due: dict[str, float] = {}
 
     @classmethod
-    def initialize(cls, *paths,**groups: dict[str, list[StrOrPath]]) -> LaunchpadWatcher:
+    def initialize(
+        cls,
+        *paths,
+        state: WatcherState | None = None,
+        **groups: dict[str, list[StrOrPath]]
+    ) -> LaunchpadWatcher:
         basegroups = {}
         for k in list(set(cls.base_modules).union(set(groups.keys()))):
             basepaths = cls.base_modules.get(k, [])
             group = groups.get(k, {})
             skips = group.get("skips", [])
+            concurrency = group.get("concurrency", 1)
             basepaths.extend(group.get("basepaths", []))
-            basegroups.update({k:Group(k, basepaths, skips)}) # type: ignore
-        return cls(*paths, **basegroups)
+            basegroups.update({k:Group(k, basepaths, skips, concurrency=concurrency, state=state)}) # type: ignore
+        watcher = cls(*paths, **basegroups)
+        watcher.state = state
+        return watcher
+
 
+    def workers_settings(self, resolve: bool = True) -> Mapping[str, Mapping[str, Any]]:
+        return self._settings("workers", resolve)
 
-    def workers_settings(self) -> Mapping[str, Mapping[str, Any]]:
-        return {v["worker"]["task_queue"]:v for v in self.get("workers").payloads().values()}
+    def tasks_settings(self, resolve: bool = True) -> Mapping[str, Mapping[str, Any]]:
+        return self._settings("tasks", resolve)
 
-    def tasks_settings(self) -> Mapping[str, Mapping[str, Any]]:
-        return {v["name"]:v for v in self.get("tasks").payloads().values()}
+    def _settings(self, group: str, resolve: bool = True) -> Mapping[str, Mapping[str, Any]]:
+        """settings of a group. Only the modules whose version moved are read again. `resolve` marks them published."""
+        registry = self.settings_registry if resolve else self.settings_registry.copy()
+        registry.update(group, self.get(group).yamlmodules())
+        if resolve:
+            [m.changes_resolved() for m in self.changed_modules.get(group, []) if isinstance(m, YamlModule)]
+        return dict(registry.settings(group))
 
     def activities(self) -> Mapping[str, Type]:
-        return {k:v for k,v in self.get("activities").temporal_objects().items() if is_activity(v)}
+        return self.registry.kind("activities")
 
     def workflows(self) -> Mapping[str, Type]:
-        return {k:v for k,v in self.get("workflows").temporal_objects().items() if is_workflow(v)}
+        return self.registry.kind("workflows")
 
     def workers(self) -> Mapping[str, Type]:
-        return {k:v for k,v in self.get("workers").temporal_objects().items() if is_temporal_worker(v)}
+        return self.registry.kind("workers")
 
     def runners(self) -> Mapping[str, Type]:
-        return {k:v for k,v in self.get("runners").temporal_objects().items() if is_runner(v)}
+        return self.registry.kind("runners")
+
+    def temporal_objects(self, *groups: str) -> Mapping[str, Type]:
+        grps = self._select_groups(groups)
+        return self.registry.objects(*[g.name for g in grps])
 
     def configs(self) -> Sequence[Mapping[str, Any]]:
         return [v for v in self.get("configs").payloads().values()]
 
+    async def watch(self, app: Sanic) -> None:
+        if self.backend == "inotify" and Inotify.available():
+            await self.listen(app)
+        else:
+            if self.backend == "inotify":
+                logger.warning("inotify is not available. Falling back on polling.")
+            await self.poll(app)
+
     async def poll(self, app: Sanic) -> None:
+        """visit groups when they are due. Each group runs on its own interval."""
+        loop = asyncio.get_running_loop()
         while True:
-            await asyncio.sleep(self.polling_interval)
-            logger.info("Visiting files...")
-            self.visit()
-            changes = any(aggregate(self.changed_modules))
-            if self.automatic_refresh and changes:
-                logger.info("Automatic file refreshing...")
-                await self.update_app(app)
-            elif changes and self.automatic_refresh is False:
-                logger.info("Automatic refresing is deactivated.")
-            logger.info(f"Next automatic visit in {self.polling_interval}...")
-
-    async def update_app(self, app: Sanic) -> None:
-        try:
-            activities = self.activities()
-            workflows = self.workflows()
-            runners = self.runners()
-            workers = self.workers()
-            workers_settings =  self.workers_settings()
-            tasks_settings = self.tasks_settings()
-
-            self.reload()
-            objects = self.temporal_objects()
-            self.inject("workflows", "runners", "workers", "temporal", objects=objects)
-        except Exception:
-            logger.warning("Modules Update failed...")
-            return
+            now = loop.time()
+            [self.__due.setdefault(name, now + self.group_interval(name)) for name in self.groups.keys()]
+            due = self.due_groups(now)
+            if len(due) == 0:
+                next_due = min([self.__due[name] for name in self.groups.keys()], default=now + self.polling_interval)
+                await asyncio.sleep(max(0, next_due - now))
+                continue
+            logger.info(f"Visiting {', '.join(due)} files...")
+            visited = await self.async_visit(*due)
+            self._reschedule(visited, loop.time())
+            await self._refresh(app)
 
+    @property
+    def schedule(self) -> Mapping[str, float]:
+        """current polling interval of each group."""
+        return {name:self.group_interval(name) for name in self.groups.keys()}
+
+    def group_interval(self, group: str) -> float:
+        """
+        group own interval, or the global one.
+        In adaptive mode, the interval doubles after each quiet visit up to `max_polling_interval`
+        (default 8 times the base interval), and falls back to the base interval after a change.
+        """
+        base = self.groups_intervals.get(group, self.polling_interval)
+        if self.adaptive is False:
+            return base
+        return min(base * 2 ** self.__backoffs.get(group, 0), self.max_interval(group))
+
+    def remove_group(self, name: str):
+        super().remove_group(name)
+        self.__due.pop(name, None)
+        self.__backoffs.pop(name, None)
+
+    def close(self) -> None:
+        super().close()
+        self.__importer.shutdown(wait=False)
+
+    def due_groups(self, now: float) -> list[str]:
+        return [name for name, due in self.__due.items() if due <= now and name in self.groups]
+
+    def _reschedule(self, visited: Mapping[str, Mapping[str, Sequence[Path]]], now: float) -> None:
+        for name, changes in [(name, changes) for name, changes in visited.items() if name in self.groups]:
+            quiet = not any(len(paths) > 0 for paths in changes.values())
+            backoff = self.__backoffs.get(name, 0)
+            if quiet and self.group_interval(name) < self.max_interval(name):
+                self.__backoffs[name] = backoff + 1
+            elif not quiet:
+                self.__backoffs[name] = 0
+            self.__due[name] = now + self.group_interval(name)
+
+    def max_interval(self, group: str) -> float:
+        base = self.groups_intervals.get(group, self.polling_interval)
+        return max(base, self.max_polling_interval or base * 8) if self.adaptive else base
+
+    async def listen(self, app: Sanic) -> None:
+        """
+        inotify driven watch. Bursts of events are coalesced over `debounce` seconds
+        and only the touched paths are visited.
+        """
+        inotify = Inotify()
+        watched, dropped = set(), set()
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        loop.add_reader(inotify.fd, event.set)
+        logger.info("Listening to files events...")
+        try:
+            while True:
+                # basepaths not watched yet, or whose watch was dropped, are (re)added.
+                pending = set(self.basepaths) - watched
+                added = set([path for path in pending if inotify.add_tree(path)])
+                watched.update(added)
+                if added & dropped:
+                    # events were missed while unwatched.
+                    await self.async_visit_paths(added & dropped)
+                    dropped -= added
+                    await self._refresh(app)
+                try:
+                    # missing basepaths are retried: their parent directory may not be watched.
+                    await asyncio.wait_for(event.wait(), None if pending == added else max(self.debounce, 1))
+                except asyncio.TimeoutError:
+                    continue
+                # the fd stays readable until drained: stop listening while debouncing.
+                loop.remove_reader(inotify.fd)
+                await asyncio.sleep(self.debounce)
+                event.clear()
+                paths = inotify.read()
+                loop.add_reader(inotify.fd, event.set)
+                if inotify.ignored:
+                    ignored, inotify.ignored = inotify.ignored, set()
+                    unwatched = set([p for p in watched if any(d in (p, p.parent) or p in d.parents for d in ignored)])
+                    watched -= unwatched
+                    dropped |= unwatched
+                if inotify.overflowed:
+                    inotify.overflowed = False
+                    logger.warning("inotify queue overflowed. Visiting all files...")
+                    await self.async_visit()
+                elif paths:
+                    await self.async_visit_paths(paths)
+                await self._refresh(app)
+        finally:
+            loop.remove_reader(inotify.fd)
+            inotify.close()
+
+    async def _refresh(self, app: Sanic) -> None:
+        changes = any(aggregate(self.changed_modules))
+        if self.automatic_refresh and changes:
+            logger.info("Automatic file refreshing...")
+            await self.update_app(app)
+        elif changes and self.automatic_refresh is False:
+            logger.info("Automatic refresing is deactivated.")
+
+    async def async_visit(self, *groups: str) -> Mapping[str, Any]:
+        """visit groups on an executor. Visits are serialized."""
+        loop = asyncio.get_running_loop()
+        async with self.__lock:
+            return await loop.run_in_executor(None, partial(self.visit, *groups))
+
+    async def async_visit_paths(self, paths: Iterable[Path], *groups: str) -> Mapping[str, Any]:
+        loop = asyncio.get_running_loop()
+        async with self.__lock:
+            return await loop.run_in_executor(None, partial(self.visit_paths, paths, *groups))
+
+    async def update_app(self, app: Sanic) -> list[str]:
+        """
+        Stage a new generation of the changed modules and settings on the importer thread, validate it,
+        then publish modules, registry and temporal manager in one synchronous step on the event loop.
+        A generation failing to import or to validate is dropped. The live one is left untouched.
+        Return the reasons the generation was dropped. Empty when it was published.
+        """
+        async with self.__lock:
+            task_queues, errors = await self._apply_generation(app)
+        if task_queues is not None:
+            await self._settle_generation(app, task_queues)
+        return errors
+
+    async def pin(
+        self,
+        app: Sanic,
+        group: str | None = None,
+        module: StrOrPath | None = None,
+        version: str | None = None
+    ) -> Mapping[Path, str]:
+        """pin a group, or a module to a version, and publish it. Pins are reverted when the update is dropped."""
+        if group is None and (module is None or version is None):
+            raise LaunchpadValueError("pin requires either a `group`, or a `module` and a `version`")
+        async with self.__lock:
+            pins = self._pins(group, module)
+            if group is not None:
+                pinned = self.pin_group(group)
+            else:
+                pinned = {Path(module): self.pin_module(module, version)} # type: ignore
+            task_queues, errors = await self._apply_generation(app)
+            if errors:
+                self._restore_pins(pins)
+                raise ModulesUpdateRejected(errors)
+        if task_queues is not None:
+            await self._settle_generation(app, task_queues)
+        return pinned
+
+    async def unpin(self, app: Sanic, group: str | None = None, module: StrOrPath | None = None) -> list[PyModule]:
+        """unpin a group or a module and publish its live version. Pins are reverted when the update is dropped."""
+        if group is None and module is None:
+            raise LaunchpadValueError("unpin requires either a `group` or a `module`")
+        async with self.__lock:
+            pins = self._pins(group, module)
+            if group is not None:
+                self.unpin_group(group)
+            else:
+                self.unpin_module(module) # type: ignore
+            task_queues, errors = await self._apply_generation(app)
+            if errors:
+                self._restore_pins(pins)
+                raise ModulesUpdateRejected(errors)
+        if task_queues is not None:
+            await self._settle_generation(app, task_queues)
+        return list(pins.keys())
+
+    def _pins(self, group: str | None, module: StrOrPath | None) -> dict[PyModule, str | None]:
+        if group is not None:
+            modules = list(self.get(group).pymodules().values())
+        else:
+            modules = [self.get_module(module)] # type: ignore
+        return {m:m.pinned for m in modules if isinstance(m, PyModule)}
+
+    def _restore_pins(self, pins: Mapping[PyModule, str | None]) -> None:
+        for module, pinned in pins.items():
+            module.pinned = pinned
+
+    async def _apply_generation(self, app: Sanic) -> tuple[list[str] | None, list[str]]:
+        """
+        stage and commit a generation. Must be awaited with the watcher lock held.
+        Return the task queues to restart, None when the generation was dropped, and the reasons it was.
+        """
+        loop = asyncio.get_running_loop()
         temporal: TemporalServersManager = app.ctx.temporal
-        temporal.refresh_settings(
-            tasks_settings=tasks_settings,
-            workers_settings=workers_settings
-        )
-        temporal.refresh_temporal_objects(
-            activities=activities,
-            workflows=workflows,
-            runners= runners,
-            workers= workers
-        )
+        try:
+            generation = await loop.run_in_executor(self.__importer, self._stage_generation, temporal)
+        except Exception as e:
+            logger.warning(f"Modules Update failed... {e!r}")
+            return None, [repr(e)]
+
+        if generation.errors:
+            logger.warning("Modules Update rejected. Keeping the live modules:\n" + "\n".join(generation.errors))
+            return None, list(generation.errors)
+
+        try:
+            self._commit_generation(generation, temporal)
+        except Exception as e:
+            logger.warning(f"Modules Update failed and was rolled back... {e!r}")
+            return None, [repr(e)]
+        await loop.run_in_executor(None, self.persist)
         logger.info("Modules Updated!")
+        return list(generation.task_queues), []
+
+    async def _settle_generation(self, app: Sanic, task_queues: list[str]) -> None:
+        loop = asyncio.get_running_loop()
+        temporal: TemporalServersManager = app.ctx.temporal
+        if self.restart_workers and task_queues:
+            logger.info(f"Restarting workers depending on changed modules: {task_queues}")
+            await temporal.rolling_restart(task_queues, app)
+
+        alive = await loop.run_in_executor(None, self.generations.collect)
+        if alive >= self.generations.threshold:
+            logger.warning(f"{alive} superseded modules generations are still referenced. See /watcher/generations.")
 
     def set_polling_interval(self, interval: int= 600):
         self.polling_interval = interval
+        self.__due = {}
+
+    def set_groups_intervals(self, intervals: Mapping[str, int]) -> None:
+        for name, interval in intervals.items():
+            self.get(name)
+            if interval <= 0:
+                raise LaunchpadValueError(f"polling interval of group {name} must be positive. Got {interval}.")
+        self.groups_intervals = dict(intervals)
+        self.__due = {}
+
+    def set_adaptive(self, adaptive: bool = True, max_interval: int | None = None) -> None:
+        self.adaptive = adaptive
+        self.max_polling_interval = max_interval
+        self.__backoffs = {}
+        self.__due = {}
 
     def update_automatic_refresh(self, toggle: bool= True):
         self.automatic_refresh = toggle
 
+    def update_workers_restart(self, toggle: bool= True):
+        self.restart_workers = toggle
+
+    def set_payloads_cache_size(self, maxsize: int):
+        YamlModule.cache.resize(maxsize)
+
+    def set_codes_cache_size(self, maxsize: int):
+        PyModule.codes.resize(maxsize)
+
+    def set_backend(self, backend: str = "polling", debounce: float | None = None):
+        if backend not in ["polling", "inotify"]:
+            raise LaunchpadValueError(f"Unknown watcher backend {backend}. Must be either `polling` or `inotify`.")
+        self.backend = backend
+        if debounce is not None:
+            self.debounce = debounce
+
+    def _stage_generation(self, temporal: TemporalServersManager) -> Generation:
+        """import changed modules aside, register them in a shadow registry and validate the settings against it."""
+        modules = {name:[m for m in g.pymodules().values() if m.stale] for name, g in self.groups.items()}
+        stages = {m.module:m.stage(m.pinned) for changed in modules.values() for m in changed}
+        staged = {path:module for path, (module, _) in stages.items()}
+
+        registry = self.registry.copy()
+        stales = {name:list(registry.paths(name) - g.modules.keys()) for name, g in self.groups.items()}
+        delta = registry.update(modules, stales, {path:PyModule.scan(m) for path, m in staged.items()})
+
+        # only the settings files whose version moved are read again.
+        settings = self.settings_registry.copy()
+        tasks_settings, removed_tasks = settings.update("tasks", self.get("tasks").yamlmodules())
+        workers_settings, removed_workers = settings.update("workers", self.get("workers").yamlmodules())
+        generation = Generation(
+            modules=modules,
+            staged=staged,
+            versions={path:version for path, (_, version) in stages.items()},
+            registry=registry,
+            delta=delta,
+            settings=settings,
+            tasks_settings=tasks_settings,
+            removed_tasks=removed_tasks,
+            workers_settings=workers_settings,
+            removed_workers=removed_workers
+        )
+        tasks, workers = temporal.settings.tasks, temporal.settings.workers
+        new_tasks, new_workers = settings.settings("tasks"), settings.settings("workers")
+        changed_tasks, _ = tasks.diff(tasks_settings, removed_tasks)
+        changed_workers, _ = workers.diff(workers_settings, removed_workers)
+
+        # unchanged settings only break on removed objects. Their plans only go stale on changed runners or workflows.
+        removed = set(delta["removed"])
+        checked_tasks = set(changed_tasks).union(self._tasks_using(tasks, delta, updated=False))
+        checked_workers = set(changed_workers) if not removed else set(new_workers.keys())
+        live_errors = self.validate(
+            self.registry,
+            {name:tasks[name] for name in checked_tasks if name in tasks},
+            {name:workers[name] for name in checked_workers if name in workers}
+        )
+        generation.errors = [
+            e for e in self.validate(
+                registry,
+                {name:new_tasks[name] for name in checked_tasks if name in new_tasks},
+                {name:new_workers[name] for name in checked_workers if name in new_workers}
+            )
+            if e not in live_errors
+        ]
+        if not generation.errors:
+            compiled = set(changed_tasks).union(self._tasks_using(tasks, delta, updated=True))
+            self._compile_generation(generation, temporal, [name for name in compiled if name in new_tasks])
+        generation.dependents = self._dependents(generation)
+        return generation
+
+    @staticmethod
+    def _tasks_using(tasks: Mapping[str, Any], delta: Mapping[str, Any], updated: bool = True) -> set[str]:
+        """live tasks whose runner or workflow was removed, or updated too when `updated`. Looked up on the store indexes."""
+        names = set()
+        for field, kind in [("runner", "runners"), ("workflow", "workflows")]:
+            objects = list(delta.get(f"removed_{kind}", []))
+            if updated:
+                objects.extend((delta.get(kind, None) or {}).keys())
+            [names.update(tasks.select(**{field: name})) for name in objects] # type: ignore
+        return names
+
+    def _compile_generation(self, generation: Generation, temporal: TemporalServersManager, task_names: Iterable[str]) -> None:
+        """
+        compile the plans of the given tasks against the generation objects. Other tasks keep their live plans.
+        New compilation errors reject the generation.
+        """
+        shadow = TemporalServersManager()
+        shadow.refresh_temporal_objects(**{kind:generation.registry.kind(kind) for kind in ["activities", "workflows", "runners", "workers"]})
+        # plans are adopted on publication if compiled against the very settings entry the store then holds.
+        live = temporal.settings.tasks
+        settings = {}
+        for name in task_names:
+            entry = live.get(name, None)
+            payload = generation.tasks_settings.get(name, entry)
+            if entry is payload or entry == payload:
+                settings[name] = entry
+            else:
+                settings[name] = generation.tasks_settings[name] = freeze(payload) # type: ignore
+        generation.plans, errors = shadow.precompile(settings)
+        generation.compiled = list(settings.keys())
+        generation.errors = [
+            f"[Task: {name}] {error}" for name, error in errors.items()
+            if temporal.plans_errors.get(name, None) != error
+        ]
+
+    def _dependents(self, generation: Generation) -> dict[Path, list[str]]:
+        """map each changed module to the deployable workers referencing one of its objects, old or new."""
+        references = {}
+        for task_queue, settings in generation.settings.settings("workers").items():
+            if settings.get("template", False):
+                continue
+            worker = settings.get("worker", {})
+            references[task_queue] = set([worker.get("type", None), *worker.get("activities", []), *worker.get("workflows", [])])
+
+        dependents = {}
+        for group, changed in generation.modules.items():
+            for module in changed:
+                names = set(PyModule.scan(generation.staged[module.module]).keys())
+                names.update(self.registry.contribution(group, module.module).keys())
+                dependents[module.module] = [q for q, refs in references.items() if names & refs]
+        return dependents
+
+    def _commit_generation(self, generation: Generation, temporal: TemporalServersManager) -> None:
+        """
+        publish a validated generation. Must not await: the hot path sees either generation, never both.
+        On any failure, modules, namespaces, registry and temporal manager are rolled back to the live generation.
+        """
+        changed = [module for modules in generation.modules.values() for module in modules]
+        yamls = [y for g in ["tasks", "workers"] for y in self.get(g).yamlmodules().values() if y.changes]
+        checkpoints = [(module, module.checkpoint()) for module in changed]
+        registry, settings, manager, undo = self.registry, self.settings_registry, temporal.checkpoint(), []
+        try:
+            self._publish_generation(generation, temporal, undo)
+        except Exception:
+            for namespace, name, value in reversed(undo):
+                if value is MISSING:
+                    namespace.pop(name, None)
+                else:
+                    namespace[name] = value
+            [module.rollback(checkpoint) for module, checkpoint in checkpoints]
+            [setattr(y, "changes", True) for y in yamls]
+            self.registry, self.settings_registry = registry, settings
+            temporal.rollback(manager)
+            raise
+        [self.generations.track(generation.staged[module.module], module.objects) for module in changed]
+
+    def _publish_generation(self, generation: Generation, temporal: TemporalServersManager, undo: list[tuple[dict, str, Any]]) -> None:
+        """publish the generation. Every namespace write is recorded in `undo` as (namespace, name, previous value)."""
+        def update(namespace: dict[str, Any], objects: Mapping[str, Any]) -> None:
+            undo.extend([(namespace, name, namespace.get(name, MISSING)) for name in objects.keys()])
+            namespace.update(objects)
+
+        for changed in generation.modules.values():
+            for module in changed:
+                module.commit(generation.staged[module.module], generation.versions[module.module])
+        previous, self.registry = self.registry.objects(), generation.registry
+
+        # fresh modules namespaces need every object. Live ones only the delta.
+        objects = self.registry.objects()
+        namespaces = [sys.modules[target].__dict__ for target in self.__targets if target in sys.modules]
+        [update(namespace, generation.delta["objects"]) for namespace in namespaces]
+        for group in [g for name, g in self.groups.items() if name in ["workflows", "runners", "workers", "temporal"]]:
+            for path, module in group.pymodules().items():
+                if module.module_name in sys.modules:
+                    update(sys.modules[module.module_name].__dict__, objects if path in generation.staged else generation.delta["objects"])
+                    namespaces.append(sys.modules[module.module_name].__dict__)
+
+        # drop injected objects removed from the registry, so their generation can be reclaimed.
+        for name in [n for n in generation.delta["removed"] if n not in objects and n in previous]:
+            for namespace in [ns for ns in namespaces if ns.get(name, None) is previous[name]]:
+                undo.append((namespace, name, namespace.pop(name)))
+
+        [y.changes_resolved() for g in ["tasks", "workers"] for y in self.get(g).yamlmodules().values() if y.changes]
+        # plans are compiled once the objects and settings are both published.
+        temporal.update_temporal_objects(
+            recompile=False,
+            **{k:v for k,v in generation.delta.items() if k not in ["objects", "removed"]}
+        )
+        self.settings_registry = generation.settings
+        temporal.update_settings(
+            plans=generation.plans,
+            tasks_settings=generation.tasks_settings,
+            removed_tasks=generation.removed_tasks,
+            workers_settings=generation.workers_settings,
+            removed_workers=generation.removed_workers
+        )
+        temporal.compile_tasks(generation.compiled)
+
+    @staticmethod
+    def validate(
+        registry: TemporalRegistry,
+        tasks_settings: Mapping[str, Mapping[str, Any]],
+        workers_settings: Mapping[str, Mapping[str, Any]]
+    ) -> list[str]:
+        """check that deployable settings only reference registered temporal objects. Templates are skipped."""
+        errors = []
+        objects, runners, workflows = registry.objects(), registry.kind("runners"), registry.kind("workflows")
+        for name, settings in workers_settings.items():
+            if settings.get("template", False):
+                continue
+            worker = settings.get("worker", {})
+            refs = [worker.get("type", None)] + list(worker.get("activities", [])) + list(worker.get("workflows", []))
+            errors.extend([f"[Worker: {name}] `{ref}` is not imported." for ref in refs if ref not in objects])
+
+        for name, settings in tasks_settings.items():
+            if settings.get("template", False):
+                continue
+            runner = settings.get("runner", None)
+            workflow = (settings.get("workflow", None) or {}).get("workflow", None)
+            if runner not in runners:
+                errors.append(f"[Task: {name}] runner `{runner}` is not imported.")
+            if workflow not in workflows:
+                errors.append(f"[Task: {name}] workflow `{workflow}` is not imported.")
+        return errors
+
     def _initialize_temporal_objects(self, module_name: str) -> None:
         groups = ["activities", "workflows", "workers", "runners", "routes"]
         for group in groups:
             modules = self.get(group).load()
             objects = self.get(group).temporal_objects()
             sys.modules[module_name].__dict__.update(objects)
+        self.__targets.append(module_name)
+        self.registry.update({name:list(g.pymodules().values()) for name, g in self.groups.items()})
+        for group in self.groups.values():
+            for module in group.pymodules().values():
+                if module.module_name in sys.modules:
+                    self.generations.track(sys.modules[module.module_name], module.objects)
@@ -0,0 +1,22 @@
+import time
+
+from launchpad.parsers import split_yaml_documents, load_yaml
+
+
+def test_split_yaml_documents():
+    # comment headers and blank lines stay with the single document they precede.
+    header = b"".join([f"# header {i}\n\n".encode() for i in range(20)])
+    content = header + b"name: task\nrunner: WorkflowRunner\n"
+    start = time.perf_counter()
+    assert split_yaml_documents(content) == [content]
+    assert split_yaml_documents(b"\n" * 30 + b"name: task\n") == [b"\n" * 30 + b"name: task\n"]
+    assert split_yaml_documents(b"---" + b"\n" * 30) == []
+    assert time.perf_counter() - start < 0.1
+
+    # empty documents, directives and end markers are dropped, inline content after `---` is kept.
+    content = b"%YAML 1.2\n---\n# empty\n...\n--- # still empty\n\n---\nname: a\n---\n--- {name: b}\n...\n"
+    documents = split_yaml_documents(content)
+    assert [load_yaml(document) for document in documents] == [{"name": "a"}, {"name": "b"}]
+    assert documents[0] == b"---\nname: a\n"
+    assert split_yaml_documents(b"# only comments\n\n") == []
+    assert split_yaml_documents(b"") == []
@@ -0,0 +1,237 @@
+import time
+import asyncio
+import pytest
+from types import SimpleNamespace
+
+from launchpad.temporal.temporal_server import TemporalServersManager, TemporalServer
+from launchpad.temporal.runners import WorkflowRunner, ScheduledWorkflowRunner
+from launchpad.exceptions import SettingsError
+
+
+class ServiceStandIn(object):
+    healthy = True
+    registered = ["default"]
+    calls: list[str] = []
+
+    def __init__(self):
+        self.workflow_service = self
+
+    @classmethod
+    async def connect(cls, config):
+        await asyncio.sleep(0.001)
+        return cls()
+
+    async def check_health(self, **kwargs):
+        return self.healthy
+
+    async def list_namespaces(self, request):
+        self.calls.append("list_namespaces")
+        namespaces = [SimpleNamespace(namespace_info=SimpleNamespace(name=n)) for n in self.registered]
+        return SimpleNamespace(namespaces=namespaces, next_page_token=b"")
+
+    async def register_namespace(self, request):
+        self.calls.append(f"register_namespace {request.namespace}")
+
+
+def test_pooled_connections():
+    from temporalio.service import ServiceClient
+    connect = ServiceClient.connect
+    ServiceClient.connect = ServiceStandIn.connect
+    server = TemporalServer("home", "localhost", 7233, 8233)
+
+    async def requests():
+        clients = [await server.get_client(namespace) for _ in range(100) for namespace in ["default", "other"]]
+        assert len(set([id(c) for c in clients])) == 2
+        assert clients[0].namespace == "default" and clients[1].namespace == "other"
+        assert clients[0].service_client is clients[1].service_client
+        assert server.connection.connects == 1
+
+        # checked again once stale, reconnected when unhealthy.
+        server.connection.health_interval = 0
+        clients[0].service_client.healthy = False
+        client = await server.get_client("default")
+        assert server.connection.connects == 2 and client is not clients[0]
+        server.connection.close()
+        assert server.info()["connection"] == {"connected": False, "connects": 2, "namespaces": []}
+
+    try:
+        asyncio.run(requests())
+    finally:
+        ServiceClient.connect = connect
+
+
+def test_namespaces_registration_snapshot():
+    from temporalio.service import ServiceClient
+    connect = ServiceClient.connect
+    ServiceClient.connect = ServiceStandIn.connect
+    ServiceStandIn.registered = [f"ns{i}" for i in range(20)]
+    ServiceStandIn.calls = []
+    namespaces = [{"name": f"ns{i}", "retention": 3600} for i in range(25)]
+    try:
+        server = asyncio.run(TemporalServer.initialize("home", "localhost", 7233, 8233, namespaces=namespaces))
+    finally:
+        ServiceClient.connect = connect
+    assert ServiceStandIn.calls == ["list_namespaces"] + [f"register_namespace ns{i}" for i in range(20, 25)]
+    assert server.connection.connects == 1
+    assert len(server.namespaces) == 26 and "ns24" in server._registered
+
+
+def test_concurrent_bootstrap():
+    from temporalio.service import ServiceClient
+    inflight = {}
+
+    class Cluster(ServiceStandIn):
+        registered = []
+
+        @classmethod
+        async def connect(cls, config):
+            if config.target_host.startswith("down"):
+                await asyncio.sleep(10)
+            cluster = cls()
+            cluster.host = config.target_host.split(":")[0]
+            return cluster
+
+        async def register_namespace(self, request):
+            # a cluster accepting connections but never answering registrations.
+            if self.host == "hung":
+                await asyncio.sleep(10)
+            counts = inflight.setdefault(self.host, [0])
+            counts.append(counts[-1] + 1)
+            await asyncio.sleep(0.01)
+            counts.append(counts[-1] - 1)
+
+    connect = ServiceClient.connect
+    ServiceClient.connect = Cluster.connect
+    servers = [
+        {"name": name, "ip": name, "port": 7233, "gui_port": 8233, "namespaces": [{"name": f"ns{i}"} for i in range(15)]}
+        for name in ["home", "down", "hung", "other"]
+    ]
+    try:
+        manager = asyncio.run(TemporalServersManager.intialize(
+            servers, default_server="home", bootstrap={"concurrency": 3, "timeout": 0.5}
+        ))
+    finally:
+        ServiceClient.connect = connect
+    assert list(manager.servers.keys()) == ["home", "down", "hung", "other"]
+    assert max(inflight["home"]) == 3 and max(inflight["other"]) == 3
+    info = manager.info()
+    assert info["home"]["degraded"] is None and info["other"]["degraded"] is None
+    assert info["down"]["degraded"] == "TimeoutError" and info["hung"]["degraded"] == "TimeoutError"
+    assert [ns["name"] for ns in info["home"]["namespaces"]] == ["default"] + [f"ns{i}" for i in range(15)]
+    assert [ns["name"] for ns in info["down"]["namespaces"]] == ["default"] + [f"ns{i}" for i in range(15)]
+
+
+def test_parallel_deploys_on_start():
+    manager = TemporalServersManager()
+    manager.default_server = SimpleNamespace(name="home")
+    manager.set_deploy_limits(concurrency=20, rate_limits={"slow": 100})
+    tasks = {
+        f"task{i}": {"name": f"task{i}", "deploy_on_server_start": True, "server": "slow" if i % 2 else None}
+        for i in range(300)
+    }
+    tasks["template"] = {"name": "template", "deploy_on_server_start": True, "template": True}
+    manager.refresh_settings(tasks_settings=tasks)
+    inflight = [0, 0]
+
+    async def deploy_task(name, app):
+        inflight[0] += 1
+        inflight[1] = max(inflight)
+        await asyncio.sleep(0.01)
+        inflight[0] -= 1
+        if name == "task7":
+            raise SettingsError("broken settings")
+    manager.deploy_task = deploy_task
+
+    start = time.perf_counter()
+    asyncio.run(manager.on_server_start_deploy_tasks(None))
+    # 150 tasks on `slow`: 100 in the first burst, 50 more at 100/s.
+    assert time.perf_counter() - start >= 0.45
+    assert inflight[1] == 20
+    report = manager.deployments.as_json(status="failed")
+    assert report["ready"] == True
+    assert report["tasks"] == {"pending": 0, "running": 0, "deployed": 299, "skipped": 0, "failed": 1}
+    assert report["deployments"] == [
+        {"kind": "tasks", "name": "task7", "server": "slow", "status": "failed", "duration": report["deployments"][0]["duration"], "error": "broken settings"}
+    ]
+    assert manager.deployments.as_json(limit=2)["deployments"][0]["server"] == "home"
+
+
+def test_precompiled_deployment_plans():
+    from datetime import timedelta
+    from temporalio.common import RetryPolicy, WorkflowIDReusePolicy
+
+    prepared, deployed = [], []
+    class CountingRunner(WorkflowRunner):
+        def prepare(self, **kwargs):
+            prepared.append(kwargs["workflow_id"])
+            return super().prepare(**kwargs)
+
+        async def run(self, **kwargs):
+            deployed.append(kwargs)
+
+    class Task: ...
+    class OtherTask: ...
+
+    manager = TemporalServersManager()
+    manager.default_server = SimpleNamespace(name="home")
+    async def get_temporal_frame(namespace_name=None, server_name=None):
+        return (None, None, "client")
+    manager.get_temporal_frame = get_temporal_frame
+    manager.refresh_temporal_objects(runners={"CountingRunner": CountingRunner}, workflows={"Task": Task})
+
+    task = {
+        "name": "t",
+        "runner": "CountingRunner",
+        "overwritable": True,
+        "workflow": {
+            "workflow": "Task",
+            "workflow_id": "id",
+            "task_queue": "q",
+            "workflow_kwargs": {},
+            "execution_timeout": {"minutes": 1},
+            "retry_policy": {"initial_interval": {"seconds": 2}, "maximum_attempts": 3},
+            "id_reuse_policy": "REJECT_DUPLICATE"
+        }
+    }
+    broken = {"name": "b", "runner": "CountingRunner", "workflow": {"workflow": "Missing"}}
+    manager.refresh_settings(tasks_settings={"t": task, "b": broken})
+    assert prepared == ["id"] and list(manager.plans.keys()) == ["t"]
+    assert "Missing" in manager.plans_errors["b"]
+
+    # compiled once, reused while the settings and objects are unchanged.
+    for _ in range(100):
+        asyncio.run(manager.deploy_task("t", None))
+    assert prepared == ["id"] and len(deployed) == 100
+    kwargs = deployed[0]
+    assert kwargs["client"] == "client" and kwargs["workflow"] is Task
+    assert kwargs["execution_timeout"] == timedelta(minutes=1)
+    assert kwargs["retry_policy"] == RetryPolicy(initial_interval=timedelta(seconds=2), maximum_attempts=3)
+    assert kwargs["id_reuse_policy"] == WorkflowIDReusePolicy.REJECT_DUPLICATE
+    assert manager.settings.tasks["t"]["workflow"]["execution_timeout"] == {"minutes": 1}
+
+    # overwrites are resolved on the fly and leave the plan alone.
+    asyncio.run(manager.deploy_task("t", None, overwrite={"workflow.workflow_id": "other"}))
+    assert deployed[-1]["workflow_id"] == "other" and prepared == ["id"]
+
+    # recompiled on content or objects changes only.
+    manager.refresh_settings(tasks_settings={"t": task, "b": broken})
+    assert prepared == ["id"]
+    manager.refresh_settings(tasks_settings={"t": dict(task, workflow=dict(task["workflow"], workflow_id="id2"))})
+    assert prepared == ["id", "id2"] and "b" not in manager.plans_errors
+    manager.update_temporal_objects(workflows={"Task": OtherTask})
+    assert prepared == ["id", "id2", "id2"] and manager.plans["t"].objects[1] is OtherTask
+
+    # errors surface at refresh and raise on deploy.
+    manager.update_temporal_objects(removed_runners=["CountingRunner"])
+    assert "t" not in manager.plans and "CountingRunner" in manager.plans_errors["t"]
+    with pytest.raises(Exception):
+        asyncio.run(manager.deploy_task("t", None))
+
+    runner = ScheduledWorkflowRunner()
+    kwargs = runner.prepare(
+        workflow=Task, workflow_kwargs={}, scheduler_id="s", workflow_id="w", task_queue="q",
+        intervals=[{"every": {"hours": 1}}], catchup_window={"minutes": 5}, tz="UTC", paused=True
+    )
+    assert kwargs["spec"].intervals[0].every == timedelta(hours=1) and kwargs["spec"].time_zone_name == "UTC"
+    assert kwargs["policy"].catchup_window == timedelta(minutes=5) and kwargs["state"].paused is True
+    assert not set(["intervals", "catchup_window", "tz", "paused"]) & set(kwargs.keys())
@@ -0,0 +1,68 @@
+import os
+import copy
+import shutil
+import pytest
+
+from launchpad.temporal.temporal_server import TemporalServersManager
+from launchpad.temporal.settings import SettingsStore
+from launchpad.exceptions import LaunchpadTypeError
+
+
+def test_settings_store_queries():
+    os.makedirs("./testfolder", exist_ok=True)
+    tasks = {
+        f"task{i}": {
+            "name": f"task{i}",
+            "runner": "ScheduledWorkflowRunner" if i % 2 else "WorkflowRunner",
+            "server": "home",
+            "workflow": {"workflow": "Task", "task_queue": f"q{i % 10}"},
+            "labels": {"team": "a" if i % 3 else "b"}
+        }
+        for i in range(500)
+    }
+    store = SettingsStore(tasks, db="./testfolder/settings.db")
+    assert len(store) == 500 and store.get("task7") == tasks["task7"]
+
+    total, page = store.query(offset=10, limit=5)
+    assert total == 500 and list(page.keys()) == [f"task{i}" for i in range(10, 15)]
+    total, page = store.query(limit=3, task_queue="q3", runner="ScheduledWorkflowRunner", labels=["team=b"])
+    assert total == len([i for i in range(500) if i % 10 == 3 and i % 2 and not i % 3])
+    assert list(page.keys()) == ["task3", "task33", "task63"]
+    assert store.query(workflow="Missing") == (0, {})
+
+    # a refresh only reindex the changed entries.
+    refreshed = dict(tasks)
+    refreshed.pop("task0")
+    refreshed["task3"] = dict(tasks["task3"], labels=["urgent"])
+    assert store.refresh(refreshed) == (["task3"], ["task0"])
+    assert store.query(labels=["urgent"])[1] == {"task3": refreshed["task3"]}
+    assert "task3" not in store.query(labels=["team=b"], limit=10)[1]
+    assert store.con.execute("SELECT COUNT(*) FROM settings WHERE kind='tasks';").fetchone()[0] == 499
+    store.close()
+    shutil.rmtree("./testfolder")
+
+
+def test_settings_copy_on_write():
+    manager = TemporalServersManager()
+    task = {
+        "name": "t",
+        "runner": "WorkflowRunner",
+        "overwritable": True,
+        "workflow": {"workflow": "Task", "workflow_id": "id", "workflow_kwargs": {"activity": "a", "args": [1, 2]}}
+    }
+    manager.refresh_settings(tasks_settings={"t": task})
+    frozen = manager.settings.tasks["t"]
+    with pytest.raises(LaunchpadTypeError):
+        frozen["workflow"]["workflow_id"] = "other"
+    with pytest.raises(LaunchpadTypeError):
+        frozen["workflow"]["workflow_kwargs"]["args"].append(3)
+
+    # only the overwritten path is materialized, the other branches are shared.
+    settings = manager.get_task_settings("t", overwrite={"workflow.workflow_id": "other"})
+    assert settings["workflow"]["workflow_id"] == "other" and frozen["workflow"]["workflow_id"] == "id"
+    assert settings["workflow"]["workflow_kwargs"] is frozen["workflow"]["workflow_kwargs"]
+    assert manager.get_task_settings("t") is frozen
+
+    copied = copy.deepcopy(frozen)
+    copied["workflow"]["workflow_kwargs"]["args"].append(3)
+    assert type(copied["workflow"]) is dict and frozen == task
@@ -0,0 +1,94 @@
+import asyncio
+import datetime
+import pytest
+
+import launchpad.utils as utils_module
+from launchpad.temporal.temporal_server import TemporalServersManager
+from launchpad.exceptions import LaunchpadKeyError, LaunchpadValueError
+
+
+def test_compiled_templates():
+    manager = TemporalServersManager()
+    task = {
+        "name": "t",
+        "runner": "WorkflowRunner",
+        "template": True,
+        "workflow": {
+            "workflow": "Task",
+            "workflow_id": "{{ prefix }}-{{ n }}",
+            "workflow_kwargs": {"activity": "a", "args": ["{{ quote }}", 2], "kwargs": {"{{ key }}": 1}}
+        }
+    }
+    manager.refresh_settings(tasks_settings={"t": task})
+    frozen = manager.settings.tasks["t"]
+    compile = utils_module.TemplatePlan.compile
+    compiled = []
+    utils_module.TemplatePlan.compile = classmethod(lambda cls, payload: compiled.append(payload) or compile(payload))
+    try:
+        for n in range(1000):
+            args = {"prefix": "id", "n": n, "quote": 'say "hi" \\', "key": f"k{n}"}
+            settings = manager.get_task_settings("t", template_args=args)
+    finally:
+        utils_module.TemplatePlan.compile = compile
+    assert len([payload for payload in compiled if payload is frozen]) == 1
+    assert settings["workflow"]["workflow_id"] == "id-999"
+    assert settings["workflow"]["workflow_kwargs"]["args"] == ['say "hi" \\', 2]
+    assert settings["workflow"]["workflow_kwargs"]["kwargs"] == {"k999": 1}
+    assert settings["name"] == "t" and frozen["workflow"]["workflow_id"] == "{{ prefix }}-{{ n }}"
+
+
+def test_settings_digest_key_types():
+    digest = utils_module.settings_digest
+    assert digest({1: "a", "1": "b", "x": {2: [1, "1"]}}) is not None
+    assert digest({1: "a"}) != digest({"1": "a"})
+    assert digest({"a": [1]}) != digest({"a": ["1"]}) and digest({"a": 1}) != digest({"a": 1.0})
+    assert digest({"a": 1, "b": {"c": 2}}) == digest({"b": {"c": 2}, "a": 1})
+    assert digest({"d": datetime.date(2024, 1, 2)}) != digest({"d": "2024-01-02"})
+    assert utils_module.freeze({1: "a", "b": [1]}).digest == digest({1: "a", "b": [1]})
+
+    # plans are never shared between keys of different types.
+    int_keys = utils_module.freeze({1: "{{ x }}", "y": 0})
+    str_keys = utils_module.freeze({"1": "{{ x }}", "y": 0})
+    assert utils_module.dyn_templating(int_keys, {"x": "a"}) == {1: "a", "y": 0}
+    assert utils_module.dyn_templating(str_keys, {"x": "b"}) == {"1": "b", "y": 0}
+
+    # values without a stable repr are never cached.
+    payload = utils_module.freeze({"w": object(), "v": "{{ x }}"})
+    assert payload.digest is None
+    plans = len(utils_module.TEMPLATE_PLANS)
+    assert utils_module.dyn_templating(payload, {"x": "c"})["v"] == "c"
+    assert len(utils_module.TEMPLATE_PLANS) == plans
+
+
+def test_compiled_overwrites():
+    manager = TemporalServersManager()
+    task = {
+        "name": "t",
+        "runner": "WorkflowRunner",
+        "overwritable": True,
+        "workflow": {"workflow": "Task", "workflow_id": "id", "workflow_kwargs": {"activity": "a", "args": [1], "x": 0}}
+    }
+    manager.refresh_settings(tasks_settings={"t": task})
+    frozen = manager.settings.tasks["t"]
+    keys = ["workflow.workflow_id", "workflow.workflow_kwargs.args", "workflow.workflow_kwargs.x"]
+    plans = len(utils_module.OVERWRITE_PLANS)
+    variants = [{"overwrite": {k: n for k in keys}} for n in range(1000)]
+    settings = [manager.get_task_settings("t", **variant) for variant in variants]
+    assert len(utils_module.OVERWRITE_PLANS) == plans + 1
+    assert utils_module.overwrite_plan(keys).validated == set([frozen.digest])
+    assert settings[7]["workflow"]["workflow_kwargs"] == {"activity": "a", "args": 7, "x": 7}
+    assert settings[7]["workflow"]["workflow_id"] == 7 and frozen["workflow"]["workflow_id"] == "id"
+
+    with pytest.raises(LaunchpadValueError):
+        utils_module.dyn_update(frozen, {"workflow": 1, "workflow.workflow_id": 2})
+
+    # variants are all resolved before the first deploy.
+    deployed = []
+    async def deploy(deployment):
+        deployed.append(deployment)
+    manager._deploy_task = deploy
+    with pytest.raises(LaunchpadKeyError):
+        asyncio.run(manager.deploy_task_variants("t", None, variants + [{"overwrite": {"workflow.missing": 1}}]))
+    assert deployed == []
+    assert asyncio.run(manager.deploy_task_variants("t", None, variants)) == 1000
+    assert deployed[999]["workflow"]["workflow_id"] == 999
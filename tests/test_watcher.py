@@ -1,9 +1,26 @@
+import gc
+import json
+import pytest
 import os
 import sys
 import yaml
 import shutil
+import asyncio
+import datetime
+import threading
 from pathlib import Path
-from launchpad.watcher import Watcher, YamlModule, PyModule, Group
+from types import SimpleNamespace
+from sanic import Sanic
+import launchpad.watcher as watcher_module
+from launchpad.watcher import Watcher, LaunchpadWatcher, YamlModule, YamlDocument, PyModule, Group, PayloadCache, TemporalRegistry, SettingsRegistry
+from launchpad.temporal.temporal_server import TemporalServersManager, NameSpace
+from launchpad.temporal.workers import AsyncWorker
+from launchpad.temporal.runners import WorkflowRunner, ScheduledWorkflowRunner
+from launchpad.inotify import Inotify
+from launchpad.state import WatcherState
+from launchpad.routes.watcher import watcherbp
+from launchpad.middlewares import go_fast, parse_args, extract_params, error_handler
+from launchpad.exceptions import LaunchpadTypeError, WorkerStartError
 
 def setup_file_system_1():
     if os.path.exists("./testfolder"):
@@ -232,3 +249,961 @@ def test_watcher_sync():
     assert watcher.get_module("./testfolder/deployments/test1.yaml")
     assert watcher.get_module("./testfolder/temporal/activities.py")    
     rm_test_setup() 
+
+
+def setup_file_system_2():
+    if os.path.exists("./testfolder"):
+        shutil.rmtree("./testfolder")
+
+    os.mkdir("./testfolder")
+    os.mkdir("./testfolder/deployments")
+    os.mkdir("./testfolder/temporal")
+
+    deployment1 = {'name': 'test1', 'runner': 'WorkflowRunner', 'workflow': {'workflow': 'Task', 'task_queue': 'default'}}
+    with open("./testfolder/deployments/test1.yaml", 'w+') as f:
+        yaml.safe_dump(deployment1, f)
+    with open("./testfolder/temporal/activities.py", 'w+') as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def hello(name: str) -> str:\n    return name\n")
+
+
+def age(path: str | Path, seconds: int = 10) -> None:
+    """move the file mtime out of the racy window."""
+    mtime = os.stat(path).st_mtime_ns - seconds * 1_000_000_000
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_module_stat_fast_path():
+    setup_file_system_2()
+    age("./testfolder/deployments/test1.yaml")
+    module = YamlModule(Path("./testfolder/deployments/test1.yaml"))
+    calls = []
+    version = module.version
+    module.version = lambda: calls.append(1) or version()
+
+    assert module.watch() == False
+    assert calls == []
+
+    with open(module.module.absolute(), "a") as f:
+        f.write("extra: 1\n")
+    assert module.watch() == True
+    assert len(calls) == 1
+
+    assert module.watch(rehash=True) == False
+    assert len(calls) == 2
+
+    # a fresh mtime is not trusted: a same size write in the same tick keeps the stat unchanged.
+    stat = os.stat(module.module)
+    with open(module.module.absolute(), "r+") as f:
+        f.write("#")
+    os.utime(module.module, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert module.watch() == True
+    assert len(calls) == 3
+
+    age(module.module)
+    assert module.watch() == False
+    assert len(calls) == 4
+    assert module.watch() == False
+    assert len(calls) == 4
+    rm_test_setup()
+
+
+def test_group_rehash_interval():
+    setup_file_system_2()
+    age("./testfolder/deployments/test1.yaml")
+    group = Group("deployments", [Path("./testfolder/deployments")], rehash_interval=2)
+    module = group.modules[Path("./testfolder/deployments/test1.yaml")]
+    calls = []
+    version = module.version
+    module.version = lambda: calls.append(1) or version()
+
+    group.visit()
+    assert len(calls) == 1
+    group.visit()
+    assert len(calls) == 1
+    group.visit()
+    assert len(calls) == 2
+    rm_test_setup()
+
+
+def test_group_visit_paths():
+    setup_file_system_2()
+    group = Group("deployments", [Path("./testfolder/deployments")])
+    with open("./testfolder/deployments/test3.yaml", 'w+') as f:
+        yaml.safe_dump({"name": "test3"}, f)
+    with open("./testfolder/deployments/test1.yaml", 'a') as f:
+        f.write("extra: 1\n")
+
+    changes = group.visit_paths([Path("./testfolder/deployments/test3.yaml"), Path("./testfolder/temporal/activities.py")])
+    assert changes == {"added": [Path("./testfolder/deployments/test3.yaml")], "modified": [], "removed": []}
+    assert group.modules[Path("./testfolder/deployments/test3.yaml")].changes == True
+
+    os.remove("./testfolder/deployments/test3.yaml")
+    changes = group.visit_paths([Path("./testfolder/deployments")])
+    assert changes == {
+        "added": [],
+        "modified": [Path("./testfolder/deployments/test1.yaml")],
+        "removed": [Path("./testfolder/deployments/test3.yaml")]
+    }
+    rm_test_setup()
+
+
+def test_inotify_events():
+    if Inotify.available() is False:
+        return
+    setup_file_system_2()
+    inotify = Inotify()
+    inotify.add_tree(Path("./testfolder"))
+    os.mkdir("./testfolder/deployments/sub")
+    assert Path("./testfolder/deployments/sub") in inotify.read()
+
+    with open("./testfolder/deployments/sub/test4.yaml", 'w+') as f:
+        f.write("name: test4\n")
+    os.remove("./testfolder/deployments/test1.yaml")
+    paths = inotify.read()
+    assert Path("./testfolder/deployments/sub/test4.yaml") in paths
+    assert Path("./testfolder/deployments/test1.yaml") in paths
+    inotify.close()
+    rm_test_setup()
+
+
+def test_inotify_listen_debounce():
+    if Inotify.available() is False:
+        return
+    setup_file_system_2()
+    watcher = LaunchpadWatcher(deployments=Group("deployments", [Path("./testfolder/deployments")]))
+    visited, callbacks = [], [0]
+
+    async def visit_paths(paths, *groups):
+        visited.append(paths)
+        return {}
+    async def refresh(app):
+        return None
+    watcher.async_visit_paths = visit_paths
+    watcher._refresh = refresh
+
+    async def main():
+        loop = asyncio.get_running_loop()
+        add_reader = loop.add_reader
+        def counted(fd, callback):
+            def wrapper():
+                callbacks[0] += 1
+                callback()
+            add_reader(fd, wrapper)
+        loop.add_reader = counted
+        listening = asyncio.create_task(watcher.listen(None))
+        await asyncio.sleep(0.05)
+        with open("./testfolder/deployments/test4.yaml", 'w+') as f:
+            f.write("name: test4\n")
+        await asyncio.sleep(watcher.debounce * 2)
+        listening.cancel()
+
+    asyncio.run(main())
+    # the reader is not polled while the events are debounced.
+    assert callbacks[0] <= 2
+    assert Path("./testfolder/deployments/test4.yaml") in visited[0]
+    rm_test_setup()
+
+
+def test_inotify_listen_rewatch_dropped():
+    if Inotify.available() is False:
+        return
+    setup_file_system_2()
+    inotify = Inotify()
+    assert inotify.add_tree(Path("./testfolder/deployments")) == True
+    shutil.rmtree("./testfolder/deployments")
+    inotify.read()
+    assert inotify.ignored == {Path("./testfolder/deployments")}
+    assert inotify.watched == []
+    shutil.rmtree("./testfolder")
+    assert inotify.add_tree(Path("./testfolder/deployments")) == False
+    inotify.close()
+
+    setup_file_system_2()
+    watcher = LaunchpadWatcher(deployments=Group("deployments", [Path("./testfolder/deployments")]))
+    watcher.debounce = 0.05
+    visited = []
+
+    async def visit_paths(paths, *groups):
+        visited.append(set(paths))
+        return {}
+    async def refresh(app):
+        return None
+    watcher.async_visit_paths = visit_paths
+    watcher._refresh = refresh
+
+    async def main():
+        listening = asyncio.create_task(watcher.listen(None))
+        await asyncio.sleep(0.05)
+        # a dropped basepath is watched again once recreated, and visited for the events missed meanwhile.
+        shutil.rmtree("./testfolder/deployments")
+        await asyncio.sleep(0.2)
+        os.mkdir("./testfolder/deployments")
+        with open("./testfolder/deployments/test4.yaml", 'w+') as f:
+            f.write("name: test4\n")
+        await asyncio.sleep(1.5)
+        with open("./testfolder/deployments/test5.yaml", 'w+') as f:
+            f.write("name: test5\n")
+        await asyncio.sleep(0.2)
+        listening.cancel()
+
+    asyncio.run(main())
+    assert {Path("./testfolder/deployments")} in visited
+    assert Path("./testfolder/deployments/test5.yaml") in visited[-1]
+    rm_test_setup()
+
+
+def test_group_concurrent_watch():
+    setup_file_system_2()
+    for i in range(8):
+        with open(f"./testfolder/deployments/task{i}.yaml", 'w+') as f:
+            yaml.safe_dump({"name": f"task{i}"}, f)
+    group = Group("deployments", [Path("./testfolder/deployments")], concurrency=4)
+    for i in range(0, 8, 2):
+        with open(f"./testfolder/deployments/task{i}.yaml", 'a') as f:
+            f.write("extra: 1\n")
+    changes = group.visit()
+    assert sorted(changes["modified"]) == sorted([Path(f"./testfolder/deployments/task{i}.yaml") for i in range(0, 8, 2)])
+
+    # one executor per group, kept across visits and shut down on close.
+    executor = group._executor()
+    group.visit()
+    assert group._executor() is executor
+    group.set_concurrency(2)
+    assert group._executor() is not executor and executor._shutdown
+    executor = group._executor()
+    watcher = Watcher(deployments=group)
+    watcher.close()
+    assert executor._shutdown
+    rm_test_setup()
+
+
+def test_visits_publish_modules_copies():
+    setup_file_system_2()
+    watcher = Watcher(deployments=Group("deployments", [Path("./testfolder/deployments")]))
+    group = watcher.get("deployments")
+    modules = group.modules
+    with open("./testfolder/deployments/test2.yaml", 'w+') as f:
+        f.write("name: test2\n")
+    os.remove("./testfolder/deployments/test1.yaml")
+
+    # readers holding the previous mapping are never mutated under them.
+    watcher.visit()
+    assert list(modules.keys()) == [Path("./testfolder/deployments/test1.yaml")]
+    assert list(group.modules.keys()) == [Path("./testfolder/deployments/test2.yaml")]
+    assert [m.module for m in watcher.changed_modules["deployments"]] == [Path("./testfolder/deployments/test2.yaml")]
+
+    stop, errors = threading.Event(), []
+    def visits():
+        for i in range(50):
+            path = f"./testfolder/deployments/task{i % 5}.yaml"
+            if os.path.exists(path):
+                os.remove(path)
+            else:
+                with open(path, 'w+') as f:
+                    f.write(f"name: task{i}\n")
+            watcher.visit_paths([Path(path)])
+        stop.set()
+    visiting = threading.Thread(target=visits)
+    visiting.start()
+    while not stop.is_set():
+        try:
+            [len(group.pymodules()) + len(group.yamlmodules()) for _ in range(10)]
+            watcher.changed_modules
+            watcher.modules
+        except RuntimeError as e:
+            errors.append(e)
+    visiting.join()
+    assert errors == []
+    rm_test_setup()
+
+
+def test_yamlmodule_payload_cache():
+    setup_file_system_2()
+    module = YamlModule(Path("./testfolder/deployments/test1.yaml"))
+    module.cache = PayloadCache()
+    payload = module.payload()
+    assert module.latest in module.cache
+
+    with pytest.raises(LaunchpadTypeError):
+        payload["name"] = "mutated"
+    assert module.payload() is payload
+
+    with open(module.module.absolute(), "a") as f:
+        f.write("extra: 1\n")
+    module.watch()
+    assert module.latest not in module.cache
+    assert module.payload()["extra"] == 1
+    assert len(module.cache) == 2
+    rm_test_setup()
+
+
+def test_payload_cache_eviction():
+    cache = PayloadCache(maxsize=10)
+    cache.put("a", {"a": 1}, 4)
+    cache.put("b", {"b": 1}, 4)
+    cache.get("a")
+    cache.put("c", {"c": 1}, 4)
+    assert "a" in cache and "c" in cache and "b" not in cache
+    assert cache.size == 8
+
+
+def test_settings_registry_rereads_changed_modules():
+    setup_file_system_2()
+    for i in range(3):
+        with open(f"./testfolder/deployments/task{i}.yaml", "w") as f:
+            yaml.safe_dump({"name": f"task{i}", "runner": "WorkflowRunner"}, f)
+    group = Group("tasks", [Path("./testfolder/deployments")])
+    registry = SettingsRegistry()
+    updated, removed = registry.update("tasks", group.yamlmodules())
+    assert sorted(updated.keys()) == ["task0", "task1", "task2", "test1"] and removed == []
+    settings = dict(registry.settings("tasks"))
+
+    read = []
+    payloads = YamlModule.payloads
+    YamlModule.payloads = lambda self: read.append(self.module.name) or payloads(self)
+    try:
+        assert registry.update("tasks", group.yamlmodules()) == ({}, [])
+        shadow = registry.copy()
+        with open("./testfolder/deployments/task1.yaml", "w") as f:
+            yaml.safe_dump({"name": "task1", "runner": "ScheduledWorkflowRunner"}, f)
+        os.remove("./testfolder/deployments/task2.yaml")
+        group.visit()
+        updated, removed = shadow.update("tasks", group.yamlmodules())
+    finally:
+        YamlModule.payloads = payloads
+    assert read == ["task1.yaml"]
+    assert list(updated.keys()) == ["task1"] and removed == ["task2"]
+    assert shadow.settings("tasks")["task0"] is settings["task0"]
+    assert registry.settings("tasks") == settings
+    rm_test_setup()
+
+
+def test_temporal_registry_delta():
+    setup_file_system_2()
+    sys.modules.pop("testfolder.temporal.activities", None)
+    group = Group("activities", [Path("./testfolder/temporal")])
+    group.load()
+    registry = TemporalRegistry()
+    delta = registry.update({"activities": list(group.pymodules().values())})
+    assert list(delta["activities"].keys()) == ["hello"]
+    assert list(registry.kind("activities").keys()) == ["hello"]
+
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def bye(name: str) -> str:\n    return name\n")
+    group.visit()
+    delta = registry.update({"activities": group.reload()})
+    assert list(delta["activities"].keys()) == ["bye"]
+    assert delta["removed_activities"] == ["hello"]
+    assert list(registry.kind("activities").keys()) == ["bye"]
+
+    delta = registry.update({}, {"activities": [Path("./testfolder/temporal/activities.py")]})
+    assert delta["removed_activities"] == ["bye"]
+    assert registry.kind("activities") == {}
+    sys.modules.pop("testfolder.temporal.activities", None)
+    rm_test_setup()
+
+
+def test_watcher_state_warm_restart():
+    setup_file_system_2()
+    with open("./testfolder/deployments/test1.yaml", 'a') as f:
+        f.write("ports:\n  1: http\n  '1': named\n  2.5: float\nstart: 2024-01-02\n")
+    state = WatcherState("./testfolder/state.db")
+    watcher = Watcher(deployments=Group("deployments", [Path("./testfolder/deployments")], state=state))
+    watcher.state = state
+    module = watcher.get_module("./testfolder/deployments/test1.yaml")
+    module.cache = PayloadCache()
+    payload = module.payload()
+    watcher.persist()
+    state.close()
+
+    state = WatcherState("./testfolder/state.db")
+    calls = []
+    version = YamlModule.version
+    YamlModule.version = lambda self: calls.append(1) or version(self)
+    try:
+        group = Group("deployments", [Path("./testfolder/deployments")], state=state)
+    finally:
+        YamlModule.version = version
+    restored = group.modules[Path("./testfolder/deployments/test1.yaml")]
+    assert calls == []
+    assert restored.latest == module.latest
+    assert state.get_payload(module.latest) == payload
+    # yaml keys and values keep their types.
+    assert payload["ports"] == {1: "http", "1": "named", 2.5: "float"}
+    assert state.get_payload(module.latest)["start"] == datetime.date(2024, 1, 2)
+    state.close()
+    rm_test_setup()
+
+
+def test_module_bounded_history():
+    setup_file_system_2()
+    module = YamlModule(Path("./testfolder/deployments/test1.yaml"))
+    module.history_spill = Path("./testfolder/history.jsonl")
+    module.resize_history(3)
+    for i in range(4):
+        with open(module.module.absolute(), "a") as f:
+            f.write(f"extra{i}: 1\n")
+        module.watch()
+
+    assert len(module.historics) == 3
+    assert module.historics[0][1] == module.latest
+    assert len(module.as_json(last=1)["historics"]) == 1
+    with open("./testfolder/history.jsonl", "r") as f:
+        spilled = f.readlines()
+    assert len(spilled) == 2
+
+    # restoring a longer history keeps the newest versions, and spills the others.
+    snapshot = {"stat": module.last_stat, "version": module.latest, "historics": module.historics}
+    spill = Path("./testfolder/restored.jsonl")
+    YamlModule.history_size, YamlModule.history_spill = 2, spill
+    try:
+        restored = YamlModule(module.module, snapshot=snapshot)
+    finally:
+        del YamlModule.history_size, YamlModule.history_spill
+    assert restored.historics == module.historics[:2]
+    with open(spill, "r") as f:
+        assert [json.loads(line)["version"] for line in f.readlines()] == [module.historics[2][1]]
+
+    # a file modified since the snapshot keeps the restored history, behind its fresh version.
+    with open(module.module.absolute(), "a") as f:
+        f.write("moved: 1\n")
+    restored = YamlModule(module.module, snapshot=snapshot)
+    assert restored.latest == restored.version() != module.latest
+    assert restored.historics[0][1] == restored.latest
+    assert restored.historics[1:] == module.historics
+    rm_test_setup()
+
+
+def test_watcher_index():
+    setup_file_system_2()
+    watcher = Watcher(
+        deployments=Group("deployments", [Path("./testfolder/deployments")]),
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")])
+    )
+    assert watcher.get_module("./testfolder/temporal/activities.py").module == Path("./testfolder/temporal/activities.py")
+    assert sorted(watcher.paths) == sorted([Path("./testfolder/deployments/test1.yaml"), Path("./testfolder/temporal/activities.py")])
+    assert watcher.changed_modules == {"deployments": [], "activities": []}
+
+    with open("./testfolder/deployments/test3.yaml", 'w+') as f:
+        yaml.safe_dump({"name": "test3"}, f)
+    watcher.visit()
+    module = watcher.get_module("./testfolder/deployments/test3.yaml")
+    assert watcher.changed_modules["deployments"] == [module]
+
+    module.load()
+    assert watcher.changed_modules["deployments"] == []
+
+    os.remove("./testfolder/deployments/test3.yaml")
+    watcher.visit()
+    assert watcher.get_module("./testfolder/deployments/test3.yaml") is None
+    rm_test_setup()
+
+
+def test_staged_reload():
+    setup_file_system_2()
+    os.mkdir("./testfolder/workers")
+    with open("./testfolder/temporal/workers.py", 'w+') as f:
+        f.write("from launchpad.temporal.workers import AsyncWorker\n")
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workers"]]
+    watcher = LaunchpadWatcher(
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")]),
+        workers=Group("workers", [Path("./testfolder/temporal/workers.py"), Path("./testfolder/workers")]),
+        tasks=Group("tasks", [Path("./testfolder/deployments")]),
+        workflows=Group("workflows", []),
+        runners=Group("runners", []),
+        temporal=Group("temporal", [])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+    app = SimpleNamespace(ctx=SimpleNamespace(temporal=TemporalServersManager()))
+    app.ctx.temporal.refresh_settings(tasks_settings=watcher.tasks_settings(), workers_settings=watcher.workers_settings())
+    module = watcher.get_module("./testfolder/temporal/activities.py")
+    live = sys.modules[module.module_name]
+
+    # import error: nothing is published.
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def bye(name: str) -> str\n")
+    watcher.visit()
+    asyncio.run(watcher.update_app(app))
+    assert sys.modules[module.module_name] is live
+    assert list(watcher.activities().keys()) == ["hello"]
+    assert module.changes == True
+
+    # worker referencing an activity missing from the new generation: rejected.
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def hello(name: str) -> str:\n    return name\n")
+    worker = {"worker": {"type": "AsyncWorker", "task_queue": "q", "activities": ["bye"], "workflows": []}}
+    with open("./testfolder/workers/worker.yaml", "w+") as f:
+        yaml.safe_dump(worker, f)
+    watcher.visit()
+    asyncio.run(watcher.update_app(app))
+    assert sys.modules[module.module_name] is live
+    assert app.ctx.temporal.settings.workers == {}
+    assert watcher.get_module("./testfolder/workers/worker.yaml").changes == True
+
+    # valid generation: modules, registry and manager swapped together.
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def bye(name: str) -> str:\n    return name\n")
+    watcher.visit()
+    asyncio.run(watcher.update_app(app))
+    assert sys.modules[module.module_name] is not live
+    assert list(watcher.activities().keys()) == ["bye"]
+    assert list(app.ctx.temporal.temporal_objects.activities.keys()) == ["bye"]
+    assert list(app.ctx.temporal.settings.workers.keys()) == ["q"]
+    assert watcher.changed_modules["workers"] == []
+
+    # failure while publishing: modules, namespaces, registry and manager are rolled back.
+    live, loaded = sys.modules[module.module_name], module.loaded
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("import sys\nfrom temporalio import activity\n\nSEEN = sys.modules.get(__name__)\n\n@activity.defn\nasync def ciao(name: str) -> str:\n    return name\n")
+    with open("./testfolder/workers/worker.yaml", "w+") as f:
+        yaml.safe_dump({"worker": dict(worker["worker"], activities=["ciao"])}, f)
+    watcher.visit()
+    def update_settings(**kwargs):
+        raise RuntimeError("broken")
+    app.ctx.temporal.update_settings = update_settings
+    asyncio.run(watcher.update_app(app))
+    del app.ctx.temporal.update_settings
+    assert sys.modules[module.module_name] is live and module.loaded == loaded and module.changes == True
+    assert list(watcher.activities().keys()) == ["bye"]
+    assert list(app.ctx.temporal.temporal_objects.activities.keys()) == ["bye"]
+    assert app.ctx.temporal.settings.workers["q"]["worker"]["activities"] == ["bye"]
+    assert "ciao" not in sys.modules["testfolder.temporal.workers"].__dict__
+    assert watcher.get_module("./testfolder/workers/worker.yaml").changes == True
+
+    # the staged body runs detached: it never sees itself in sys.modules.
+    asyncio.run(watcher.update_app(app))
+    assert sys.modules[module.module_name].SEEN is live
+    assert list(app.ctx.temporal.temporal_objects.activities.keys()) == ["ciao"]
+    assert "ciao" in sys.modules["testfolder.temporal.workers"].__dict__
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workers"]]
+    rm_test_setup()
+
+
+def test_generation_plans_compiled_ahead():
+    class BrokenRunner(WorkflowRunner):
+        def prepare(self, **kwargs):
+            raise ValueError("bad option")
+    class Task: ...
+
+    kinds = {"runners": {"BrokenRunner": BrokenRunner, "WorkflowRunner": WorkflowRunner}, "workflows": {"Task": Task}}
+    generation = SimpleNamespace(
+        registry=SimpleNamespace(kind=lambda kind: kinds.get(kind, {})),
+        tasks_settings={
+            "ok": {"runner": "WorkflowRunner", "workflow": {"workflow": "Task", "workflow_id": "a", "task_queue": "q", "workflow_kwargs": {}}},
+            "broken": {"runner": "BrokenRunner", "workflow": {"workflow": "Task"}},
+            "unchanged": {"runner": "BrokenRunner", "workflow": {"workflow": "Task"}}
+        },
+        errors=[],
+        plans={}
+    )
+    temporal = TemporalServersManager()
+    LaunchpadWatcher()._compile_generation(generation, temporal, ["ok", "broken"])
+    assert generation.errors == ["[Task: broken] Cannot compile task: broken. ValueError: bad option"]
+    assert list(generation.plans.keys()) == ["ok"] and generation.compiled == ["ok", "broken"]
+
+    # plans compiled ahead are adopted, not compiled again.
+    temporal.refresh_temporal_objects(**kinds)
+    temporal.refresh_settings(plans=generation.plans, tasks_settings={"ok": generation.tasks_settings["ok"]})
+    assert temporal.plans["ok"] is generation.plans["ok"]
+
+
+
+def test_generation_compiles_changed_tasks():
+    setup_file_system_2()
+    os.remove("./testfolder/deployments/test1.yaml")
+    with open("./testfolder/temporal/runners.py", "w") as f:
+        f.write("from launchpad.temporal.runners import WorkflowRunner\n")
+    for name in ["Task", "Other"]:
+        with open(f"./testfolder/temporal/{name.lower()}.py", "w") as f:
+            f.write(f"from temporalio import workflow\n\n@workflow.defn\nclass {name}:\n    @workflow.run\n    async def run(self) -> None:\n        return None\n")
+    def task(i, workflow_id):
+        return {
+            "name": f"task{i}",
+            "runner": "WorkflowRunner",
+            "workflow": {"workflow": "Other" if i % 2 else "Task", "workflow_id": workflow_id, "task_queue": "q", "workflow_kwargs": {}}
+        }
+    for i in range(20):
+        with open(f"./testfolder/deployments/task{i}.yaml", "w") as f:
+            yaml.safe_dump(task(i, f"id{i}"), f)
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["runners", "task", "other"]]
+    watcher = LaunchpadWatcher(
+        runners=Group("runners", [Path("./testfolder/temporal/runners.py")]),
+        workflows=Group("workflows", [Path("./testfolder/temporal/task.py"), Path("./testfolder/temporal/other.py")]),
+        workers=Group("workers", []),
+        tasks=Group("tasks", [Path("./testfolder/deployments")])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+    temporal = TemporalServersManager()
+    temporal.refresh_temporal_objects(runners=watcher.runners(), workflows=watcher.workflows())
+    temporal.refresh_settings(tasks_settings=watcher.tasks_settings())
+    app = SimpleNamespace(ctx=SimpleNamespace(temporal=temporal))
+    plans = dict(temporal.plans)
+    assert len(plans) == 20
+
+    compiled = []
+    compile = TemporalServersManager._compile_task
+    TemporalServersManager._compile_task = lambda self, name, settings: compiled.append(name) or compile(self, name, settings)
+    try:
+        # one changed task is compiled once, ahead of the publication. The other plans are kept.
+        with open("./testfolder/deployments/task3.yaml", "w") as f:
+            yaml.safe_dump(task(3, "other"), f)
+        watcher.visit()
+        assert asyncio.run(watcher.update_app(app)) == []
+        assert compiled == ["task3"] and temporal.plans["task3"].kwargs["workflow_id"] == "other"
+        assert all(temporal.plans[name] is plans[name] for name in plans if name != "task3")
+
+        # a reloaded workflow module only recompiles the tasks using its workflows.
+        compiled.clear()
+        with open("./testfolder/temporal/other.py", "a") as f:
+            f.write("\n# touched\n")
+        watcher.visit()
+        assert asyncio.run(watcher.update_app(app)) == []
+        assert sorted(compiled) == sorted([f"task{i}" for i in range(1, 20, 2)])
+        assert temporal.plans["task1"].objects[1] is sys.modules["testfolder.temporal.other"].Other
+        assert all(temporal.plans[f"task{i}"] is plans[f"task{i}"] for i in range(0, 20, 2))
+    finally:
+        TemporalServersManager._compile_task = compile
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["runners", "task", "other"]]
+    rm_test_setup()
+
+def test_adaptive_polling_schedule():
+    setup_file_system_2()
+    watcher = LaunchpadWatcher(
+        tasks=Group("tasks", [Path("./testfolder/deployments")]),
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")])
+    )
+    watcher.set_polling_interval(10)
+    watcher.set_groups_intervals({"tasks": 2})
+    assert watcher.schedule == {"tasks": 2, "activities": 10}
+
+    watcher.set_adaptive(True, max_interval=8)
+    quiet = {"added": [], "modified": [], "removed": []}
+    watcher._reschedule({"tasks": quiet}, 0)
+    watcher._reschedule({"tasks": quiet}, 0)
+    assert watcher.group_interval("tasks") == 8
+    watcher._reschedule({"tasks": quiet}, 0)
+    assert watcher.group_interval("tasks") == 8
+    assert watcher.due_groups(8) == ["tasks"]
+    assert watcher.group_interval("activities") == 10
+
+    watcher._reschedule({"tasks": {"added": [], "modified": [Path("./testfolder/deployments/test1.yaml")], "removed": []}}, 8)
+    assert watcher.group_interval("tasks") == 2
+    assert watcher.due_groups(9) == []
+    assert watcher.due_groups(10) == ["tasks"]
+
+    # a group removed during its visit is unscheduled: the poller sleeps until the next due group.
+    watcher.set_adaptive(False)
+    watcher.set_groups_intervals({"tasks": 0.01})
+    visits, sleeps = [], []
+    async def visit(*groups):
+        visits.append(groups)
+        watcher.remove_group("tasks")
+        return {group: quiet for group in groups}
+    async def refresh(app):
+        return None
+    watcher.async_visit = visit
+    watcher._refresh = refresh
+
+    async def polling():
+        sleep = asyncio.sleep
+        async def counted(delay):
+            sleeps.append(delay)
+            if delay > 1 or len(sleeps) > 100:
+                raise asyncio.CancelledError()
+            await sleep(delay)
+        asyncio.sleep = counted
+        try:
+            await watcher.poll(None)
+        finally:
+            asyncio.sleep = sleep
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(polling())
+    assert visits == [("tasks",)]
+    assert len(sleeps) == 2 and sleeps[-1] > 9
+    assert watcher.schedule == {"activities": 10}
+    rm_test_setup()
+
+
+def test_workers_depending_on_changed_modules():
+    setup_file_system_2()
+    os.mkdir("./testfolder/workers")
+    with open("./testfolder/temporal/workflows.py", 'w+') as f:
+        f.write("from temporalio import workflow\n\n@workflow.defn\nclass Task:\n    @workflow.run\n    async def run(self) -> None:\n        return None\n")
+    workers = [
+        {"worker": {"type": "AsyncWorker", "task_queue": "q1", "activities": ["hello"], "workflows": []}},
+        {"worker": {"type": "AsyncWorker", "task_queue": "q2", "activities": [], "workflows": ["Task"]}}
+    ]
+    for worker in workers:
+        with open(f"./testfolder/workers/{worker['worker']['task_queue']}.yaml", "w+") as f:
+            yaml.safe_dump(worker, f)
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workflows"]]
+    watcher = LaunchpadWatcher(
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")]),
+        workflows=Group("workflows", [Path("./testfolder/temporal/workflows.py")]),
+        workers=Group("workers", [Path("./testfolder/workers")]),
+        tasks=Group("tasks", [])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+
+    with open("./testfolder/temporal/activities.py", "a") as f:
+        f.write("\n# edited\n")
+    watcher.visit()
+    generation = watcher._stage_generation(TemporalServersManager())
+    assert generation.dependents == {Path("./testfolder/temporal/activities.py"): ["q1"]}
+    assert generation.task_queues == ["q1"]
+
+    # rolling restart: the new worker polls before the old one is cancelled.
+    class App:
+        def __init__(self):
+            self.events, self.tasks = [], {}
+        def add_task(self, task, name):
+            self.events.append(("add", name))
+            self.tasks[name] = asyncio.ensure_future(task())
+            return self.tasks[name]
+        async def cancel_task(self, name, raise_exception=True):
+            self.events.append(("cancel", name))
+            self.tasks.pop(name).cancel()
+        def purge_tasks(self):
+            pass
+
+    class PollingWorker(AsyncWorker):
+        async def run(self):
+            await asyncio.sleep(0.05)
+            if self.max_workers == 0:
+                raise RuntimeError("namespace not found")
+            app.events.append(("started", self.task_queue))
+            self.started.set()
+            await asyncio.sleep(3600)
+
+    app = App()
+    namespace = NameSpace("default")
+    namespace.startup_timeout = 1
+    sys.modules["launchpad.temporal.temporal_server"].__dict__.update(watcher.registry.objects())
+    sys.modules["launchpad.temporal.temporal_server"].__dict__["PollingWorker"] = PollingWorker
+    settings = {"type": "PollingWorker", "client": None, "task_queue": "q1", "activities": ["hello"], "workflows": []}
+
+    async def restarts():
+        await namespace.start_workers(dict(settings), app)
+        await namespace.restart_workers(dict(settings), app)
+        assert app.events == [("add", "worker__q1"), ("add", "worker__q1__1"), ("started", "q1"), ("started", "q1"), ("cancel", "worker__q1")]
+
+        # a worker failing to start is cancelled. The running one keeps polling.
+        with pytest.raises(WorkerStartError):
+            await namespace.restart_workers(dict(settings, max_workers=0), app)
+        assert app.events[-1] == ("cancel", "worker__q1__2")
+        assert namespace.workers["q1"][1] == "worker__q1__1" and not app.tasks["worker__q1__1"].done()
+
+        await namespace.stop_workers("q1", app)
+        assert app.events[-1] == ("cancel", "worker__q1__1")
+        assert namespace.workers == {}
+    asyncio.run(restarts())
+    sys.modules["launchpad.temporal.temporal_server"].__dict__.pop("PollingWorker")
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workflows"]]
+    rm_test_setup()
+
+
+def test_pin_previous_version():
+    setup_file_system_2()
+    sys.modules.pop("testfolder.temporal.activities", None)
+    watcher = LaunchpadWatcher(
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")]),
+        workers=Group("workers", []),
+        tasks=Group("tasks", [])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+    app = SimpleNamespace(ctx=SimpleNamespace(temporal=TemporalServersManager()))
+    module = watcher.get_module("./testfolder/temporal/activities.py")
+    v1 = module.loaded
+    assert v1 == module.latest
+
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def bye(name: str) -> str:\n    return name\n")
+    watcher.visit()
+    asyncio.run(watcher.update_app(app))
+    v2 = module.loaded
+    assert v2 != v1 and module.previous == v1
+
+    # compiled versions are served from the cache, never from disk.
+    with open("./testfolder/temporal/activities.py", "a") as f:
+        f.write("not python\n")
+    staged, version = module.stage(v1)
+    assert version == v1 and hasattr(staged, "hello")
+
+    assert watcher.pin_group("activities") == {module.module: v1}
+    asyncio.run(watcher.update_app(app))
+    assert module.loaded == v1
+    assert list(watcher.activities().keys()) == ["hello"]
+
+    # file changes under a matched pin neither show as changed nor trigger refreshes.
+    with open("./testfolder/temporal/activities.py", "a") as f:
+        f.write("# pinned\n")
+    watcher.visit()
+    assert module.changes == True and module.held == True
+    assert watcher.changed_modules["activities"] == [] and module in watcher.unchanged_modules["activities"]
+    refreshes = []
+    async def update_app(app):
+        refreshes.append(app)
+    watcher.update_app = update_app
+    asyncio.run(watcher._refresh(app))
+    del watcher.update_app
+    assert refreshes == []
+
+    watcher.unpin_module("./testfolder/temporal/activities.py")
+    assert module.stale == True
+    assert module.pin(v2[:12]) == v2
+    asyncio.run(watcher.update_app(app))
+    assert list(watcher.activities().keys()) == ["bye"]
+    sys.modules.pop("testfolder.temporal.activities", None)
+    rm_test_setup()
+
+
+def test_pin_routes():
+    setup_file_system_2()
+    sys.modules.pop("testfolder.temporal.activities", None)
+    watcher = LaunchpadWatcher(
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")]),
+        workers=Group("workers", []),
+        tasks=Group("tasks", [])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+    temporal = TemporalServersManager()
+    module = watcher.get_module("./testfolder/temporal/activities.py")
+    v1 = module.loaded
+    with open("./testfolder/temporal/activities.py", "w") as f:
+        f.write("from temporalio import activity\n\n@activity.defn\nasync def bye(name: str) -> str:\n    return name\n")
+    watcher.visit()
+    asyncio.run(watcher.update_app(SimpleNamespace(ctx=SimpleNamespace(temporal=temporal))))
+    v2 = module.loaded
+
+    app = Sanic("TestWatcherRoutes")
+    app.blueprint(watcherbp)
+    app.error_handler.add(Exception, error_handler)
+    app.on_request(go_fast, priority=200)
+    app.on_request(parse_args, priority=99)
+    app.on_request(extract_params, priority=98)
+    app.ctx.authenticator = None
+    app.ctx.watcher = watcher
+    app.ctx.temporal = temporal
+
+    _, response = app.test_client.post("/watcher/pin", json={"group": "activities"})
+    assert response.status == 200
+    assert response.json["data"] == {str(module.module): {"pinned": v1, "loaded": v1}}
+    assert list(watcher.activities().keys()) == ["hello"]
+
+    _, response = app.test_client.post("/watcher/unpin", json={"module": str(module.module)})
+    assert response.status == 200
+    assert response.json["data"] == {str(module.module): {"pinned": None, "loaded": v2}}
+
+    _, response = app.test_client.post("/watcher/pin", json={"module": str(module.module)})
+    assert response.status == 500
+
+    # a rejected update is reported and the pin is reverted.
+    def update_settings(**kwargs):
+        raise RuntimeError("broken")
+    temporal.update_settings = update_settings
+    _, response = app.test_client.post("/watcher/pin", json={"module": str(module.module), "version": v1})
+    del temporal.update_settings
+    assert response.status == 409
+    assert "broken" in response.json["reasons"]
+    assert module.pinned is None and module.loaded == v2
+    assert list(watcher.activities().keys()) == ["bye"]
+    sys.modules.pop("testfolder.temporal.activities", None)
+    rm_test_setup()
+
+@pytest.mark.parametrize("warmup,reloads", [(100, 500), pytest.param(1000, 10000, marks=pytest.mark.slow)])
+def test_reloads_do_not_leak_generations(warmup, reloads):
+    setup_file_system_2()
+    with open("./testfolder/temporal/workflows.py", 'w+') as f:
+        f.write("import sys\n")
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workflows"]]
+    watcher = LaunchpadWatcher(
+        activities=Group("activities", [Path("./testfolder/temporal/activities.py")]),
+        workflows=Group("workflows", [Path("./testfolder/temporal/workflows.py")]),
+        workers=Group("workers", []),
+        tasks=Group("tasks", [])
+    )
+    watcher.load()
+    watcher.registry.update({name:list(g.pymodules().values()) for name, g in watcher.groups.items()})
+    app = SimpleNamespace(ctx=SimpleNamespace(temporal=TemporalServersManager()))
+    watcher.generations.threshold = 64
+    module = watcher.get_module("./testfolder/temporal/activities.py")
+    workflows = sys.modules["testfolder.temporal.workflows"]
+
+    # alternate between two versions. `bye` only exists in the second one and must be purged when removed.
+    first = module.loaded
+    with open("./testfolder/temporal/activities.py", "a") as f:
+        f.write("\n@activity.defn\nasync def bye(name: str) -> str:\n    return name\n")
+    watcher.visit()
+
+    async def reload(n: int) -> None:
+        for i in range(n):
+            if i % 2 == 1:
+                module.pin(first)
+            else:
+                module.unpin()
+            await watcher.update_app(app)
+
+    asyncio.run(reload(warmup))
+    assert "bye" not in workflows.__dict__
+    gc.collect()
+    baseline = len(gc.get_objects())
+    asyncio.run(reload(reloads))
+    assert len(watcher.generations) <= watcher.generations.threshold + 1
+    assert watcher.generations.collect(force=True) == 0
+    assert len(watcher.generations) == 1
+    assert len(gc.get_objects()) - baseline < 1000
+    [sys.modules.pop(f"testfolder.temporal.{m}", None) for m in ["activities", "workflows"]]
+    rm_test_setup()
+
+
+def test_multi_documents_yaml():
+    setup_file_system_2()
+    tasks = [{"name": f"task{i}", "runner": "WorkflowRunner", "workflow": {"workflow": "Task"}} for i in range(3)]
+    with open("./testfolder/deployments/tasks.yaml", "w+") as f:
+        yaml.safe_dump_all(tasks, f, explicit_start=True)
+    state = WatcherState("./testfolder/state.db")
+    group = Group("deployments", [Path("./testfolder/deployments")], state=state)
+    module = group.modules[Path("./testfolder/deployments/tasks.yaml")]
+    assert module.multi == True
+    assert [d.key for d in module.documents()] == [f"testfolder/deployments/tasks.yaml#{i}" for i in range(3)]
+
+    payloads = group.payloads()
+    assert payloads["testfolder/deployments/tasks.yaml#1"] == tasks[1]
+    assert payloads[Path("./testfolder/deployments/test1.yaml")]["name"] == "test1"
+
+    # editing one document only parses that document.
+    parsed = []
+    load_yaml = watcher_module.load_yaml
+    watcher_module.load_yaml = lambda content: parsed.append(content) or load_yaml(content)
+    try:
+        tasks[1]["runner"] = "ScheduledWorkflowRunner"
+        with open("./testfolder/deployments/tasks.yaml", "w") as f:
+            yaml.safe_dump_all(tasks, f, explicit_start=True)
+        group.visit()
+        payloads = group.payloads()
+    finally:
+        watcher_module.load_yaml = load_yaml
+    assert len(parsed) == 1
+    assert payloads["testfolder/deployments/tasks.yaml#1"]["runner"] == "ScheduledWorkflowRunner"
+
+    # documents payloads are persisted and restored without parsing.
+    state.save(list(group.modules.values()))
+    versions = [d.version for d in module.documents()]
+    assert sorted([v for v, _ in state.get_documents(module.module)]) == sorted(versions)
+    state.close()
+    state = WatcherState("./testfolder/state.db")
+    YamlDocument.cache = PayloadCache()
+    YamlModule.cache = YamlDocument.cache
+    try:
+        group = Group("deployments", [Path("./testfolder/deployments")], state=state)
+        assert all(v in YamlDocument.cache for v in versions)
+    finally:
+        YamlDocument.cache = watcher_module.PAYLOADS
+        YamlModule.cache = watcher_module.PAYLOADS
+    state.close()
+    rm_test_setup()